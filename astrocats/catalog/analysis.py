@@ -11,6 +11,8 @@ import os
 from glob import glob
 import numpy as np
 
+from astrocats.catalog.quantity_cache import QuantityCache
+
 
 class Analysis:
 
@@ -39,8 +41,41 @@ class Analysis:
         if args.count:
             self.count()
 
+        if args.build_cache:
+            self.build_quantity_cache()
+
         return
 
+    def build_quantity_cache(self):
+        """(Re)build the columnar cache of all entries' quantities.
+
+        See `astrocats.catalog.quantity_cache.QuantityCache`.
+        """
+        self.log.info("Running 'build_quantity_cache'")
+        QuantityCache(self.catalog).build()
+        return
+
+    def load_quantity(self, quantity):
+        """Load the values of `quantity` (e.g. 'redshift') for all entries.
+
+        The quantity cache must have been built (`build_quantity_cache`).
+
+        Returns
+        -------
+        columns : dict of ndarray
+            Columns of the entry index, value (as str and float), error, kind
+            and number of sources of each stored value.
+        names : list of str
+            Names of the entries, indexed by the 'entry' column.
+
+        """
+        cache = QuantityCache(self.catalog)
+        if not cache.exists():
+            raise RuntimeError("Quantity cache does not exist, run "
+                               "'analyze --build-cache' first.")
+        columns = cache.load(quantity)
+        return columns, cache.names
+
     def count(self):
         """Analyze the counts of ...things.
 
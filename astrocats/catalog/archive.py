@@ -0,0 +1,332 @@
+"""Pack all of the entries of a catalog into a single, indexed archive file.
+
+Archive layout (all integers little-endian):
+
+-   Header: `_HEADER` struct, i.e. magic bytes, version, flags, number of
+    entries, number of index keys, and the offsets of the entry table and of
+    the index.
+-   Blobs: the (UTF-8) JSON text of each entry file, concatenated, each
+    optionally compressed with `zlib` (`FLAG_COMPRESSED`).
+-   Strings: the entry names, relative file paths and index keys.
+-   Entry table: one `_ENTRY` record per entry, giving the position of its
+    blob, name and path.
+-   Index: one `_KEY` record per name and alias, sorted by the (UTF-8 bytes
+    of the) key, then with names before aliases.  Lookups are binary searches
+    over these fixed-size records.
+
+The reader (`CatalogArchive`) uses `mmap`, so that only the pages which are
+accessed are read from disk.
+"""
+import gzip
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.utils import get_entry_aliases, pbar, read_text_file
+
+# Default archive filename, within the catalog's output directory
+ARCHIVE_FILENAME = 'catalog.pack'
+
+MAGIC = b'ACATPACK'
+VERSION = 1
+# Entry blobs are compressed with `zlib`
+FLAG_COMPRESSED = 1
+
+# magic, version, flags, num-entries, num-keys, entry-table, index
+_HEADER = struct.Struct('<8sHHIIQQ')
+# blob offset, blob size, text size, name offset, name size, path offset, size
+_ENTRY = struct.Struct('<QIIQIQI')
+# key offset, key size, entry number, whether the key is an alias
+_KEY = struct.Struct('<QIIB')
+
+
+class CatalogArchive:
+    """Read-only access to a packed catalog archive (see `pack_catalog`).
+
+    Entries can be looked up by name or alias in O(log N) time
+    (`get_text`, `get_data`), or read sequentially (`iter_texts`).
+
+    Arguments
+    ---------
+    path : str
+        Filename of the archive.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Archive '{}' is empty.".format(path))
+
+        (magic, version, self.flags, self._num_entries, self._num_keys,
+         self._entries_offset, self._index_offset) = _HEADER.unpack_from(
+             self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("'{}' is not a catalog archive.".format(path))
+        if version > VERSION:
+            self.close()
+            raise ValueError("Archive '{}' has unsupported version {}.".format(
+                path, version))
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self._num_entries
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        return
+
+    def find(self, name):
+        """Return the number of the entry with the given name or alias.
+
+        Names are preferred over aliases.  Returns 'None' if not found.
+        """
+        key = name.encode('utf-8')
+        lo, hi = 0, self._num_keys
+        # Find the first index key which is not less than `key`
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._num_keys:
+            found, number = self._key(lo)
+            if found == key:
+                return number
+        return None
+
+    def names(self):
+        """Return the names of all entries, in the order they are stored.
+        """
+        return [self._entry(ii)[3] for ii in range(self._num_entries)]
+
+    def get_text(self, name):
+        """Return the JSON text of the entry with the given name or alias.
+
+        Raises a `KeyError` if it is not found.
+        """
+        number = self.find(name)
+        if number is None:
+            raise KeyError(name)
+        return self._text(self._entry(number))
+
+    def get_data(self, name):
+        """Return the (decoded) data of the entry with the given name or alias.
+
+        The data is given as stored in the entry file, i.e. an `OrderedDict`
+        with the entry name as its single key.
+        """
+        return json.loads(self.get_text(name), object_pairs_hook=OrderedDict)
+
+    def iter_texts(self):
+        """Iterate sequentially over all entries, as '(name, text)' pairs.
+        """
+        for ii in range(self._num_entries):
+            entry = self._entry(ii)
+            yield entry[3], self._text(entry)
+
+    def iter_paths(self):
+        """Iterate over all entries, as '(relative path, text)' pairs.
+        """
+        for ii in range(self._num_entries):
+            entry = self._entry(ii)
+            yield entry[4], self._text(entry)
+
+    def _entry(self, number):
+        """Return (blob offset, blob size, text size, name, path) of an entry.
+        """
+        (blob_off, blob_len, text_len,
+         name_off, name_len, path_off, path_len) = _ENTRY.unpack_from(
+             self._map, self._entries_offset + number * _ENTRY.size)
+        name = self._map[name_off:name_off + name_len].decode('utf-8')
+        path = self._map[path_off:path_off + path_len].decode('utf-8')
+        return blob_off, blob_len, text_len, name, path
+
+    def _key(self, index):
+        """Return the (bytes) key and entry number of index record `index`.
+        """
+        key_off, key_len, number, _ = _KEY.unpack_from(
+            self._map, self._index_offset + index * _KEY.size)
+        return self._map[key_off:key_off + key_len], number
+
+    def _text(self, entry):
+        blob = self._map[entry[0]:entry[0] + entry[1]]
+        if self.flags & FLAG_COMPRESSED:
+            blob = zlib.decompress(blob)
+        return blob.decode('utf-8')
+
+
+class _ArchiveWriter:
+    """Write the entries of a new archive, see `pack_catalog`.
+    """
+
+    def __init__(self, path, compress=False):
+        self.path = path
+        self.flags = FLAG_COMPRESSED if compress else 0
+        # Write to a temporary file, which replaces `path` when finished
+        self._temp_path = path + '.tmp'
+        self._file = open(self._temp_path, 'wb')
+        self._file.write(b'\0' * _HEADER.size)
+        self._entries = []
+        self._keys = []
+        return
+
+    def add(self, name, aliases, path, text):
+        blob = text.encode('utf-8')
+        text_len = len(blob)
+        if self.flags & FLAG_COMPRESSED:
+            blob = zlib.compress(blob)
+        number = len(self._entries)
+        self._entries.append((self._file.tell(), len(blob), text_len,
+                              name, path))
+        self._file.write(blob)
+
+        self._keys.append((name.encode('utf-8'), 0, number))
+        for alias in aliases:
+            if alias != name:
+                self._keys.append((alias.encode('utf-8'), 1, number))
+        return
+
+    def abort(self):
+        """Close and remove the incomplete archive.
+        """
+        self._file.close()
+        os.remove(self._temp_path)
+        return
+
+    def close(self):
+        """Write the entry table and index, and move the archive into place.
+        """
+        fout = self._file
+        strings = {}
+
+        def add_string(data):
+            if data not in strings:
+                strings[data] = fout.tell()
+                fout.write(data)
+            return strings[data], len(data)
+
+        entries = []
+        for blob_off, blob_len, text_len, name, path in self._entries:
+            name_off, name_len = add_string(name.encode('utf-8'))
+            path_off, path_len = add_string(path.encode('utf-8'))
+            entries.append((blob_off, blob_len, text_len, name_off, name_len,
+                            path_off, path_len))
+        self._keys.sort()
+        keys = []
+        for key, is_alias, number in self._keys:
+            key_off, key_len = add_string(key)
+            keys.append((key_off, key_len, number, is_alias))
+
+        entries_offset = fout.tell()
+        for entry in entries:
+            fout.write(_ENTRY.pack(*entry))
+        index_offset = fout.tell()
+        for key in keys:
+            fout.write(_KEY.pack(*key))
+
+        fout.seek(0)
+        fout.write(_HEADER.pack(MAGIC, VERSION, self.flags, len(entries),
+                                len(keys), entries_offset, index_offset))
+        fout.close()
+        os.replace(self._temp_path, self.path)
+        return
+
+
+def pack_catalog(catalog, path=None, compress=False):
+    """Pack all of the catalog's output entry files into a single archive.
+
+    Arguments
+    ---------
+    catalog : `astrocats.catalog.catalog.Catalog` (sub)class instance
+    path : str or 'None'
+        Filename of the archive, by default `ARCHIVE_FILENAME` in the
+        catalog's output directory.
+    compress : bool
+        Whether to compress each entry.
+
+    Returns
+    -------
+    path : str
+        Filename of the archive.
+
+    """
+    log = catalog.log
+    if path is None:
+        path = os.path.join(catalog.PATHS.PATH_OUTPUT, ARCHIVE_FILENAME)
+
+    files = catalog.PATHS.get_repo_output_file_list()
+    writer = _ArchiveWriter(path, compress=compress)
+    try:
+        for fname in pbar(files, 'Packing entries'):
+            text = read_text_file(fname)
+            name, aliases = get_entry_aliases(text, ENTRY.ALIAS,
+                                              QUANTITY.VALUE)
+            rel_path = os.path.relpath(fname, catalog.PATHS.PATH_OUTPUT)
+            writer.add(name, aliases, rel_path, text)
+    except:
+        writer.abort()
+        raise
+    writer.close()
+
+    log.warning("Packed {} entries into '{}' ({:.1f} MB).".format(
+        len(files), path, os.path.getsize(path) / 1024**2))
+    return path
+
+
+def unpack_catalog(catalog, path=None):
+    """Write the entry files stored in an archive back into the output repos.
+
+    Existing files are overwritten.
+
+    Returns
+    -------
+    num : int
+        The number of entry files written.
+
+    """
+    log = catalog.log
+    if path is None:
+        path = os.path.join(catalog.PATHS.PATH_OUTPUT, ARCHIVE_FILENAME)
+
+    num = 0
+    with CatalogArchive(path) as archive:
+        for rel_path, text in pbar(archive.iter_paths(), 'Unpacking entries',
+                                   total=len(archive)):
+            fname = os.path.join(catalog.PATHS.PATH_OUTPUT, rel_path)
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            if fname.endswith('.gz'):
+                with gzip.open(fname, 'wt', encoding='utf8') as fout:
+                    fout.write(text)
+            else:
+                with open(fname, 'w', encoding='utf8') as fout:
+                    fout.write(text)
+            num += 1
+
+    log.warning("Unpacked {} entries from '{}'.".format(num, path))
+    return num
@@ -25,6 +25,25 @@ class ArgsHandler:
             lysis = Analysis(catalog, self.log)
             # Pass the command-line arguments to run.
             lysis.analyze(args)
+        elif args.subcommand == 'pack':
+            self.log.info("Running 'pack'.")
+            from .archive import pack_catalog
+            pack_catalog(catalog, path=args.archive_path,
+                         compress=args.compress)
+        elif args.subcommand == 'unpack':
+            self.log.info("Running 'unpack'.")
+            from .archive import unpack_catalog
+            unpack_catalog(catalog, path=args.archive_path)
+        elif args.subcommand == 'export-photometry':
+            self.log.info("Running 'export-photometry'.")
+            from .export import PhotometryFilter, export_photometry
+            photo_filter = PhotometryFilter(
+                bands=args.bands, time_range=(args.time_min, args.time_max),
+                telescopes=args.telescopes)
+            export_photometry(catalog, path=args.export_path,
+                              photo_filter=photo_filter,
+                              chunk_size=args.chunk_size,
+                              num_procs=args.num_procs)
 
         return
 
@@ -57,6 +76,11 @@ class ArgsHandler:
         self._add_parser_arguments_push(subparsers)
         # Add the 'analyze' command, and related arguments
         self._add_parser_arguments_analyze(subparsers)
+        # Add the 'pack' and 'unpack' commands, and related arguments
+        self._add_parser_arguments_pack(subparsers)
+        self._add_parser_arguments_unpack(subparsers)
+        # Add the 'export-photometry' command, and related arguments
+        self._add_parser_arguments_export_photometry(subparsers)
 
         return parser
 
@@ -86,6 +110,25 @@ class ArgsHandler:
             '--refresh-list', '-rl', dest='refresh_list',
             default='', nargs='+',
             help='Space-delimited list of caches to clear.')
+        import_pars.add_argument(
+            '--sidecars', dest='sidecars',
+            default=False, action='store_true',
+            help='Also write binary sidecars with the numeric entry data.')
+        import_pars.add_argument(
+            '--deltas', dest='deltas',
+            default=False, action='store_true',
+            help='Record the data of each task in delta logs, which are '
+            'applied to the entries before the meta tasks.')
+        import_pars.add_argument(
+            '--store', dest='store', default='json',
+            choices=['json', 'sqlite'],
+            help='Storage of entries during the import; the entries are '
+            'exported to JSON files at the end (default: json).')
+        import_pars.add_argument(
+            '--trusted-load', dest='trusted_load',
+            default=False, action='store_true',
+            help='Load entries unchanged since this catalog saved them '
+            'without validating their data again.')
 
         # Control which 'tasks' are executed
         # ----------------------------------
@@ -133,5 +176,71 @@ class ArgsHandler:
             '--count', '-c', dest='count',
             default=False, action='store_true',
             help='Determine counts of entries, files, etc.')
+        lyze_pars.add_argument(
+            '--build-cache', '-b', dest='build_cache',
+            default=False, action='store_true',
+            help='Build the columnar cache of all entry quantities.')
 
         return lyze_pars
+
+    def _add_parser_arguments_pack(self, subparsers):
+        """Create a parser for the 'pack' subcommand.
+        """
+        pack_pars = subparsers.add_parser(
+            "pack",
+            help="Pack all entry files into a single, indexed archive file.")
+
+        pack_pars.add_argument(
+            '--path', '-p', dest='archive_path', default=None,
+            help='Filename of the archive (default: in the output directory).')
+        pack_pars.add_argument(
+            '--compress', '-c', dest='compress',
+            default=False, action='store_true',
+            help='Compress each entry within the archive.')
+
+        return pack_pars
+
+    def _add_parser_arguments_unpack(self, subparsers):
+        """Create a parser for the 'unpack' subcommand.
+        """
+        unpack_pars = subparsers.add_parser(
+            "unpack",
+            help="Write the entry files in an archive to the output "
+            "repositories.")
+
+        unpack_pars.add_argument(
+            '--path', '-p', dest='archive_path', default=None,
+            help='Filename of the archive (default: in the output directory).')
+
+        return unpack_pars
+
+    def _add_parser_arguments_export_photometry(self, subparsers):
+        """Create a parser for the 'export-photometry' subcommand.
+        """
+        export_pars = subparsers.add_parser(
+            "export-photometry",
+            help="Export the photometry of all entries into columnar files.")
+
+        export_pars.add_argument(
+            '--path', '-p', dest='export_path', default=None,
+            help='Output directory (default: in the output directory).')
+        export_pars.add_argument(
+            '--bands', dest='bands', nargs='+', default=None,
+            help='space delimited list of bands to include.')
+        export_pars.add_argument(
+            '--telescopes', dest='telescopes', nargs='+', default=None,
+            help='space delimited list of telescopes to include.')
+        export_pars.add_argument(
+            '--time-min', dest='time_min', type=float, default=None,
+            help='minimum time of the points to include.')
+        export_pars.add_argument(
+            '--time-max', dest='time_max', type=float, default=None,
+            help='maximum time of the points to include.')
+        export_pars.add_argument(
+            '--chunk-size', dest='chunk_size', type=int, default=100000,
+            help='maximum number of points in each output file.')
+        export_pars.add_argument(
+            '--procs', dest='num_procs', type=int, default=None,
+            help='number of processes (default: number of CPUs).')
+
+        return export_pars
@@ -12,12 +12,19 @@ from glob import glob
 
 import psutil
 from astrocats import __version__
-from astrocats.catalog.entry import ENTRY, Entry
-from astrocats.catalog.source import SOURCE
+from astrocats.catalog.delta import (DeltaEntry, DeltaLog, delta_log_path,
+                                     reduce_deltas)
+from astrocats.catalog.entry import ENTRY, Entry, EntryStub
+from astrocats.catalog.manifest import MANIFEST_FILENAME, EntryManifest
+from astrocats.catalog.quantity_cache import QuantityCache
+from astrocats.catalog.rejection import RejectionStats
+from astrocats.catalog.sidecar import write_sidecar
+from astrocats.catalog.source import SOURCE, SourceRegistry
+from astrocats.catalog.store import JsonFileStore, get_store
 from astrocats.catalog.task import Task
-from astrocats.catalog.utils import (compress_gz, is_integer, pbar,
-                                     read_json_dict, repo_priority,
-                                     uncompress_gz, uniq_cdl)
+from astrocats.catalog.utils import (compress_gz, get_json_backend,
+                                     is_integer, pbar, read_json_dict,
+                                     repo_priority, StringPool, uniq_cdl)
 from git import Repo
 from tqdm import tqdm
 
@@ -33,6 +40,8 @@ class Catalog:
     ADS_BIB_URL
     TRAVIS_QUERY_LIMIT
     COMPRESS_ABOVE_FILESIZE
+    ARRAY_SPECTRA
+    PHOTOMETRY_TABLES
 
     """
 
@@ -45,6 +54,10 @@ class Catalog:
 
     TRAVIS_QUERY_LIMIT = 10
     COMPRESS_ABOVE_FILESIZE = 90e6   # bytes
+    # Store spectral data in arrays (`SpectrumData`) instead of lists
+    ARRAY_SPECTRA = False
+    # Store photometry in columns (`PhotometryTable`) instead of lists
+    PHOTOMETRY_TABLES = False
 
     class PATHS:
         """Store and control catalog file-structure information.
@@ -170,6 +183,8 @@ class Catalog:
 
         # Instantiate PATHS
         self.PATHS = self.PATHS(self)
+        # Storage of saved entries (by default, JSON files in output repos)
+        self.store = get_store(self)
 
         # Load repos dictionary (required)
         self.repos_dict = read_json_dict(self.PATHS.REPOS_LIST)
@@ -178,6 +193,25 @@ class Catalog:
         # Create empty `entries` collection
         self.entries = OrderedDict()
         self.aliases = {}
+        # Canonical copies of the sources shared between entries
+        self.source_registry = SourceRegistry()
+        # Shared copies of frequently repeated strings (e.g. band names)
+        self.string_pool = StringPool()
+        # JSON library used to load and save entries (see `jsonbackend`)
+        self.json_backend = get_json_backend()
+        self.log.debug("Using JSON backend '{}'".format(
+            self.json_backend.NAME))
+        # Counts of data rejected (not added to entries) during each task
+        self.rejections = RejectionStats()
+        # Columnar cache of quantities, updated when entries are saved
+        self._quantity_cache = None
+        # Delta log of the current task, if recording deltas (see `delta`)
+        self.delta_log = None
+        # Hashes of the saved entries, for trusted loading (see `manifest`)
+        self.manifest = None
+        if getattr(args, 'trusted_load', False):
+            self.manifest = EntryManifest(os.path.join(
+                self.PATHS.PATH_OUTPUT, MANIFEST_FILENAME))
 
         # Only journal tasks with priorities greater than this number,
         # unless updating.
@@ -221,10 +255,17 @@ class Catalog:
         if self.args.delete_old:
             self.log.warning("Deleting all old entry files.")
             self.delete_old_entry_files()
+        # Start a new (non-file) store from the existing entry files
+        elif not self.store.WRITES_FILES and not len(self.store):
+            self.log.warning("Copying entry files into the entry store.")
+            self.store.copy_from(JsonFileStore(self))
 
         if self.args.travis:
             self.log.warning("Running in `travis` mode.")
 
+        # Data tasks record deltas, which are reduced before the meta tasks
+        reduced = not getattr(self.args, 'deltas', False)
+
         prev_priority = 0
         prev_task_name = ''
         # for task, task_obj in tasks_list.items():
@@ -248,6 +289,12 @@ class Catalog:
 
             self.log.debug("\t{}, {}, {}, {}".format(
                 nice_name, priority, mod_name, func_name))
+            if not reduced and priority < 0:
+                self.reduce_deltas(tasks_list)
+                reduced = True
+            if not reduced and task_obj.deltas:
+                self.delta_log = DeltaLog(delta_log_path(self, task_name))
+
             mod = importlib.import_module('.' + mod_name, package='astrocats')
             self.current_task = task_obj
             getattr(mod, func_name)(self)
@@ -255,18 +302,33 @@ class Catalog:
             num_events, num_stubs = self.count()
             self.log.warning("Task finished.  Events: {},  Stubs: {}".format(
                 num_events, num_stubs))
+            rejections = self.rejections.summary(task_obj.name)
+            if rejections is not None:
+                self.log.warning("Rejected data:\n{}".format(rejections))
             self.journal_entries()
             num_events, num_stubs = self.count()
             self.log.warning("Journal finished.  Events: {}, Stubs: {}".format(
                 num_events, num_stubs))
+            if self.delta_log is not None:
+                self.delta_log.close()
+                self.delta_log = None
 
             prev_priority = priority
             prev_task_name = task_name
 
+        if not reduced:
+            self.reduce_deltas(tasks_list)
+        if not self.store.WRITES_FILES:
+            self.export_entries()
+        self.store.close()
+
         process = psutil.Process(os.getpid())
         memory = process.memory_info().rss
         self.log.warning('Memory used (MBs): '
                          '{:,}'.format(memory / 1024. / 1024.))
+        self.log.warning('Distinct sources: {:,}, reused: {:,}'.format(
+            len(self.source_registry), self.source_registry.num_reused))
+        self.log.warning(self.string_pool.stats_str())
         return
 
     def load_task_list(self):
@@ -477,8 +539,10 @@ class Catalog:
 
         return
 
-    def load_entry_from_name(self, name, delete=True, merge=True):
-        loaded_entry = self.proto.init_from_file(self, name=name, merge=merge)
+    def load_entry_from_name(self, name, delete=True, merge=True,
+                             compact=False, lazy=False):
+        loaded_entry = self.proto.init_from_file(self, name=name, merge=merge,
+                                                 compact=compact, lazy=lazy)
         if loaded_entry is not None:
             self.entries[name] = loaded_entry
             self.log.debug(
@@ -503,6 +567,12 @@ class Catalog:
             `entries`
         """
         newname = self.clean_entry_name(name)
+        # When recording deltas, entries are only matched by their names
+        if self.delta_log is not None:
+            if newname not in self.entries:
+                self.entries[newname] = DeltaEntry(self, newname)
+            return newname
+
         # If entry already exists, return
         if newname in self.entries:
             self.log.debug(
@@ -543,18 +613,40 @@ class Catalog:
         self.entries[newname] = new_entry
         return newname
 
+    def reduce_deltas(self, tasks):
+        """Apply the delta logs of the data tasks to the entries.
+
+        See `astrocats.catalog.delta.reduce_deltas`.
+        """
+        self.log.warning("Reducing delta logs.")
+        num = reduce_deltas(self, tasks)
+        self.log.warning("Applied {} delta records.".format(num))
+        return num
+
     def delete_old_entry_files(self):
         if len(self.entries):
             err_str = "`delete_old_entry_files` with `entries` not empty!"
             self.log.error(err_str)
             raise RuntimeError(err_str)
-        # Delete all old entry JSON files
-        repo_files = self.PATHS.get_repo_output_file_list()
-        for rfil in pbar(repo_files, desc='Deleting old entries'):
-            os.remove(rfil)
-            self.log.debug("Deleted '{}'".format(os.path.split(rfil)[-1]))
+        # Delete all old stored entries (by default, the entry JSON files)
+        self.store.clear()
+        if self.manifest is not None:
+            self.manifest.clear()
         return
 
+    def export_entries(self):
+        """Write all entries in the `store` to the (canonical) JSON files.
+
+        Old entry files are deleted first, so that the output repositories
+        match the store exactly.  This is only needed when the `store` does
+        not already write the JSON files, e.g. for a `SQLiteStore`.
+        """
+        json_store = JsonFileStore(self)
+        json_store.clear()
+        num = json_store.copy_from(self.store)
+        self.log.warning("Exported {} entries to JSON files.".format(num))
+        return num
+
     def get_preferred_name(self, name):
         if name not in self.entries:
             # matches = []
@@ -605,6 +697,10 @@ class Catalog:
                               destentry[destentry._KEYS.NAME]))
         newsourcealiases = {}
 
+        # Lazily loaded sections refer to the current source aliases, so they
+        # are loaded before the aliases are removed below
+        fromentry._load_raw_sections()
+
         if self.proto._KEYS.SOURCES in fromentry:
             for source in fromentry[self.proto._KEYS.SOURCES]:
                 alias = source.pop(SOURCE.ALIAS)
@@ -770,17 +866,7 @@ class Catalog:
     def load_stubs(self):
         """
         """
-        currenttask = 'Loading entry stubs'
-        files = self.PATHS.get_repo_output_file_list()
-        for fi in pbar(files, currenttask):
-            fname = fi
-            # FIX: should this be ``fi.endswith(``.gz')`` ?
-            if '.gz' in fi:
-                fname = uncompress_gz(fi)
-            name = os.path.basename(
-                os.path.splitext(fname)[0]).replace('.json', '')
-            new_entry = self.proto.init_from_file(
-                self, path=fname, delete=False)
+        for name, stub in self.store.iter_stubs():
             # Make sure a non-stub entry doesnt already exist with this name
             if name in self.entries and not self.entries[name]._stub:
                 err_str = (
@@ -789,13 +875,13 @@ class Catalog:
                 self.log.error(err_str)
                 raise RuntimeError(err_str)
 
-            self.entries[name] = new_entry.get_stub()
+            self.entries[name] = stub
             self.log.debug("Added stub for '{}'".format(name))
 
         return self.entries
 
     def _delete_entry_file(self, entry_name=None, entry=None):
-        """Delete the file associated with the given entry.
+        """Delete the stored file (or record) of the given entry.
         """
         if entry_name is None and entry is None:
             raise RuntimeError("Either `entry_name` or `entry` must be given.")
@@ -807,29 +893,34 @@ class Catalog:
         else:
             entry_name = entry[ENTRY.NAME]
 
-        outdir, filename = entry._get_save_path()
-        # FIX: do we also need to check for gzipped files??
-        entry_filename = os.path.join(outdir, filename + '.json')
-        # entry_filename = entry.filename
-
         if self.args.write_entries:
-            self.log.info("Deleting entry file '{}' of entry '{}'".format(
+            entry_filename = self.store.delete_entry(entry)
+            self.log.info("Deleted entry file '{}' of entry '{}'".format(
                 entry_filename, entry_name))
-            if not os.path.exists(entry_filename):
-                self.log.error("Filename '{}' does not exist".format(
-                    entry_filename))
-            os.remove(entry_filename)
+            if self.manifest is not None and entry_filename is not None:
+                self.manifest.discard(entry_filename)
+            quantity_cache = self._get_quantity_cache()
+            if quantity_cache is not None:
+                quantity_cache.remove_entry(entry_name)
         else:
             self.log.debug("Not deleting '{}' because `write_entries`"
-                           " is False".format(entry_filename))
+                           " is False".format(entry_name))
 
         return
 
+    def _get_quantity_cache(self):
+        """Return the `QuantityCache` if it has been built, otherwise 'None'.
+        """
+        if self._quantity_cache is None:
+            cache = QuantityCache(self)
+            self._quantity_cache = cache if cache.exists() else False
+        return self._quantity_cache or None
+
     def should_bury(self, name):
         return (False, True)
 
     def journal_entries(self, clear=True, gz=False, bury=False,
-                        write_stubs=False, final=False):
+                        write_stubs=False, final=False, sidecars=None):
         """Write all entries in `entries` to files, and clear.  Depending on
         arguments and `tasks`.
 
@@ -837,7 +928,25 @@ class Catalog:
         and deleting.
         -   If ``clear == True``, then each element of `entries` is deleted,
             and a `stubs` entry is added
+        -   If ``write_stubs == True``, then entries which were constructed
+            as stubs (``Entry(..., stub=True)``) are also saved.  `EntryStub`
+            objects (e.g. from `Entry.get_stub` or `load_stubs`) are never
+            saved, even with `write_stubs`: they only hold the name and alias
+            strings (without their sources), and their files are unchanged.
+        -   If ``sidecars == True``, then a binary sidecar file with the
+            entry's numeric data is also written (or updated if stale), see
+            `astrocats.catalog.sidecar`.  By default, this is set by the
+            '--sidecars' command-line argument.
+        -   When recording deltas (`delta_log` is set), the records of all
+            entries are written to the delta log instead, see
+            `astrocats.catalog.delta`.
         """
+        if self.delta_log is not None:
+            self._journal_deltas()
+            return
+        if sidecars is None:
+            sidecars = getattr(self.args, 'sidecars', False)
+        quantity_cache = self._get_quantity_cache()
 
         # if (self.current_task.priority >= 0 and
         #        self.current_task.priority < self.min_journal_priority):
@@ -849,7 +958,10 @@ class Catalog:
         for name in list(self.entries.keys()):
             if self.args.write_entries:
                 # If this is a stub and we aren't writing stubs, skip
-                if self.entries[name]._stub and not write_stubs:
+                # (`EntryStub` objects have no data, and are never written)
+                if self.entries[name]._stub and (
+                        not write_stubs or
+                        isinstance(self.entries[name], EntryStub)):
                     continue
 
                 # Bury non-SN entries here if only claimed type is non-SN type,
@@ -864,7 +976,13 @@ class Catalog:
                                                         final=final)
                     self.log.info(
                         "Saved {} to '{}'.".format(name.ljust(20), save_name))
-                    if (gz and os.path.getsize(save_name) >
+                    if sidecars and self.store.WRITES_FILES:
+                        side_name = write_sidecar(save_name)
+                        self.log.debug("Wrote sidecar '{}'".format(side_name))
+                    if quantity_cache is not None:
+                        quantity_cache.update_entry(self.entries[name])
+                    if (gz and self.store.WRITES_FILES and
+                            os.path.getsize(save_name) >
                             self.COMPRESS_ABOVE_FILESIZE):
                         save_name = compress_gz(save_name)
                         self.log.debug("Compressed '{}' to '{}'".format(
@@ -881,6 +999,17 @@ class Catalog:
                 self.entries[name] = self.entries[name].get_stub()
                 self.log.debug("Entry for '{}' converted to stub".format(name))
 
+        self.store.flush()
+        if self.manifest is not None:
+            self.manifest.flush()
+        return
+
+    def _journal_deltas(self):
+        """Write the records of all `DeltaEntry` entries to the delta log.
+        """
+        for name in list(self.entries.keys()):
+            if isinstance(self.entries[name], DeltaEntry):
+                self.delta_log.write(self.entries.pop(name).records)
         return
 
     def entry_exists(self, name):
@@ -1,9 +1,13 @@
 """
 """
+import logging
 from collections import OrderedDict
+from collections.abc import MutableMapping
 
 from astrocats.catalog.key import KEY_TYPES, Key, KeyCollection
-from astrocats.catalog.utils import uniq_cdl
+from astrocats.catalog.rejection import REJECT, Rejection
+from astrocats.catalog.utils import (decimal_to_float, decode_decimal,
+                                     encode_decimal, uniq_cdl)
 
 
 class CatDictError(Exception):
@@ -58,6 +62,8 @@ class CatDict(OrderedDict):
         class (e.g. `Supernova`) which tries to construct the `CatDict` (e.g.
         `add_photometry`) should catch those errors specifically and deal
         with them appropriately.
+        Alternatively, `CatDict.create` returns a `Rejection` (with a reason
+        code) instead of raising, which is much faster for noisy data.
 
     """
 
@@ -74,8 +80,103 @@ class CatDict(OrderedDict):
 
     _REQ_KEY_SETS = []
 
+    # Additional cleaning functions applied to the values of specific keys,
+    # e.g. ``{PHOTOMETRY.BAND: bandrepf}``, after `_clean_value_for_key`.
+    _KEY_CLEANERS = {}
+
+    # Individually required keys (derived from `_REQ_KEY_SETS`), and the
+    # validation tables; set for each subclass by `_get_validators`.
+    _req_keys = []
+    _VALIDATORS = None
+    _UNKNOWN_VALIDATORS = {}
+
     def __init__(self, parent, key=None, **kwargs):
         super().__init__()
+        rejection = self._setup(parent, key=key, **kwargs)
+        if rejection is not None:
+            raise CatDictError(rejection.message, warn=rejection.warn)
+        return
+
+    @classmethod
+    def create(cls, parent, key=None, **kwargs):
+        """Construct a new instance, returning the reason if it is invalid.
+
+        Equivalent to ``cls(parent, key=key, **kwargs)``, but instead of
+        raising a `CatDictError` for invalid data, a `Rejection` is returned.
+
+        Returns
+        -------
+        cat_dict : `cls` object or 'None'
+            The new instance, or 'None' if it was rejected.
+        rejection : `Rejection` or 'None'
+            The reason for rejecting the given data, or 'None' if valid.
+
+        """
+        # Subclasses with their own constructors must be constructed normally
+        if cls.__init__ is not CatDict.__init__:
+            try:
+                return cls(parent, key=key, **kwargs), None
+            except CatDictError as err:
+                return None, Rejection.from_error(err)
+
+        cat_dict = cls.__new__(cls)
+        OrderedDict.__init__(cat_dict)
+        rejection = cat_dict._setup(parent, key=key, **kwargs)
+        if rejection is not None:
+            return None, rejection
+        return cat_dict, None
+
+    @classmethod
+    def _from_validated(cls, parent, key, items):
+        """Construct a new instance from already validated parameters.
+
+        No validation or cleaning is performed; `items` (a mapping) should
+        come from a previously constructed instance, e.g. as saved to a file
+        by `Entry.save` (see `Entry._add_validated_section`).  As in `_setup`,
+        the key strings are shared with the `Key`s, and string values are
+        pooled.
+
+        Returns
+        -------
+        cat_dict : `cls` object or 'None'
+            'None' only if the (fully constructed) data of a subclass with
+            its own constructor is rejected.
+
+        """
+        # Subclasses with their own constructors must be constructed normally
+        if cls.__init__ is not CatDict.__init__:
+            return cls.create(parent, key=key, **items)[0]
+
+        cat_dict = cls.__new__(cls)
+        OrderedDict.__init__(cat_dict)
+        cat_dict._parent = parent
+        cat_dict._key = key
+        cat_dict._log = parent.catalog.log
+        validators = cls._get_validators()
+        string_pool = parent.catalog.string_pool
+        for kk, value in items.items():
+            validator = validators.get(kk, None)
+            if validator is None:
+                cat_dict[string_pool.intern(kk)] = value
+                continue
+            if validator[4]:
+                value = string_pool.intern_value(value)
+            cat_dict[validator[0].name] = value
+        return cat_dict
+
+    def _setup(self, parent, key=None, **kwargs):
+        """Validate and store the given parameters.
+
+        Subclasses which need to process the stored values further should
+        override this method (instead of `__init__`), and return early if the
+        super method returns a `Rejection`.
+
+        Returns
+        -------
+        rejection : `Rejection` or 'None'
+            The reason the parameters are invalid, or 'None' if they are valid.
+
+        """
         # Store the parent object (an `Entry` subclass) to which this instance
         # will belong.  e.g. a `Supernova` entry.
         self._parent = parent
@@ -83,74 +184,142 @@ class CatDict(OrderedDict):
         self._log = parent.catalog.log
 
         # Store any individual keys which are required
-        self._req_keys = []
-        for rks in self._REQ_KEY_SETS:
-            # If this set is only 1 long, that key is individually required
-            if len(rks) == 1:
-                self._req_keys.append(rks[0])
-
-        # Iterate over all `_KEYS` parameters, load each if given note that the
-        # stored 'values' are the `Key` objects, referred to here with the name
-        # 'key'.
-        vals = self._KEYS.vals()
-        for key in kwargs.copy():
-            # If we allow unknown keys, or key is in list of known keys,
-            # process and store it.
-            kiv = key in vals
-            if self._ALLOW_UNKNOWN_KEYS or kiv:
-                # Load associated Key object if it exists, otherwise construct
-                # a default Key object.
-                if kiv:
-                    key_obj = vals[vals.index(key)]
-                else:
-                    self._log.warn('[{}] `{}` not in list of keys for `{}`, '
-                                   'adding anyway as allow unknown keys is '
-                                   '`{}`.'.format(
-                                       parent[parent._KEYS.NAME],
-                                       key, type(self).__name__,
-                                       self._ALLOW_UNKNOWN_KEYS))
-                    key_obj = Key(key)
-
-                # Handle Special Cases
-                # --------------------
-                # Only keep booleans and strings if they evaluate true.
-                if ((key_obj.type == KEY_TYPES.BOOL or
-                     key_obj.type == KEY_TYPES.STRING) and not kwargs[key]):
-                    del kwargs[key]
+        # `_REQ_KEY_SETS` can (in older subclasses) be set per instance
+        if '_REQ_KEY_SETS' in self.__dict__:
+            self._req_keys = [rks[0] for rks in self._REQ_KEY_SETS
+                              if len(rks) == 1]
+
+        # Iterate over all given parameters, validate and store each.
+        # The validators are constructed once per class, and contain the
+        # `Key` object (with specifications) for each allowed parameter.
+        validators = self._get_validators()
+        string_pool = parent.catalog.string_pool
+        unknown = OrderedDict()
+        for key, value in kwargs.items():
+            validator = validators.get(key, None)
+            if validator is None:
+                # If we dont allow unknown keys, these are an error (below)
+                if not self._ALLOW_UNKNOWN_KEYS:
+                    unknown[key] = value
                     continue
+                validator = self._get_unknown_key_validator(key)
+
+            key_obj, skip_empty, checker, cleaner, pooled = validator
 
-                # Make sure value is compatible with the 'Key' specification.
-                check_fail = False
-                if not key_obj.check(kwargs[key]):
-                    check_fail = True
+            # Handle Special Cases
+            # --------------------
+            # Only keep booleans and strings if they evaluate true.
+            if skip_empty and not value:
+                continue
+
+            # Make sure value is compatible with the 'Key' specification.
+            check_fail = False
+            if checker is not None and not checker(value):
+                check_fail = True
+                # Have the parent log a warning if this is a required key
+                if key in self._req_keys:
+                    return Rejection(
+                        REJECT.INVALID_VALUE,
+                        "Value for required key '{}' is invalid '{}'",
+                        key_obj.pretty(), value)
+                if self._log.isEnabledFor(logging.INFO):
                     self._log.info("Value for '{}' is invalid '{}'".format(
-                        key_obj.pretty(), kwargs[key]))
-                    # Have the parent log a warning if this is a required key
-                    if key in self._req_keys:
-                        raise CatDictError(
-                            "Value for required key '{}' is invalid "
-                            "'{}'".format(key_obj.pretty(), kwargs[key]),
-                            warn=True)
-
-                # Check and store values
-                # ----------------------
-                # Remove key-value pair from `kwargs` dictionary.
-                value = kwargs.pop(key)
-                value = self._clean_value_for_key(key_obj, value)
-                # only store values that are not empty
-                if value and not check_fail:
-                    self[key] = value
+                        key_obj.pretty(), value))
+
+            # Check and store values
+            # ----------------------
+            try:
+                if cleaner is None:
+                    value = self._clean_value_for_key(key_obj, value)
+                else:
+                    value = cleaner(value)
+            except CatDictError as err:
+                return Rejection.from_error(err, REJECT.BAD_VALUE)
+            # only store values that are not empty
+            if value and not check_fail:
+                # Share repeated strings (e.g. band names) using the catalog's
+                # pool
+                if pooled:
+                    value = string_pool.intern_value(value)
+                # The key string is shared with the `Key` (i.e. between all
+                # instances), instead of the given (e.g. decoded) string
+                self[key_obj.name] = value
 
         # If we require all parameters to be a key in `PHOTOMETRY`, then all
-        # elements should have been removed from `kwargs`.
-        if not self._ALLOW_UNKNOWN_KEYS and len(kwargs):
-            raise CatDictError(
-                "All permitted keys stored, remaining: '{}'".format(kwargs))
+        # other elements are unknown.
+        if len(unknown):
+            return Rejection(REJECT.UNKNOWN_KEY,
+                             "All permitted keys stored, remaining: '{}'",
+                             unknown)
 
         # Make sure that currently stored values are valid
-        self._check()
+        # Subclasses may still implement checks by overriding `_check`
+        if type(self)._check is not CatDict._check:
+            try:
+                self._check()
+            except (CatDictError, ValueError) as err:
+                return Rejection.from_error(err, REJECT.INCONSISTENT)
+            return None
+
+        return self._validate()
+
+    @classmethod
+    def _get_validators(cls):
+        """Get the validation table for the keys of this class.
+
+        The table is constructed only once for each `CatDict` subclass (and
+        stored in the class's own `_VALIDATORS` attribute), along with the
+        list of individually required keys `_req_keys`.
+
+        Returns
+        -------
+        validators : dict
+            Dictionary of
+            'key-name: (key, skip_empty, checker, cleaner, pooled)' values,
+            where `key` is the `Key` object, `skip_empty` is whether values
+            which evaluate false should be ignored, `checker` is the function
+            from `Key.get_checker`, `cleaner` is a specialized version of
+            `_clean_value_for_key` (or 'None', see `_make_validator`), and
+            `pooled` is whether values should be shared using the catalog's
+            `StringPool`.
 
-        return
+        """
+        # Use `__dict__` so that values from parent classes arent used
+        validators = cls.__dict__.get('_VALIDATORS', None)
+        if validators is not None:
+            return validators
+
+        validators = {}
+        for key in cls._KEYS.vals():
+            if isinstance(key, Key):
+                # The first matching key is used (as in `list.index`)
+                validators.setdefault(key.name, _make_validator(key, cls))
+
+        # Store any individual keys which are required
+        cls._req_keys = [rks[0] for rks in cls._REQ_KEY_SETS
+                         if len(rks) == 1]
+        cls._UNKNOWN_VALIDATORS = {}
+        cls._VALIDATORS = validators
+        return validators
+
+    def _get_unknown_key_validator(self, key):
+        """Get the validator for a key which is not in `_KEYS`.
+
+        A warning (with the entry name and key) is logged for each instance,
+        but the default `Key` object is constructed only the first time each
+        unknown key is encountered for this class.
+        """
+        self._log.warn('[{}] `{}` not in list of keys for `{}`, '
+                       'adding anyway as allow unknown keys is '
+                       '`{}`.'.format(
+                           self._parent[self._parent._KEYS.NAME],
+                           key, type(self).__name__,
+                           self._ALLOW_UNKNOWN_KEYS))
+        validator = self._UNKNOWN_VALIDATORS.get(key, None)
+        if validator is None:
+            validator = _make_validator(Key(key), type(self))
+            self._UNKNOWN_VALIDATORS[key] = validator
+        return validator
 
     def sort_func(self, key):
         return key
@@ -160,9 +329,46 @@ class CatDict(OrderedDict):
             type(self), self._key, self._parent)
         return retval
 
+    def compact(self):
+        """Return a `CompactRecord` copy of this object's keys and values.
+
+        The record has the same mapping interface (and `sort_func`,
+        `is_duplicate_of`, `append_sources_from` methods), but much lower
+        memory overhead.  It is not associated with a parent or `_key`.
+        """
+        return self._get_record_class()(self.items())
+
+    @classmethod
+    def _get_record_class(cls):
+        """Get the `CompactRecord` subclass corresponding to this class.
+
+        The record class is constructed once for each `CatDict` subclass, and
+        shares its `_KEYS` and comparison/sorting methods.
+        """
+        # Use `__dict__` so that the record classes of parents arent used
+        record_class = cls.__dict__.get('_RECORD_CLASS', None)
+        if record_class is not None:
+            return record_class
+
+        namespace = {
+            '__slots__': (),
+            '_CATDICT_TYPE': cls,
+            '_KEYS': cls._KEYS,
+            '_NUMERIC_KEYS': frozenset(
+                key.name for key in cls._KEYS.vals()
+                if isinstance(key, Key) and key.type == KEY_TYPES.NUMERIC),
+            '_REQ_KEY_SETS': cls._REQ_KEY_SETS,
+        }
+        for name in ['sort_func', 'is_duplicate_of', 'append_sources_from']:
+            namespace[name] = getattr(cls, name)
+        record_class = type(cls.__name__ + 'Record', (CompactRecord,),
+                            namespace)
+        cls._RECORD_CLASS = record_class
+        return record_class
+
     def is_duplicate_of(self, other):
         # If these are not the same type, return False
-        if type(other) is not type(self):
+        if _catdict_type(other) is not _catdict_type(self):
             return False
 
         # Go over all expected parameters and check equality of each
@@ -195,17 +401,33 @@ class CatDict(OrderedDict):
         return
 
     def _check(self):
+        """Raise a `CatDictError` if the stored values are invalid.
+
+        See `_validate`.
         """
+        rejection = self._validate()
+        if rejection is not None:
+            raise CatDictError(rejection.message, warn=rejection.warn)
+
+        return
+
+    def _validate(self):
+        """Check that the currently stored values are valid.
+
+        Returns
+        -------
+        rejection : `Rejection` or 'None'
+            The reason the values are invalid, or 'None' if they are valid.
+
         """
         for req_any in self._REQ_KEY_SETS:
             if not any([req_key in self for req_key in req_any]):
-                err_str = ("'{}' Requires one or more of: "
-                           .format(self._key) +
-                           ",".join("'{}'".format(rk) for rk in req_any))
-                self._log.info(err_str)
-                raise CatDictError(err_str)
+                return Rejection(
+                    REJECT.MISSING_REQUIRED,
+                    "'{}' Requires one or more of: {}", self._key,
+                    ",".join("'{}'".format(rk) for rk in req_any))
 
-        return
+        return None
 
     def _clean_value_for_key(self, key, value):
         """
@@ -247,4 +469,241 @@ class CatDict(OrderedDict):
         if single and len(value):
             value = value[0]
 
+        # Apply any additional, key-specific cleaning
+        if key.name in self._KEY_CLEANERS:
+            value = self._KEY_CLEANERS[key.name](value)
+
+        return value
+
+
+class _Layout:
+    """The (ordered) names of the keys stored in `CompactRecord` objects.
+
+    Layouts are shared between all records with the same keys (in the same
+    order), and the layouts resulting from adding or removing a key are cached.
+    """
+    __slots__ = ['names', 'index', '_added', '_removed']
+
+    # All layouts, keyed by their `names`
+    _LAYOUTS = {}
+
+    def __init__(self, names):
+        self.names = names
+        self.index = {name: ii for ii, name in enumerate(names)}
+        self._added = {}
+        self._removed = {}
+
+    @classmethod
+    def get(cls, names):
+        """Return the shared layout for the given tuple of `names`.
+        """
+        layout = cls._LAYOUTS.get(names, None)
+        if layout is None:
+            layout = cls(names)
+            cls._LAYOUTS[names] = layout
+        return layout
+
+    def add(self, name):
+        """Return the layout with `name` appended to these names.
+        """
+        layout = self._added.get(name, None)
+        if layout is None:
+            layout = _Layout.get(self.names + (name,))
+            self._added[name] = layout
+        return layout
+
+    def remove(self, name):
+        """Return the layout with `name` removed from these names.
+        """
+        layout = self._removed.get(name, None)
+        if layout is None:
+            layout = _Layout.get(
+                tuple(nn for nn in self.names if nn != name))
+            self._removed[name] = layout
+        return layout
+
+
+class CompactRecord(MutableMapping):
+    """Memory efficient, ordered mapping used to store `CatDict` data.
+
+    Each record only stores a shared `_Layout` (the key names) and a tuple of
+    values.  Records are constructed by `CatDict.compact`, which creates a
+    subclass of this class for each `CatDict` subclass (e.g. `Photometry`).
+
+    The (str) values of numeric keys are stored as single integers (see
+    `astrocats.catalog.utils.encode_decimal`) when they can be reproduced
+    exactly, and are converted back to the identical str when accessed.  Use
+    `get_float` or `get_raw` to access them without constructing strings.
+
+    Attributes
+    ----------
+    _CATDICT_TYPE : `CatDict` subclass
+        The type of the `CatDict` that this record represents.  Used for
+        comparisons between records and full `CatDict` objects.
+    _NUMERIC_KEYS : frozenset of str
+        Names of the numeric keys, whose values are encoded.
+
+    """
+    __slots__ = ['_layout', '_values']
+
+    _CATDICT_TYPE = CatDict
+    _KEYS = KeyCollection
+    _NUMERIC_KEYS = frozenset()
+
+    def __init__(self, items=()):
+        items = tuple(items)
+        self._layout = _Layout.get(tuple(kk for kk, vv in items))
+        self._values = tuple(self._encode(kk, vv) for kk, vv in items)
+
+    def _encode(self, key, value):
+        """Return the stored form of `value`, encoding numeric strings.
+        """
+        if key in self._NUMERIC_KEYS and isinstance(value, str):
+            packed = encode_decimal(value)
+            if packed is not None:
+                return packed
         return value
+
+    def __getitem__(self, key):
+        value = self._values[self._layout.index[key]]
+        if type(value) is int and key in self._NUMERIC_KEYS:
+            return decode_decimal(value)
+        return value
+
+    def __setitem__(self, key, value):
+        value = self._encode(key, value)
+        idx = self._layout.index.get(key, None)
+        if idx is None:
+            self._layout = self._layout.add(key)
+            self._values = self._values + (value,)
+        else:
+            self._values = (
+                self._values[:idx] + (value,) + self._values[idx + 1:])
+
+    def __delitem__(self, key):
+        idx = self._layout.index[key]
+        self._layout = self._layout.remove(key)
+        self._values = self._values[:idx] + self._values[idx + 1:]
+
+    def __iter__(self):
+        return iter(self._layout.names)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._layout.index
+
+    def get(self, key, default=None):
+        if key not in self._layout.index:
+            return default
+        return self[key]
+
+    def get_raw(self, key, default=None):
+        """Return the stored form of the value of `key`.
+
+        Values of numeric keys are integers if they were encoded, see
+        `astrocats.catalog.utils.encode_decimal`.
+        """
+        idx = self._layout.index.get(key, None)
+        if idx is None:
+            return default
+        return self._values[idx]
+
+    def get_float(self, key, default=None):
+        """Return the value of `key` as a float.
+
+        Encoded numeric values are converted without constructing or parsing
+        their strings.
+        """
+        value = self.get_raw(key, None)
+        if value is None:
+            return default
+        if type(value) is int and key in self._NUMERIC_KEYS:
+            return decimal_to_float(value)
+        return float(value)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, list(self.items()))
+
+    def sort_func(self, key):
+        return key
+
+
+def _catdict_type(obj):
+    """Return the `CatDict` type of `obj`, for full, compact or row forms.
+
+    Compact records and table rows (e.g. `PhotometryRow`) give the type that
+    they represent with a `_CATDICT_TYPE` attribute.
+    """
+    return getattr(obj, '_CATDICT_TYPE', None) or type(obj)
+
+
+def _make_validator(key, cls=None):
+    """Construct the validation entry for the given `Key`.
+
+    See `CatDict._get_validators`.  If the `CatDict` subclass `cls` is given,
+    and it uses the standard `CatDict._clean_value_for_key` method, then a
+    specialized cleaning function is included.  Otherwise the cleaning
+    function is 'None', and the class's method should be used.
+    """
+    skip_empty = (key.type == KEY_TYPES.BOOL or key.type == KEY_TYPES.STRING)
+    cleaner = None
+    if (cls is not None and
+            cls._clean_value_for_key is CatDict._clean_value_for_key):
+        cleaner = _make_cleaner(key, cls._KEY_CLEANERS.get(key.name, None))
+    pooled = (key.type == KEY_TYPES.STRING)
+    return (key, skip_empty, key.get_checker(), cleaner, pooled)
+
+
+def _make_cleaner(key, extra=None):
+    """Construct a function equivalent to `CatDict._clean_value_for_key`.
+
+    The returned function is specialized for the given `Key`, and applies the
+    additional cleaning function `extra` (if given) afterwards.  Empty
+    (cleaned) values are returned as empty strings instead of empty lists.
+    """
+    def not_list_error(value):
+        return CatDictError("`value` '{}' for '{}' shouldnt be a list.".format(
+            value, key.pretty()))
+
+    def not_bool_error(value):
+        return CatDictError("`value` '{}' for '{}' should be boolean".format(
+            value, key.pretty()))
+
+    listable = key.listable
+    if key.type is None:
+        def cleaner(value):
+            return value
+
+    elif key.type == KEY_TYPES.BOOL:
+        def cleaner(value):
+            if isinstance(value, list):
+                if not listable:
+                    raise not_list_error(value)
+                if not all(isinstance(val, bool) for val in value):
+                    raise not_bool_error(value)
+            elif not isinstance(value, bool):
+                raise not_bool_error([value])
+            return value
+
+    elif key.type in [KEY_TYPES.STRING, KEY_TYPES.NUMERIC]:
+        def cleaner(value):
+            if isinstance(value, list):
+                if not listable:
+                    raise not_list_error(value)
+                # Clean whitespace, only keep values that are not empty
+                value = [str(val).strip() for val in value]
+                return [val for val in value if len(val)]
+            return str(value).strip()
+
+    else:
+        return None
+
+    if extra is None:
+        return cleaner
+
+    def extra_cleaner(value):
+        return extra(cleaner(value))
+
+    return extra_cleaner
@@ -0,0 +1,236 @@
+"""Append-only 'delta' records of the data added to entries by each task.
+
+When importing with '--deltas', the data (positive priority) tasks do not
+modify entries directly.  Instead, `Catalog.add_entry` creates a
+`DeltaEntry` for each entry, which records each call to its `add_*` methods
+(`add_source`, `add_quantity`, `add_alias`, `add_photometry`,
+`add_spectrum`, `add_error`).  When journaled, the records are appended to
+the task's `DeltaLog` file (one JSON list per line:
+'[entry name, method, source reference, kwargs]').
+
+Sources are referred to by references that are local to each log: the
+'source' arguments of the records contain the references returned by
+`DeltaEntry.add_source`, which `reduce_deltas` maps to the actual source
+aliases of each entry.
+
+After the data tasks have run, `reduce_deltas` applies the logs of all tasks
+(including those which were not re-run) in task priority order to the
+entries, which are then journaled as usual.  Because each task only writes
+its own log, tasks are independent of each other, and a single task can be
+re-run without re-running all of the others.
+
+Tasks run in this mode should only use the `add_*` methods of entries, and
+not read any of their other data.  Tasks which do read the entry data are
+marked with 'deltas: false' in 'tasks.json', and always modify the entries
+directly.  All of the recorded values must be JSON serializable, otherwise
+`DeltaLog.write` raises a `TypeError`.
+"""
+import json
+import os
+from collections import OrderedDict
+
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.source import SOURCE
+
+DELTAS_DIRNAME = 'deltas'
+DELTA_SUFFIX = '.jsonl'
+# Recorded `Entry` methods whose 'source' argument holds local references
+_SOURCE_METHODS = ['add_quantity', 'add_alias', 'add_photometry',
+                   'add_spectrum']
+
+
+class DeltaLog:
+    """Append-only file of the delta records of one task.
+
+    Arguments
+    ---------
+    path : str
+        Filename of the log.  Existing logs are replaced.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._num_refs = 0
+        self._file = None
+        return
+
+    def new_ref(self):
+        """Return a new local source reference (str), unique in this log.
+        """
+        self._num_refs += 1
+        return str(self._num_refs)
+
+    def write(self, records):
+        """Append the given '[name, method, ref, kwargs]' records to the log.
+        """
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'w', encoding='utf8')
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return
+
+    def close(self):
+        """Close the log file, creating it (empty) if nothing was written.
+        """
+        self.write([])
+        self._file.close()
+        self._file = None
+        return
+
+
+class DeltaEntry:
+    """Records the data added to an entry (see module docstring).
+
+    Only the name and aliases of the entry are available.
+    """
+
+    __slots__ = ['catalog', 'name', 'records', '_aliases', '_sources']
+
+    _stub = False
+    _KEYS = ENTRY
+
+    def __init__(self, catalog, name):
+        self.catalog = catalog
+        self.name = name
+        self.records = []
+        self._aliases = []
+        # '(kwargs, local reference)' of each (distinct) source
+        self._sources = []
+        return
+
+    def __repr__(self):
+        return "{}(name='{}', records={})".format(
+            type(self).__name__, self.name, len(self.records))
+
+    def __getitem__(self, key):
+        if key == self._KEYS.NAME:
+            return self.name
+        raise KeyError(key)
+
+    def get_aliases(self, includename=True):
+        aliases = list(self._aliases)
+        if includename and self.name not in aliases:
+            aliases = [self.name] + aliases
+        return aliases
+
+    def add_source(self, allow_alias=False, **kwargs):
+        """Record a source, returning its local reference.
+
+        As in `Source.is_duplicate_of`, sources which share any of the
+        compared parameters (e.g. bibcode) are the same.
+        """
+        for other, ref in self._sources:
+            if any(key in kwargs and key in other and kwargs[key] == other[key]
+                   for key in SOURCE.compare_vals()):
+                return ref
+        ref = self.catalog.delta_log.new_ref()
+        self._sources.append((kwargs, ref))
+        kwargs = dict(kwargs, allow_alias=allow_alias)
+        self.records.append([self.name, 'add_source', ref, kwargs])
+        return ref
+
+    def add_self_source(self):
+        return self.add_source(
+            bibcode=self.catalog.OSC_BIBCODE,
+            name=self.catalog.OSC_NAME,
+            url=self.catalog.OSC_URL, secondary=True)
+
+    def add_quantity(self, quantity, value, source, check_for_dupes=True,
+                     **kwargs):
+        if quantity == self._KEYS.ALIAS and value not in self._aliases:
+            self._aliases.append(value)
+        kwargs.update(quantity=quantity, value=value, source=source,
+                      check_for_dupes=check_for_dupes)
+        self._record('add_quantity', kwargs)
+        return True
+
+    def add_alias(self, alias, source, clean=True):
+        self._record('add_alias', dict(alias=alias, source=source,
+                                       clean=clean))
+        if clean:
+            alias = self.catalog.clean_entry_name(alias)
+        if alias not in self._aliases:
+            self._aliases.append(alias)
+        return alias
+
+    def add_error(self, value, **kwargs):
+        kwargs.update(value=value)
+        self._record('add_error', kwargs)
+        return True
+
+    def add_photometry(self, **kwargs):
+        self._record('add_photometry', kwargs)
+        return True
+
+    def add_spectrum(self, **kwargs):
+        self._record('add_spectrum', kwargs)
+        return True
+
+    def _record(self, method, kwargs):
+        self.records.append([self.name, method, None, kwargs])
+        return
+
+
+def delta_log_path(catalog, task_name):
+    """Return the filename of the delta log of the task `task_name`.
+    """
+    return os.path.join(catalog.PATHS.PATH_OUTPUT, DELTAS_DIRNAME,
+                        task_name + DELTA_SUFFIX)
+
+
+def read_deltas(path):
+    """Yield the '[name, method, ref, kwargs]' records in the log `path`.
+    """
+    with open(path, 'r', encoding='utf8') as fin:
+        for line in fin:
+            if line.strip():
+                yield json.loads(line, object_pairs_hook=OrderedDict)
+
+
+def reduce_deltas(catalog, tasks):
+    """Apply the delta logs of all `tasks` (in order) to the catalog entries.
+
+    Arguments
+    ---------
+    catalog : `astrocats.catalog.catalog.Catalog` (sub)class instance
+    tasks : OrderedDict of `astrocats.catalog.task.Task`
+        All tasks, in priority order.  The logs of tasks with negative
+        priorities (i.e. the 'meta' tasks), of tasks which do not record
+        deltas, or without logs, are skipped.
+
+    Returns
+    -------
+    num : int
+        The number of records applied.
+
+    """
+    num = 0
+    for task_name, task_obj in tasks.items():
+        path = delta_log_path(catalog, task_name)
+        if ((task_obj.priority < 0 or not task_obj.deltas or
+             not os.path.isfile(path))):
+            continue
+        catalog.log.warning("Reducing deltas of '{}'".format(task_name))
+        catalog.current_task = task_obj
+        # Actual source alias of each local reference
+        aliases = {}
+        for name, method, ref, kwargs in read_deltas(path):
+            name = catalog.add_entry(name)
+            entry = catalog.entries[name]
+            num += 1
+            if method == 'add_source':
+                aliases[ref] = entry.add_source(**kwargs)
+                continue
+            if method in _SOURCE_METHODS and kwargs.get('source') is not None:
+                kwargs['source'] = ','.join(
+                    aliases[rr] for rr in str(kwargs['source']).split(',')
+                    if aliases.get(rr, None) is not None)
+            if method == 'add_quantity':
+                # Restore the `Key` (with its type) of the quantity name
+                kwargs['quantity'] = entry._KEYS.get_key_by_name(
+                    kwargs['quantity'])
+            getattr(entry, method)(**kwargs)
+        catalog.journal_entries()
+    return num
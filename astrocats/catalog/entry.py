@@ -1,19 +1,24 @@
 """
 """
-import codecs
-import json
+import hashlib
+import logging
 import os
 from collections import OrderedDict
 
-from astrocats.catalog.catdict import CatDict, CatDictError
+from astrocats.catalog.catdict import CatDict, CompactRecord
 from astrocats.catalog.error import ERROR, Error
 from astrocats.catalog.key import KEY_TYPES, Key, KeyCollection
-from astrocats.catalog.photometry import Photometry
+from astrocats.catalog.photometry import (Photometry, PhotometryRow,
+                                          PhotometryTable)
 from astrocats.catalog.quantity import QUANTITY, Quantity
+from astrocats.catalog.rejection import REJECT, Rejection
 from astrocats.catalog.source import SOURCE, Source
-from astrocats.catalog.spectrum import SPECTRUM, Spectrum
-from astrocats.catalog.utils import (alias_priority, dict_to_pretty_string,
-                                     is_integer, is_number)
+from astrocats.catalog.spectrum import SPECTRUM, Spectrum, SpectrumData
+from astrocats.catalog.utils import (JSONStreamEncoder, RawJSON,
+                                     alias_priority, dict_to_pretty_string,
+                                     is_integer, is_number,
+                                     scan_entry_sections,
+                                     scan_indented_sections)
 from cdecimal import Decimal
 
 
@@ -48,6 +53,11 @@ class ENTRY(KeyCollection):
     VELOCITY = Key('velocity', KEY_TYPES.NUMERIC)
 
 
+# Mappings which are converted to (key-sorted) `OrderedDict`s by
+# `Entry._ordered`.  Plain `dict`s (e.g. added by tasks) are kept as they are
+_ORDERED_TYPES = (OrderedDict, CompactRecord)
+
+
 class Entry(OrderedDict):
     """Class representing an individual element of each Catalog.
 
@@ -62,8 +72,20 @@ class Entry(OrderedDict):
         which are known to exist (e.g. have already been saved) for cross
         referencing and duplicate removal.
         +   The `Entry.get_stub` method returns the 'stub' corresponding to the
-            Entry instance.  i.e. it returns a *new object* with only the name
-            and aliases copied over.
+            Entry instance.  i.e. it returns a *new* `EntryStub` object with
+            only the name and aliases copied over.
+    -   Lazy entries: when loaded with `lazy=True` (see `init_from_file`), the
+        (large) sections listed in `_LAZY_SECTIONS` are stored as their raw
+        JSON text (`RawJSON`), and are only decoded and validated when they
+        are accessed (e.g. ``entry[ENTRY.PHOTOMETRY]``, `get`, `setdefault`,
+        `items`, `values`).  Sections which are never accessed are saved
+        verbatim.
+    -   Trusted loading: with the catalog's `manifest` (the '--trusted-load'
+        import argument), files which are unchanged since this catalog saved
+        them are loaded without validating their data again, see
+        `_add_validated_section`.  Their sections in `_LAZY_SECTIONS` are
+        also loaded lazily (as above), so that they are saved verbatim
+        unless they are accessed.
 
     Attributes
     ----------
@@ -73,8 +95,26 @@ class Entry(OrderedDict):
         If this entry is loaded from a file, its (full path and) filename.
     _log : `logging.Logger` object
         Pointer to the logger from the parent catalog.
+    _error_index : dict of sets
+        Lookup table of the values of all stored `Error`s, keyed by the
+        (`ERROR.EXTRA`, `ERROR.KIND`) pair, e.g. ``('redshift', 'bibcode')``.
+        See `_get_error_index`.
+    _source_indices : dict of dicts
+        Lookup tables from source parameters to the position of the
+        corresponding `Source` in the `SOURCES` list.  Keyed by `SOURCE.ALIAS`
+        and by each of the `SOURCE` keys used for duplicate comparison (e.g.
+        `SOURCE.NAME` and `SOURCE.BIBCODE`).  See `_get_source_indices`.
     _stub : bool
         Whether this instance represents a 'stub' (see above).
+    _compact : bool
+        Whether `CatDict` data (e.g. `Photometry`) is stored as compact,
+        read-mostly `CompactRecord` objects after validation.  This greatly
+        reduces memory usage, e.g. when loading a full catalog for analysis.
+    _lazy : bool
+        Whether the sections in `_LAZY_SECTIONS` are loaded lazily (see
+        above).
+    _trusted : bool
+        Whether this entry was loaded from a trusted file (see above).
     _KEYS : `astrocats.catalog.key.KeyCollection` object
         The associated object which contains the different dictionary keys
         used in this type (e.g. `Supernova`) entry.
@@ -82,8 +122,9 @@ class Entry(OrderedDict):
     """
 
     _KEYS = ENTRY
+    _LAZY_SECTIONS = [ENTRY.PHOTOMETRY, ENTRY.SPECTRA]
 
-    def __init__(self, catalog, name, stub=False):
+    def __init__(self, catalog, name, stub=False, compact=False):
         """Create a new `Entry` object with the given `name`.
 
         Arguments
@@ -94,6 +135,8 @@ class Entry(OrderedDict):
             The name of this entry, e.g. `SN1987A` for a `Supernova` entry.
         stub : bool
             Whether or not this instance represents a 'stub' (see above).
+        compact : bool
+            Whether to store data in the compact form (see `_compact`).
 
         """
         super().__init__()
@@ -102,9 +145,43 @@ class Entry(OrderedDict):
         self.dupe_of = []
         self._log = catalog.log
         self._stub = stub
+        self._compact = compact
+        self._lazy = False
+        self._lazy_clean = False
+        self._trusted = False
+        self._rebuild_source_indices()
+        self._rebuild_error_index()
         self[self._KEYS.NAME] = name
         return
 
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if type(value) is RawJSON:
+            self._load_section(key, value)
+            value = super().__getitem__(key)
+        return value
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        if type(value) is RawJSON:
+            self._load_section(key, value)
+            value = super().get(key, default)
+        return value
+
+    def setdefault(self, key, default=None):
+        value = super().get(key, None)
+        if type(value) is RawJSON:
+            self._load_section(key, value)
+        return super().setdefault(key, default)
+
+    def items(self):
+        self._load_raw_sections()
+        return super().items()
+
+    def values(self):
+        self._load_raw_sections()
+        return super().values()
+
     def __repr__(self):
         """Return JSON representation of self
         """
@@ -133,26 +210,150 @@ class Entry(OrderedDict):
 
         return outdir, filename
 
+    def _get_error_index(self):
+        """Return the error lookup table, rebuilding it if out of date.
+        """
+        errors = self.get(self._KEYS.ERRORS, [])
+        if len(errors) != self._num_indexed_errors:
+            self._rebuild_error_index()
+        return self._error_index
+
+    def _rebuild_error_index(self):
+        """Construct the error lookup table from the stored `ERRORS`.
+        """
+        self._error_index = {}
+        self._num_indexed_errors = 0
+        for err in self.get(self._KEYS.ERRORS, []):
+            self._index_error(err)
+        return
+
+    def _index_error(self, err):
+        """Add the given error (the last in `ERRORS`) to the lookup table.
+        """
+        index_key = (err.get(ERROR.EXTRA), err.get(ERROR.KIND))
+        try:
+            self._error_index.setdefault(index_key, set()).add(
+                err[ERROR.VALUE])
+        except TypeError:
+            # Unhashable values can never match a source parameter
+            pass
+        self._num_indexed_errors += 1
+        return
+
+    def _get_source_indices(self):
+        """Return the source lookup tables, rebuilding them if out of date.
+
+        The tables map values of `SOURCE.ALIAS` and of each comparison key of
+        `SOURCE` to the position of the first matching source in the `SOURCES`
+        list.  If the number of stored sources no longer matches the number
+        indexed (e.g. the list was replaced or modified directly), the tables
+        are rebuilt from scratch.
+        """
+        sources = self.get(self._KEYS.SOURCES, [])
+        if len(sources) != self._num_indexed_sources:
+            self._rebuild_source_indices()
+        return self._source_indices
+
+    def _rebuild_source_indices(self):
+        """Construct the source lookup tables from the stored `SOURCES`.
+        """
+        self._source_indices = {SOURCE.ALIAS: {}}
+        for key in SOURCE.compare_vals():
+            self._source_indices[key] = {}
+        self._num_indexed_sources = 0
+        for source in self.get(self._KEYS.SOURCES, []):
+            self._index_source(source)
+        return
+
+    def _index_source(self, source):
+        """Add the given source (the last in `SOURCES`) to the lookup tables.
+        """
+        pos = self._num_indexed_sources
+        for key, index in self._source_indices.items():
+            if key in source:
+                # Only the first matching source is used for lookups
+                index.setdefault(source[key], pos)
+        self._num_indexed_sources += 1
+        return
+
+    def _find_source(self, key, value):
+        """Find the first source with the given `value` for `key`, or 'None'.
+        """
+        pos = self._get_source_indices().get(key, {}).get(value)
+        # The tables are kept up to date as sources are added, so a miss
+        # means that there is no such source
+        if pos is None:
+            return None
+        # Sources modified in-place will invalidate the tables, in which case
+        # the lookup is repeated after rebuilding them.
+        if self[self._KEYS.SOURCES][pos].get(key) != value:
+            self._rebuild_source_indices()
+            pos = self._source_indices.get(key, {}).get(value)
+            if pos is None:
+                return None
+        return self[self._KEYS.SOURCES][pos]
+
+    def _find_duplicate_source(self, source_obj):
+        """Find an existing source which `source_obj` is a duplicate of.
+
+        Equivalent to checking `Source.is_duplicate_of` against each stored
+        source, in order, but using the lookup tables.  Returns 'None' if no
+        duplicate is found.
+        """
+        indices = self._get_source_indices()
+        dupe_pos = None
+        for key in source_obj._KEYS.compare_vals():
+            if key not in source_obj or key not in indices:
+                continue
+            pos = indices[key].get(source_obj[key])
+            if pos is not None and (dupe_pos is None or pos < dupe_pos):
+                dupe_pos = pos
+
+        if dupe_pos is None:
+            return None
+        dupe = self[self._KEYS.SOURCES][dupe_pos]
+        # Make sure tables are still valid, otherwise fall back to full check
+        if not source_obj.is_duplicate_of(dupe):
+            self._rebuild_source_indices()
+            for item in self.get(self._KEYS.SOURCES, []):
+                if source_obj.is_duplicate_of(item):
+                    return item
+            return None
+        return dupe
+
     def _ordered(self, odict):
         """Convert the object into a plain OrderedDict.
         """
         ndict = OrderedDict()
 
-        if isinstance(odict, CatDict) or isinstance(odict, Entry):
+        if isinstance(odict, (CatDict, CompactRecord, PhotometryRow, Entry)):
             key = odict.sort_func
         else:
             key = None
 
         nkeys = list(sorted(odict.keys(), key=key))
         for key in nkeys:
-            if isinstance(odict[key], OrderedDict):
+            # Sections which were never loaded are written verbatim
+            if isinstance(odict, Entry):
+                raw = odict._get_raw_section(key)
+                if raw is not None:
+                    ndict[key] = raw
+                    continue
+            # Array-backed data is written in the standard list format
+            if isinstance(odict[key], SpectrumData):
+                ndict[key] = odict[key].tolist()
+                continue
+            if isinstance(odict[key], PhotometryTable):
+                ndict[key] = [self._ordered(row) for row in odict[key]]
+                continue
+            if isinstance(odict[key], _ORDERED_TYPES):
                 odict[key] = self._ordered(odict[key])
             if isinstance(odict[key], list):
                 if (not (odict[key] and
-                         not isinstance(odict[key][0], OrderedDict))):
+                         not isinstance(odict[key][0], _ORDERED_TYPES))):
                     nlist = []
                     for item in odict[key]:
-                        if isinstance(item, OrderedDict):
+                        if isinstance(item, _ORDERED_TYPES):
                             nlist.append(self._ordered(item))
                         else:
                             nlist.append(item)
@@ -188,15 +389,56 @@ class Entry(OrderedDict):
 
         return True
 
-    def _load_data_from_json(self, fhand, clean=False, merge=True):
+    def _load_data_from_json(self, fhand, clean=False, merge=True,
+                             text=None):
         """FIX: check for overwrite??
+
+        If the JSON `text` is given (e.g. read from the catalog's
+        `EntryStore`), `fhand` is only used as its location.
+
+        If the text is what this catalog last saved to `fhand` (see
+        `astrocats.catalog.manifest`), each section of the text is decoded
+        separately (see `_decode_sections`), and its items are not validated
+        again (see `_add_validated_section`).
         """
         self._log.debug("_load_data_from_json(): {}\n\t{}".format(
             self.name(), fhand))
         # Store the filename this was loaded from
         self.filename = fhand
-        with open(fhand, 'r') as jfil:
-            data = json.load(jfil, object_pairs_hook=OrderedDict)
+        if text is None:
+            with open(fhand, 'r') as jfil:
+                text = jfil.read()
+
+        # Files last written by this catalog were validated when saved
+        manifest = self.catalog.manifest
+        self._trusted = (not clean and manifest is not None and
+                         manifest.is_trusted(fhand, text))
+
+        raw_sections = OrderedDict()
+        sections = None
+        data = None
+        if self._trusted:
+            try:
+                name, sections = self._decode_sections(text)
+            except ValueError:
+                # Let the full decoder handle (and report) unexpected text
+                self._log.debug("Cannot decode '{}' by sections.".format(
+                    fhand))
+                self._trusted = False
+        if sections is None and self._lazy:
+            try:
+                name, data, raw_sections = self._split_lazy_sections(
+                    text, clean=clean)
+            except ValueError:
+                # Let the full decoder handle (and report) unexpected text
+                self._log.debug("Cannot load '{}' lazily.".format(fhand))
+
+        if sections is None and data is None:
+            # Share the key strings between all loaded entries; the items of
+            # the sections can be plain `dict`s (see `_split_lazy_sections`)
+            data = self.catalog.json_backend.loads(
+                text, object_pairs_hook=self.catalog.string_pool.odict_hook,
+                dict_levels=0 if clean else 4)
             name = list(data.keys())
             if len(name) != 1:
                 raise ValueError("json file '{}' has multiple keys: {}".format(
@@ -204,12 +446,20 @@ class Entry(OrderedDict):
             name = name[0]
             # Remove the outmost dict level
             data = data[name]
-            self._log.debug("Name: {}".format(name))
+        self._log.debug("Name: {}".format(name))
 
-            # Convert the OrderedDict data from json into class structure i.e.
-            # `Sources` will be extracted and created from the dict Everything
-            # that remains afterwards should be okay to just store to this
-            # `Entry`
+        self._lazy_clean = clean
+        if sections is not None:
+            for key, items in sections.items():
+                if type(items) is RawJSON:
+                    raw_sections[key] = items
+                else:
+                    self._add_validated_section(key, items)
+        else:
+            # Convert the OrderedDict data from json into class structure
+            # i.e. `Sources` will be extracted and created from the dict
+            # Everything that remains afterwards should be okay to just store
+            # to this `Entry`
             self._convert_odict_to_classes(data, clean=clean, merge=merge)
             if len(data):
                 err_str = ("Remaining entries in `data` after "
@@ -218,6 +468,10 @@ class Entry(OrderedDict):
                 self._log.error(err_str)
                 raise RuntimeError(err_str)
 
+        # Store the unprocessed sections, decoded when they are accessed
+        for key, raw in raw_sections.items():
+            self[key] = raw
+
         # If object doesnt have a name yet, but json does, store it
         self_name = self[ENTRY.NAME]
         if len(self_name) == 0:
@@ -230,6 +484,129 @@ class Entry(OrderedDict):
         self.check()
         return
 
+    def _decode_sections(self, text):
+        """Decode each section of the trusted JSON `text` of an entry (see
+        `_trusted`), in the order in which they are added (see
+        `_section_order`).
+
+        Trusted text has the known layout of saved entries, and its sections
+        are located by `scan_indented_sections`.  The sections in
+        `_LAZY_SECTIONS` are not decoded.  Objects are decoded as
+        `OrderedDict`s, except for the items of the sections, which may be
+        plain `dict`s (see `JSONBackend.loads`).
+
+        Returns
+        -------
+        name : str
+            The name of the entry in the file.
+        sections : OrderedDict
+            The decoded data (or `RawJSON`) of each section.
+
+        Raises
+        ------
+        ValueError
+            If the sections of the text cannot be located.
+
+        """
+        backend = self.catalog.json_backend
+        name, spans = scan_indented_sections(text, _EntryEncoder.INDENT)
+        sections = OrderedDict()
+        for key in self._section_order(spans.keys()):
+            start, end = spans[key]
+            if key in self._LAZY_SECTIONS:
+                sections[key] = RawJSON(text[start:end])
+            else:
+                sections[key] = backend.loads(
+                    text[start:end], object_pairs_hook=OrderedDict,
+                    dict_levels=2)
+        return name, sections
+
+    def _split_lazy_sections(self, text, clean=False):
+        """Decode the JSON `text` of an entry, except for the lazy sections.
+
+        Unless the data is cleaned (see `clean_internal`), the items of the
+        sections may be decoded as plain `dict`s (see `JSONBackend.loads`),
+        as they are only passed to the `CatDict` constructors.
+
+        Returns
+        -------
+        name : str
+            The name of the entry in the file.
+        data : OrderedDict
+            The decoded data, excluding the sections in `_LAZY_SECTIONS`.
+        raw_sections : OrderedDict
+            `RawJSON` text of each of the lazy sections.
+
+        Raises
+        ------
+        ValueError
+            If the text does not contain a single JSON object of objects.
+
+        """
+        string_pool = self.catalog.string_pool
+        name, sections = scan_entry_sections(text)
+        backend = self.catalog.json_backend
+        data = OrderedDict()
+        raw_sections = OrderedDict()
+        for key, (start, end) in sections.items():
+            key = string_pool.intern(key)
+            if key in self._LAZY_SECTIONS:
+                raw_sections[key] = RawJSON(text[start:end])
+            else:
+                data[key] = backend.loads(
+                    text[start:end], object_pairs_hook=string_pool.odict_hook,
+                    dict_levels=0 if clean else 2)
+        return name, data, raw_sections
+
+    def _get_raw_section(self, key):
+        """Return the `RawJSON` of the section `key` if it is not loaded.
+        """
+        value = super().get(key, None)
+        if type(value) is RawJSON:
+            return value
+        return None
+
+    def _load_raw_sections(self):
+        """Decode and add the data of all lazily loaded sections.
+        """
+        for key in list(self.keys()):
+            raw = self._get_raw_section(key)
+            if raw is not None:
+                self._load_section(key, raw)
+        return
+
+    def _load_section(self, key, raw):
+        """Decode and add the data of a lazily loaded section (see `_lazy`).
+
+        The items are added to an empty section, which replaces the raw text
+        in place, so that the order of the keys does not change (the entry
+        may be iterated over while its sections are loaded, e.g. by
+        `Catalog.copy_entry_to_entry`).
+        """
+        self._log.debug("Loading section '{}' of '{}'".format(
+            key, self.name()))
+        if key == self._KEYS.PHOTOMETRY and self.catalog.PHOTOMETRY_TABLES:
+            super().__setitem__(key, PhotometryTable(Photometry))
+        else:
+            super().__setitem__(key, [])
+        backend = self.catalog.json_backend
+        if self._trusted:
+            self._add_validated_section(key, backend.loads(
+                raw.text, object_pairs_hook=OrderedDict, dict_levels=2))
+        else:
+            # Cleaned items are passed to `clean_internal` as `OrderedDict`s
+            items = backend.loads(
+                raw.text, dict_levels=0 if self._lazy_clean else 2,
+                object_pairs_hook=self.catalog.string_pool.odict_hook)
+            self._convert_odict_to_classes(OrderedDict([(key, items)]),
+                                           clean=self._lazy_clean)
+        # As when loading the entry fully, there is no section if all of its
+        # items were rejected
+        section = super().get(key, None)
+        if section is not None and not len(section):
+            super().__delitem__(key)
+        return
+
     def _convert_odict_to_classes(self, data, clean=False, merge=True):
         """Convert an OrderedDict into an Entry class or its derivative
         classes.
@@ -237,17 +614,10 @@ class Entry(OrderedDict):
         self._log.debug("_convert_odict_to_classes(): {}".format(self.name()))
         self._log.debug("This should be a temporary fix.  Dont be lazy.")
 
-        # Handle 'name'
-        name_key = self._KEYS.NAME
-        if name_key in data:
-            self[name_key] = data.pop(name_key)
-
-        # Handle 'schema'
-        schema_key = self._KEYS.SCHEMA
-        if schema_key in data:
-            # Schema should be re-added every execution (done elsewhere) so
-            # just delete the old entry
-            data.pop(schema_key)
+        # Handle 'name' and 'schema'
+        for key in [self._KEYS.NAME, self._KEYS.SCHEMA]:
+            if key in data:
+                self._add_section(key, data.pop(key))
 
         # Cleanup 'internal' repository stuff
         if clean:
@@ -256,110 +626,179 @@ class Entry(OrderedDict):
             # stuff can be handled normally
             data = self.clean_internal(data)
 
-        # Handle 'sources'
-        # ----------------
-        src_key = self._KEYS.SOURCES
-        if src_key in data:
-            # Remove from `data`
-            sources = data.pop(src_key)
-            self._log.debug("Found {} '{}' entries".format(
-                len(sources), src_key))
-            self._log.debug("{}: {}".format(src_key, sources))
-
-            for src in sources:
+        for key in self._section_order(list(data.keys())):
+            self._add_section(key, data.pop(key), merge=merge)
+
+        return
+
+    def _section_order(self, keys):
+        """Return the section `keys` in the order they should be added.
+
+        The name and sources come first, then `photometry`, `spectra` and
+        `errors`, followed by all other sections (assumed to be `Quantity`s)
+        in their given order.
+        """
+        first = [self._KEYS.NAME, self._KEYS.SCHEMA, self._KEYS.SOURCES,
+                 self._KEYS.PHOTOMETRY, self._KEYS.SPECTRA, self._KEYS.ERRORS]
+        keys = list(keys)
+        return ([key for key in first if key in keys] +
+                [key for key in keys if key not in first])
+
+    def _add_section(self, key, items, merge=True):
+        """Add the decoded `items` of the section `key` to this entry.
+
+        The section key selects the `CatDict` class of the items: `Source`,
+        `Photometry`, `Spectrum` and `Error` for their sections, and
+        `Quantity` for all others.
+        """
+        if key == self._KEYS.NAME:
+            self[key] = items
+            return
+        # Schema should be re-added every execution (done elsewhere) so
+        # just ignore the old entry
+        if key == self._KEYS.SCHEMA:
+            return
+
+        # All quantities should be in lists of that quantity
+        #    E.g. `aliases` is a list of alias quantities
+        if not isinstance(items, list):
+            items = [items]
+        self._log.debug("Found {} '{}' entries".format(len(items), key))
+
+        if key == self._KEYS.SOURCES:
+            for src in items:
                 self.add_source(allow_alias=True, **src)
-            # data['sources'] = newsources
-            # self.setdefault(src_key, []).extend(newsources)
-
-        # Handle `photometry`
-        # -------------------
-        photo_key = self._KEYS.PHOTOMETRY
-        if photo_key in data:
-            photoms = data.pop(photo_key)
-            self._log.debug("Found {} '{}' entries".format(
-                len(photoms), photo_key))
-            for photo in photoms:
-                self._add_cat_dict(Photometry,
-                                   self._KEYS.PHOTOMETRY, **photo)
-
-        # Handle `spectra`
-        # ---------------
-        spec_key = self._KEYS.SPECTRA
-        if spec_key in data:
+        elif key == self._KEYS.PHOTOMETRY:
+            for photo in items:
+                self._add_cat_dict(Photometry, key, **photo)
+        elif key == self._KEYS.SPECTRA:
             # When we are cleaning internal data, we don't always want to
             # require all of the normal spectrum data elements.
-            spectra = data.pop(spec_key)
-            self._log.debug("Found {} '{}' entries".format(
-                len(spectra), spec_key))
-            for spec in spectra:
-                self._add_cat_dict(Spectrum, self._KEYS.SPECTRA,
-                                   **spec)
-
-        # Handle `error`
-        # --------------
-        err_key = self._KEYS.ERRORS
-        if err_key in data:
-            errors = data.pop(err_key)
-            self._log.debug("Found {} '{}' entries".format(
-                len(errors), err_key))
-            for err in errors:
-                self._add_cat_dict(Error, self._KEYS.ERRORS, **err)
-
-        # Handle everything else --- should be `Quantity`s
-        # ------------------------------------------------
-        if len(data):
-            self._log.debug("{} remaining entries, assuming `Quantity`".format(
-                len(data)))
-            # Iterate over remaining keys
-            for key in list(data.keys()):
-                vals = data.pop(key)
-                # All quantities should be in lists of that quantity
-                #    E.g. `aliases` is a list of alias quantities
-                if not isinstance(vals, list):
-                    vals = [vals]
-                self._log.debug("{}: {}".format(key, vals))
-                for vv in vals:
-                    self._add_cat_dict(Quantity, key, check_for_dupes=merge,
-                                       **vv)
-
-                if merge and self.dupe_of:
-                    self.merge_dupes()
+            for spec in items:
+                self._add_cat_dict(Spectrum, key, **spec)
+        elif key == self._KEYS.ERRORS:
+            for err in items:
+                self._add_cat_dict(Error, key, **err)
+        else:
+            for vv in items:
+                self._add_cat_dict(Quantity, key, check_for_dupes=merge,
+                                   **vv)
+            if merge and self.dupe_of:
+                self.merge_dupes()
+        return
 
+    def _add_validated_section(self, key, items):
+        """Add the `items` of the section `key` from a trusted file.
+
+        Like `_add_section`, but the items were already validated and
+        sanitized when the file was saved, so the `CatDict`s are constructed
+        without validation (see `CatDict._from_validated`), and without
+        checking their sources or for duplicates.  Only the lookup tables
+        (the source indices and the catalog's `aliases`) are rebuilt.
+        """
+        if key == self._KEYS.NAME:
+            self[key] = items
+            return
+        if key == self._KEYS.SCHEMA:
+            return
+        if not isinstance(items, list):
+            items = [items]
+
+        if key == self._KEYS.SOURCES:
+            cat_dict_class = Source
+        elif key == self._KEYS.PHOTOMETRY:
+            cat_dict_class = Photometry
+        elif key == self._KEYS.SPECTRA:
+            cat_dict_class = Spectrum
+        elif key == self._KEYS.ERRORS:
+            cat_dict_class = Error
+        else:
+            cat_dict_class = Quantity
+        new_items = []
+        for item in items:
+            new_entry = cat_dict_class._from_validated(self, key, item)
+            if new_entry is not None:
+                new_items.append(new_entry)
+
+        if key == self._KEYS.ALIAS:
+            name = self[self._KEYS.NAME]
+            for alias in new_items:
+                self.catalog.aliases[alias[QUANTITY.VALUE]] = name
+
+        if key == self._KEYS.PHOTOMETRY and self.catalog.PHOTOMETRY_TABLES:
+            self.setdefault(key, PhotometryTable(cat_dict_class)).extend(
+                new_items)
+            return
+        if self._compact:
+            new_items = [new_entry.compact() for new_entry in new_items]
+        self.setdefault(key, []).extend(new_items)
+        if key == self._KEYS.SOURCES:
+            self._rebuild_source_indices()
         return
 
     def _check_cat_dict_source(self, cat_dict_class, key_in_self, **kwargs):
         """Check that a source exists and that a quantity isn't erroneous.
+
+        Returns
+        -------
+        source : str or 'None'
+            The source aliases, or 'None' if the data should not be added; in
+            which case the rejection is recorded with `_reject`.
+
         """
         # Make sure that a source is given
         source = kwargs.get(cat_dict_class._KEYS.SOURCE, None)
         if source is None:
-            raise CatDictError("{}: `source` must be provided!".format(
-                self[self._KEYS.NAME]), warn=True)
+            self._reject(key_in_self, Rejection(
+                REJECT.NO_SOURCE, "{}: `source` must be provided!",
+                self[self._KEYS.NAME]))
+            return None
         # Check that source is a list of integers
         for x in source.split(','):
             if not is_integer(x):
-                raise CatDictError("{}: `source` is comma-delimited list of "
-                                   " integers!".format(self[self._KEYS.NAME]),
-                                   warn=True)
+                self._reject(key_in_self, Rejection(
+                    REJECT.BAD_SOURCE,
+                    "{}: `source` is comma-delimited list of  integers!",
+                    self[self._KEYS.NAME]))
+                return None
         # If this source/data is erroneous, skip it
         if self.is_erroneous(key_in_self, source):
-            self._log.info("This source is erroneous, skipping")
+            self._reject(key_in_self, Rejection(
+                REJECT.ERRONEOUS, "This source is erroneous, skipping"))
             return None
         return source
 
     def _init_cat_dict(self, cat_dict_class, key_in_self, **kwargs):
         """Initialize a CatDict object, checking for errors.
         """
-        # Catch errors associated with crappy, but not unexpected data
-        try:
-            new_entry = cat_dict_class(self, key=key_in_self, **kwargs)
-        except CatDictError as err:
-            if err.warn:
-                self._log.info("'{}' Not adding '{}': '{}'".format(
-                    self[self._KEYS.NAME], key_in_self, str(err)))
+        # Sources are shared between entries, use the catalog registry
+        if issubclass(cat_dict_class, Source):
+            new_entry, rejection = self.catalog.source_registry.new_source(
+                cat_dict_class, self, key=key_in_self, **kwargs)
+        else:
+            new_entry, rejection = cat_dict_class.create(
+                self, key=key_in_self, **kwargs)
+
+        # Record rejections of crappy, but not unexpected data
+        if rejection is not None:
+            self._reject(key_in_self, rejection)
             return None
         return new_entry
 
+    def _reject(self, key_in_self, rejection):
+        """Record (and log) the rejection of data for `key_in_self`.
+
+        Rejections are counted for the current task in the catalog's
+        `rejections` (`RejectionStats`).
+        """
+        task = getattr(self.catalog, 'current_task', None)
+        task_name = getattr(task, 'name', None)
+        self.catalog.rejections.add(task_name, key_in_self, rejection)
+        if rejection.warn and self._log.isEnabledFor(logging.INFO):
+            self._log.info("'{}' Not adding '{}': '{}'".format(
+                self[self._KEYS.NAME], key_in_self, rejection.message))
+        return
+
     def _add_cat_dict(self, cat_dict_class, key_in_self, check_for_dupes=True,
                       **kwargs):
         """Add a CatDict to this Entry if initialization succeeds and it
@@ -367,15 +806,8 @@ class Entry(OrderedDict):
         """
         # Make sure that a source is given, and is valid (nor erroneous)
         if cat_dict_class != Error:
-            try:
-                source = self._check_cat_dict_source(
-                    cat_dict_class, key_in_self, **kwargs)
-            except CatDictError as err:
-                if err.warn:
-                    self._log.info("'{}' Not adding '{}': '{}'".format(
-                        self[self._KEYS.NAME], key_in_self, str(err)))
-                return False
-
+            source = self._check_cat_dict_source(
+                cat_dict_class, key_in_self, **kwargs)
             if source is None:
                 return False
 
@@ -385,13 +817,19 @@ class Entry(OrderedDict):
             return False
 
         # Compare this new entry with all previous entries to make sure is new
+        items = self.get(key_in_self, None)
         if cat_dict_class != Error:
-            for item in self.get(key_in_self, []):
-                if new_entry.is_duplicate_of(item):
-                    item.append_sources_from(new_entry)
-                    # Return the entry in case we want to use any additional
-                    # tags to augment the old entry
-                    return new_entry
+            if isinstance(items, PhotometryTable):
+                dupe = items.find_duplicate(new_entry)
+                dupes = [] if dupe is None else [dupe]
+            else:
+                dupes = (item for item in items or []
+                         if new_entry.is_duplicate_of(item))
+            for item in dupes:
+                item.append_sources_from(new_entry)
+                # Return the entry in case we want to use any additional
+                # tags to augment the old entry
+                return new_entry
 
         # If this is an alias, add it to the parent catalog's reverse
         # dictionary linking aliases to names for fast lookup.
@@ -408,7 +846,21 @@ class Entry(OrderedDict):
             self.catalog.aliases[new_entry[
                 QUANTITY.VALUE]] = self[self._KEYS.NAME]
 
-        self.setdefault(key_in_self, []).append(new_entry)
+        if (items is None and key_in_self == self._KEYS.PHOTOMETRY and
+                self.catalog.PHOTOMETRY_TABLES):
+            items = PhotometryTable(cat_dict_class)
+            self[key_in_self] = items
+        if isinstance(items, PhotometryTable):
+            items.append(new_entry)
+        else:
+            if self._compact:
+                new_entry = new_entry.compact()
+            self.setdefault(key_in_self, []).append(new_entry)
+
+        # Keep the error lookup table up to date, if it is already current
+        if (key_in_self == self._KEYS.ERRORS and
+                self._num_indexed_errors == len(self[key_in_self]) - 1):
+            self._index_error(new_entry)
 
         if (key_in_self == self._KEYS.ALIAS and
                 check_for_dupes and self.dupe_of):
@@ -425,11 +877,12 @@ class Entry(OrderedDict):
 
     @classmethod
     def init_from_file(cls, catalog, name=None, path=None, clean=False,
-                       merge=True):
+                       merge=True, compact=False, lazy=False):
         """Construct a new `Entry` instance from an input file.
 
-        The input file can be given explicitly by `path`, or a path will
-        be constructed appropriately if possible.
+        The input file can be given explicitly by `path`, otherwise the
+        entry `name` is read from the catalog's `EntryStore` (by default, a
+        file in one of the 'output' repositories).
 
         Arguments
         ---------
@@ -437,8 +890,8 @@ class Entry(OrderedDict):
             The parent catalog object of which this entry belongs.
         name : str or 'None'
             The name of this entry, e.g. `SN1987A` for a `Supernova` entry.
-            If no `path` is given, a path is constructed by trying to find
-            a file in one of the 'output' repositories with this `name`.
+            If no `path` is given, the entry with this `name` is read from
+            the catalog's `EntryStore`.
             note: either `name` or `path` must be provided.
         path : str or 'None'
             The absolutely path of the input file.
@@ -447,6 +900,16 @@ class Entry(OrderedDict):
             Whether special sanitization processing should be done on the input
             data.  This is mostly for input files from the 'internal'
             repositories.
+        compact : bool
+            Whether to store the loaded data in the compact form, see
+            `Entry._compact`.
+        lazy : bool
+            Whether to defer loading the large sections (e.g. photometry)
+            until they are accessed, see `Entry._lazy`.
+
+        Files which this catalog saved, and which are unchanged since, are
+        loaded without validating their data again (unless `clean` is
+        'True'), see `Entry._add_validated_section`.
 
         """
         catalog.log.debug("init_from_file()")
@@ -458,28 +921,28 @@ class Entry(OrderedDict):
                              "specified, not both.")
 
         # If the path is given, use that to load from
-        load_path = ''
+        text = None
         if path is not None:
             load_path = path
             name = ''
-        # If the name is given, try to find a path for it
+            if not os.path.isfile(load_path):
+                return None
+        # If the name is given, try to find it in the catalog's store
         else:
-            repo_paths = catalog.PATHS.get_repo_output_folders()
-            for rep in repo_paths:
-                filename = cls.get_filename(name)
-                newpath = os.path.join(rep, filename + '.json')
-                if os.path.isfile(newpath):
-                    load_path = newpath
-                    break
-
-        if load_path is None or not os.path.isfile(load_path):
-            # FIX: is this warning worthy?
-            return None
+            stored = catalog.store.read(name)
+            if stored is None:
+                # FIX: is this warning worthy?
+                return None
+            text, load_path = stored
 
         # Create a new `Entry` instance
         new_entry = cls(catalog, name)
+        # Set directly, in case subclasses don't accept a `compact` argument
+        new_entry._compact = compact
+        new_entry._lazy = lazy
         # Fill it with data from json file
-        new_entry._load_data_from_json(load_path, clean=clean, merge=merge)
+        new_entry._load_data_from_json(load_path, clean=clean, merge=merge,
+                                       text=text)
 
         return new_entry
 
@@ -566,11 +1029,14 @@ class Entry(OrderedDict):
         if source_obj is None:
             return None
 
-        for item in self.get(self._KEYS.SOURCES, ''):
-            if source_obj.is_duplicate_of(item):
-                return item[item._KEYS.ALIAS]
+        dupe = self._find_duplicate_source(source_obj)
+        if dupe is not None:
+            return dupe[dupe._KEYS.ALIAS]
 
+        if self._compact:
+            source_obj = source_obj.compact()
         self.setdefault(self._KEYS.SOURCES, []).append(source_obj)
+        self._index_source(source_obj)
         return source_obj[source_obj._KEYS.ALIAS]
 
     def add_spectrum(self, **kwargs):
@@ -600,6 +1066,8 @@ class Entry(OrderedDict):
                 del self[spec_key][si]
                 break
 
+        if self._compact:
+            new_spectrum = new_spectrum.compact()
         self.setdefault(spec_key, []).append(new_spectrum)
         return
 
@@ -613,7 +1081,7 @@ class Entry(OrderedDict):
         if (self._KEYS.NAME not in self or
                 len(self[self._KEYS.NAME]) == 0):
             raise ValueError("Entry name is empty:\n\t{}".format(
-                json.dumps(self, indent=2)))
+                dict_to_pretty_string(self)))
         return
 
     def clean_internal(self, data=None):
@@ -674,17 +1142,17 @@ class Entry(OrderedDict):
             The source object corresponding to the passed alias.
 
         """
-        for source in self.get(self._KEYS.SOURCES, []):
-            if source[self._KEYS.ALIAS] == alias:
-                return source
+        source = self._find_source(SOURCE.ALIAS, alias)
+        if source is not None:
+            return source
         raise ValueError(
             "Source '{}': alias '{}' not found!".format(
                 self[self._KEYS.NAME], alias))
 
     def get_stub(self):
-        """Get a new `Entry` which contains the 'stub' of this one.
+        """Get a new `EntryStub` which contains the 'stub' of this one.
 
-        The 'stub' is only the name and aliases.
+        The 'stub' is only the name, aliases and filename.
 
         Usage:
         -----
@@ -694,30 +1162,24 @@ class Entry(OrderedDict):
 
         Returns
         -------
-        stub : `astrocats.catalog.entry.Entry` subclass object
-            The type of the returned object is this instance's type.
+        stub : `astrocats.catalog.entry.EntryStub` object
 
         """
-        stub = type(self)(self.catalog, self[self._KEYS.NAME], stub=True)
-        if self._KEYS.ALIAS in self:
-            stub[self._KEYS.ALIAS] = self[self._KEYS.ALIAS]
-        return stub
+        return EntryStub(self.catalog, self[self._KEYS.NAME],
+                         aliases=self.get_aliases(includename=False),
+                         filename=self.filename)
 
     def is_erroneous(self, field, sources):
         if self._KEYS.ERRORS in self:
-            my_errors = self[self._KEYS.ERRORS]
+            error_index = self._get_error_index()
+            bib_err_values = error_index.get((field, SOURCE.BIBCODE), ())
+            name_err_values = error_index.get((field, SOURCE.NAME), ())
             for alias in sources.split(','):
                 source = self.get_source_by_alias(alias)
-                bib_err_values = [err[ERROR.VALUE] for err in my_errors
-                                  if err[ERROR.KIND] == SOURCE.BIBCODE and
-                                  err[ERROR.EXTRA] == field]
                 if (SOURCE.BIBCODE in source and source[SOURCE.BIBCODE] in
                         bib_err_values):
                     return True
 
-                name_err_values = [err[ERROR.VALUE] for err in my_errors
-                                   if err[ERROR.KIND] == SOURCE.NAME and
-                                   err[ERROR.EXTRA] == field]
                 if (SOURCE.NAME in source and
                         source[SOURCE.NAME] in name_err_values):
                     return True
@@ -773,10 +1235,15 @@ class Entry(OrderedDict):
             source_aliases = [x[SOURCE.ALIAS] for
                               x in self[self._KEYS.SOURCES]]
             source_list = []
+            no_source_names = self._KEYS.no_source_names()
             for key in self:
-                # if self._KEYS.get_key_by_name(key).no_source:
-                if (key in [self._KEYS.NAME, self._KEYS.SCHEMA,
-                            self._KEYS.SOURCES, self._KEYS.ERRORS]):
+                if key in no_source_names:
+                    continue
+                # Don't load lazy sections just to find their sources
+                raw = self._get_raw_section(key)
+                if raw is not None:
+                    for item in raw.decode():
+                        source_list += item[QUANTITY.SOURCE].split(',')
                     continue
                 for item in self[key]:
                     source_list += item[item._KEYS.SOURCE].split(',')
@@ -794,9 +1261,13 @@ class Entry(OrderedDict):
                 del self[self._KEYS.SOURCES]
 
             self[self._KEYS.SOURCES] = new_sources
+            self._rebuild_source_indices()
 
     def save(self, bury=False, final=False):
-        """Write entry to JSON file in the proper location.
+        """Write entry JSON to the catalog's `EntryStore`.
+
+        By default (`JsonFileStore`), this is a JSON file in the proper
+        location.
 
         Arguments
         ---------
@@ -807,26 +1278,19 @@ class Entry(OrderedDict):
             cleaning operations.
 
         """
-        outdir, filename = self._get_save_path(bury=bury)
-
         if final:
             self.sanitize()
 
-        # FIX: use 'dump' not 'dumps'
-        jsonstring = json.dumps({self[self._KEYS.NAME]: self._ordered(self)},
-                                indent='\t', separators=(',', ':'),
-                                ensure_ascii=False)
-        if not os.path.isdir(outdir):
-            raise RuntimeError("Output directory '{}' for event '{}' does "
-                               "not exist.".format(outdir,
-                                                   self[self._KEYS.NAME]))
-        save_name = os.path.join(outdir, filename + '.json')
-        with codecs.open(save_name, 'w', encoding='utf8') as sf:
-            sf.write(jsonstring)
-
-        if not os.path.exists(save_name):
-            raise RuntimeError("File '{}' was not saved!".format(save_name))
-
+        # The JSON text is written in chunks, as it is produced
+        chunks = _EntryEncoder(self.catalog.json_backend).iter_entry(self)
+        manifest = self.catalog.manifest
+        if manifest is not None:
+            # Record the hash of the written text, for trusted loading
+            text_hash = hashlib.sha1()
+            chunks = _hash_chunks(chunks, text_hash)
+        save_name = self.catalog.store.write_entry(self, chunks, bury=bury)
+        if manifest is not None:
+            manifest.record(save_name, text_hash.hexdigest())
         return save_name
 
     def set_preferred_name(self):
@@ -850,3 +1314,180 @@ class Entry(OrderedDict):
         if key == self._KEYS.SPECTRA:
             return 'zzz'
         return key
+
+
+class EntryStub:
+    """Compact representation of an `Entry` which is known, but not loaded.
+
+    Stubs only store the entry's name, aliases (as strings) and filename, and
+    are used (in `Catalog.entries`) to cross-reference entries and find
+    duplicates.  The full `Entry` is loaded (replacing the stub) when needed,
+    e.g. by `Catalog.add_entry`.  Stubs cannot be saved.
+
+    Attributes
+    ----------
+    catalog : `astrocats.catalog.catalog.Catalog` object
+        Pointer to the parent catalog object of which this entry is a member.
+    name : str
+        The name of the entry.
+    aliases : tuple of str
+        The aliases of the entry (not including the name, unless it is also
+        stored as an alias).
+    filename : str or 'None'
+        If the entry was loaded from a file, its (full path and) filename.
+
+    """
+    __slots__ = ['catalog', 'name', 'aliases', 'filename']
+
+    _stub = True
+    _KEYS = ENTRY
+
+    def __init__(self, catalog, name, aliases=(), filename=None):
+        self.catalog = catalog
+        self.name = name
+        self.aliases = tuple(aliases)
+        self.filename = filename
+        return
+
+    def __repr__(self):
+        return "{}(name='{}', aliases={})".format(
+            type(self).__name__, self.name, list(self.aliases))
+
+    def __contains__(self, key):
+        if key == self._KEYS.NAME:
+            return True
+        if key == self._KEYS.ALIAS:
+            return len(self.aliases) > 0
+        return False
+
+    def __getitem__(self, key):
+        """Only the `ENTRY.NAME` and `ENTRY.ALIAS` items are available.
+
+        Aliases are returned as a list of mappings with only the
+        `QUANTITY.VALUE` item (i.e. without their sources).
+        """
+        if key == self._KEYS.NAME:
+            return self.name
+        if key == self._KEYS.ALIAS and self.aliases:
+            return [OrderedDict([(QUANTITY.VALUE, alias)])
+                    for alias in self.aliases]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def get_aliases(self, includename=True):
+        """Retrieve the aliases of this object as a list of strings.
+
+        See `Entry.get_aliases`.
+        """
+        aliases = list(self.aliases)
+        if includename and self.name not in aliases:
+            aliases = [self.name] + aliases
+        return aliases
+
+    def extra_aliases(self):
+        """Use the (possibly overridden) `extra_aliases` of the catalog's entry
+        type.
+        """
+        return self.catalog.proto.extra_aliases(self)
+
+    def get_entry_text(self, fname):
+        """Retrieve the raw text from a file, see `Entry.get_entry_text`.
+        """
+        return self.catalog.proto.get_entry_text(self, fname)
+
+    def get_filename(self, name):
+        return self.catalog.proto.get_filename(name)
+
+    def get_stub(self):
+        """Return this stub (stubs are never modified).
+        """
+        return self
+
+    def _get_save_path(self, bury=False):
+        """Return the path of the file corresponding to this entry.
+
+        See `Entry._get_save_path`.
+        """
+        return self.catalog.proto._get_save_path(self, bury=bury)
+
+
+class _EntryEncoder(JSONStreamEncoder):
+    """Incremental encoder of the JSON text of entries, as saved to files.
+
+    The text is identical to encoding the `OrderedDict` constructed by
+    `Entry._ordered` (i.e. sorted by `sort_func`), but the entry is walked
+    without copying (or modifying) it.
+    """
+
+    INDENT = '\t'
+
+    def __init__(self, backend=None):
+        super().__init__(indent=self.INDENT, separators=(',', ':'),
+                         ensure_ascii=False, backend=backend)
+        return
+
+    def iter_entry(self, entry):
+        """Yield the JSON text of `entry` in chunks.
+        """
+        return self.iter_object([(entry[entry._KEYS.NAME], entry)],
+                                encode=self._iter_ordered)
+
+    def _iter_ordered(self, odict, level):
+        """Yield the text of a mapping with its keys sorted (see `_ordered`).
+        """
+        if isinstance(odict, (CatDict, CompactRecord, PhotometryRow, Entry)):
+            sort_key = odict.sort_func
+        else:
+            sort_key = None
+        keys = sorted(odict.keys(), key=sort_key)
+        if isinstance(odict, Entry):
+            items = self._iter_sections(odict, keys)
+        else:
+            items = ((key, odict[key]) for key in keys)
+        return self.iter_object(items, level, encode=self._iter_value)
+
+    def _iter_sections(self, entry, keys):
+        """Yield the '(key, value)' of each section of `entry`.
+
+        Sections which were never loaded (see `Entry._lazy`) are yielded as
+        their `RawJSON` text, and written verbatim.
+        """
+        for key in keys:
+            raw = entry._get_raw_section(key)
+            if raw is None:
+                yield key, entry[key]
+            else:
+                yield key, raw
+
+    def _iter_value(self, value, level):
+        """Yield the text of a value of a sorted mapping.
+        """
+        # Array-backed data is written in the standard list format
+        if isinstance(value, SpectrumData):
+            return self.iterencode(value.tolist(), level)
+        if isinstance(value, PhotometryTable):
+            return self.iter_array(value, level, encode=self._iter_ordered)
+        if isinstance(value, _ORDERED_TYPES):
+            return self._iter_ordered(value, level)
+        # Lists of mappings have each (mapping) item sorted
+        if isinstance(value, list) and (
+                not value or isinstance(value[0], _ORDERED_TYPES)):
+            return self.iter_array(value, level, encode=self._iter_item)
+        return self.iterencode(value, level)
+
+    def _iter_item(self, item, level):
+        if isinstance(item, _ORDERED_TYPES):
+            return self._iter_ordered(item, level)
+        return self.encode(item, level)
+
+
+def _hash_chunks(chunks, text_hash):
+    """Yield the given chunks of text, updating the `hashlib` `text_hash`.
+    """
+    for chunk in chunks:
+        text_hash.update(chunk.encode('utf-8'))
+        yield chunk
@@ -24,9 +24,6 @@ class Error(CatDict):
     """
 
     _KEYS = ERROR
-
-    def __init__(self, parent, **kwargs):
-        self._REQ_KEY_SETS = [
-            [ERROR.VALUE]
-        ]
-        super().__init__(parent, **kwargs)
+    _REQ_KEY_SETS = [
+        [ERROR.VALUE]
+    ]
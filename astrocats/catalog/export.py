@@ -0,0 +1,201 @@
+"""Export data from all catalog entries into columnar files.
+"""
+import json
+import os
+from collections import OrderedDict
+from multiprocessing import Pool
+
+import numpy as np
+
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.photometry import PHOTOMETRY
+from astrocats.catalog.source import SOURCE
+from astrocats.catalog.utils import pbar, read_text_file, scan_entry_sections
+
+# Columns of the exported photometry: (name, dtype)
+PHOTOMETRY_COLUMNS = [
+    ('name', 'U'),
+    (PHOTOMETRY.TIME, float),
+    (PHOTOMETRY.U_TIME, 'U'),
+    (PHOTOMETRY.BAND, 'U'),
+    (PHOTOMETRY.MAGNITUDE, float),
+    (PHOTOMETRY.E_MAGNITUDE, float),
+    (PHOTOMETRY.E_LOWER_MAGNITUDE, float),
+    (PHOTOMETRY.E_UPPER_MAGNITUDE, float),
+    (PHOTOMETRY.FLUX, float),
+    (PHOTOMETRY.E_FLUX, float),
+    (PHOTOMETRY.U_FLUX, 'U'),
+    (PHOTOMETRY.FLUX_DENSITY, float),
+    (PHOTOMETRY.E_FLUX_DENSITY, float),
+    (PHOTOMETRY.U_FLUX_DENSITY, 'U'),
+    (PHOTOMETRY.UPPER_LIMIT, bool),
+    (PHOTOMETRY.TELESCOPE, 'U'),
+    (SOURCE.BIBCODE, 'U'),
+]
+
+
+class PhotometryFilter:
+    """Selection of photometry points, applied while exporting.
+
+    Arguments
+    ---------
+    bands : list of str or 'None'
+        Only include points in these bands.
+    time_range : (float or 'None', float or 'None')
+        Only include points with times within this (inclusive) range.
+    telescopes : list of str or 'None'
+        Only include points from these telescopes.
+
+    """
+
+    def __init__(self, bands=None, time_range=(None, None), telescopes=None):
+        self.bands = set(bands) if bands else None
+        self.time_range = tuple(time_range)
+        self.telescopes = set(telescopes) if telescopes else None
+        return
+
+    def __call__(self, photo):
+        """Return whether the photometry point (dict) `photo` is selected.
+        """
+        if (self.bands is not None and
+                photo.get(PHOTOMETRY.BAND, None) not in self.bands):
+            return False
+        if (self.telescopes is not None and
+                photo.get(PHOTOMETRY.TELESCOPE, None) not in self.telescopes):
+            return False
+        tmin, tmax = self.time_range
+        if tmin is not None or tmax is not None:
+            time = _to_float(photo.get(PHOTOMETRY.TIME, None))
+            if np.isnan(time):
+                return False
+            if tmin is not None and time < tmin:
+                return False
+            if tmax is not None and time > tmax:
+                return False
+        return True
+
+
+def export_photometry(catalog, path=None, photo_filter=None,
+                      chunk_size=100000, num_procs=None):
+    """Export the photometry of all output entries into columnar files.
+
+    Entry files are read and filtered in parallel (by `num_procs` processes),
+    and the selected points are written to `.npz` files of (at most)
+    `chunk_size` points each, i.e. 'photometry_0000.npz', etc.  Only one
+    chunk is held in memory at a time.
+
+    Arguments
+    ---------
+    catalog : `astrocats.catalog.catalog.Catalog` (sub)class instance
+    path : str or 'None'
+        Output directory, by default 'export/photometry' in the catalog's
+        output directory.
+    photo_filter : `PhotometryFilter` or 'None'
+        Selection of points to include, by default all of them.
+    chunk_size : int
+        Maximum number of points in each output file.
+    num_procs : int or 'None'
+        Number of processes, by default the number of CPUs.
+
+    Returns
+    -------
+    num : int
+        The number of points exported.
+
+    """
+    log = catalog.log
+    if path is None:
+        path = os.path.join(catalog.PATHS.PATH_OUTPUT, 'export', 'photometry')
+    os.makedirs(path, exist_ok=True)
+    if photo_filter is None:
+        photo_filter = PhotometryFilter()
+
+    files = catalog.PATHS.get_repo_output_file_list()
+    tasks = ((fname, photo_filter) for fname in files)
+    buffer = []
+    num_points = 0
+    num_chunks = 0
+    with Pool(num_procs) as pool:
+        results = pool.imap(_extract_photometry, tasks, chunksize=16)
+        for rows in pbar(results, 'Exporting photometry', total=len(files)):
+            buffer.extend(rows)
+            while len(buffer) >= chunk_size:
+                _write_chunk(path, num_chunks, buffer[:chunk_size])
+                num_chunks += 1
+                num_points += chunk_size
+                del buffer[:chunk_size]
+
+    if buffer or not num_chunks:
+        _write_chunk(path, num_chunks, buffer)
+        num_chunks += 1
+        num_points += len(buffer)
+
+    log.warning("Exported {} photometry points from {} entries into {} "
+                "files in '{}'".format(num_points, len(files), num_chunks,
+                                       path))
+    return num_points
+
+
+def _extract_photometry(task):
+    """Return the selected photometry rows of one entry file.
+
+    Only the `sources` and `photometry` sections are decoded.
+    """
+    fname, photo_filter = task
+    text = read_text_file(fname)
+    try:
+        name, sections = scan_entry_sections(text)
+        data = OrderedDict()
+        for key in [ENTRY.SOURCES, ENTRY.PHOTOMETRY]:
+            if key in sections:
+                start, end = sections[key]
+                data[key] = json.loads(text[start:end])
+    except ValueError:
+        data = json.loads(text)
+        name = list(data.keys())[0]
+        data = data[name]
+
+    bibcodes = {}
+    for source in data.get(ENTRY.SOURCES, []):
+        if SOURCE.ALIAS in source:
+            bibcodes[source[SOURCE.ALIAS]] = source.get(SOURCE.BIBCODE, '')
+
+    rows = []
+    for photo in data.get(ENTRY.PHOTOMETRY, []):
+        if not photo_filter(photo):
+            continue
+        row = [name]
+        for key, dtype in PHOTOMETRY_COLUMNS[1:-1]:
+            value = photo.get(key, None)
+            if dtype is float:
+                row.append(_to_float(value))
+            elif dtype is bool:
+                row.append(bool(value))
+            else:
+                row.append('' if value is None else str(value))
+        aliases = photo.get(PHOTOMETRY.SOURCE, '').split(',')
+        row.append(','.join(bibcodes[alias] for alias in aliases
+                            if bibcodes.get(alias, '')))
+        rows.append(row)
+    return rows
+
+
+def _write_chunk(path, number, rows):
+    """Write the photometry `rows` into the columnar file number `number`.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(PHOTOMETRY_COLUMNS)
+    arrays = OrderedDict()
+    for (key, dtype), values in zip(PHOTOMETRY_COLUMNS, columns):
+        arrays[key] = np.array(values, dtype=dtype)
+    fname = os.path.join(path, 'photometry_{:04d}.npz'.format(number))
+    np.savez(fname, **arrays)
+    return fname
+
+
+def _to_float(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
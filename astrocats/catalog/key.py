@@ -3,15 +3,62 @@
 from astrocats.catalog.utils import is_number
 
 
-class KeyCollection:
+class _KeyCollectionMeta(type):
+    """Metaclass which builds the key registry of each `KeyCollection`.
+
+    The registry is constructed once, when each (sub)class is created, and is
+    stored in that class's own namespace, so that subclasses never share (or
+    inherit stale copies of) their parent's lists.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+
+        _keys = []
+        _vals = []
+        # get the keys from all base-classes aswell (when this is subclasses)
+        for base in bases:
+            # base classes below `KeyCollection` (e.g. `object`) wont work
+            if isinstance(base, _KeyCollectionMeta):
+                _keys.extend(base._keys)
+                _vals.extend(base._vals)
+
+        # Get the keys from this particular subclass
+        # Only non-hidden (no '_') and variables (non-callable)
+        for kk, vv in namespace.items():
+            if not kk.startswith('_') and not callable(getattr(cls, kk)):
+                _keys.append(kk)
+                _vals.append(vv)
+
+        # Only `Key` objects have a `compare` attribute (e.g. not `KEY_TYPES`)
+        _compare_vals = [vv for vv in _vals if getattr(vv, 'compare', False)]
+        # Sort keys based on priority, high priority values first
+        _compare_vals = sorted(_compare_vals, reverse=True,
+                               key=lambda key: (key.priority, key.name))
+
+        # Map from names to `Key` objects, the first definition takes priority
+        _key_map = {}
+        for vv in _vals:
+            if hasattr(vv, 'name'):
+                _key_map.setdefault(vv.name, vv)
+
+        cls._keys = _keys
+        cls._vals = _vals
+        cls._compare_vals = _compare_vals
+        cls._key_map = _key_map
+        cls._no_source_names = frozenset(
+            kk for kk, vv in _key_map.items() if vv.no_source)
+        # Cache of `Key` objects constructed for unrecognized names
+        cls._unknown_keys = {}
+
+
+class KeyCollection(metaclass=_KeyCollectionMeta):
     """General container class with methods to list attribute names and values.
 
     Used mostly by different `CatDict` subclasses to contain the 'keys' to
-    their internal dictionaries.
+    their internal dictionaries.  The lists of names and values are collected
+    (by `_KeyCollectionMeta`) when each subclass is created.
     """
-    _keys = []
-    _vals = []
-    _compare_vals = []
 
     @classmethod
     def keys(cls):
@@ -26,28 +73,9 @@ class KeyCollection:
         Returns
         -------
         _keys : list of str
-            List of names of internal attributes.  Order is effectiely random.
+            List of names of internal attributes.  Base-class attributes
+            first.
         """
-        if cls._keys:
-            return cls._keys
-
-        # If `_keys` is not yet defined, create it
-        # ----------------------------------------
-        _keys = []
-        # get the keys from all base-classes aswell (when this is subclasses)
-        for mro in cls.__bases__:
-            # base classes below `KeyCollection` (e.g. `object`) wont work
-            if issubclass(mro, KeyCollection):
-                _keys.extend(mro.keys())
-
-        # Get the keys from this particular subclass
-        # Only non-hidden (no '_') and variables (non-callable)
-        _keys.extend([
-            kk for kk in vars(cls).keys()
-            if not kk.startswith('_') and not callable(getattr(cls, kk))
-        ])
-        # Store for future retrieval
-        cls._keys = _keys
         return cls._keys
 
     @classmethod
@@ -57,28 +85,9 @@ class KeyCollection:
         Returns
         -------
         _vals : list of objects
-            List of values of internal attributes.  Order is effectiely random.
+            List of values of internal attributes.  Base-class attributes
+            first.
         """
-        if cls._vals:
-            return cls._vals
-
-        # If `_vals` is not yet defined, create it
-        # ----------------------------------------
-        _vals = []
-        # get the keys from all base-classes aswell (when this is subclasses)
-        for mro in cls.__bases__:
-            # base classes below `KeyCollection` (e.g. `object`) wont work
-            if issubclass(mro, KeyCollection):
-                _vals.extend(mro.vals())
-
-        # Get the keys from this particular subclass
-        # Only non-hidden (no '_') and variables (non-callable)
-        _vals.extend([
-            vv for kk, vv in vars(cls).items()
-            if not kk.startswith('_') and not callable(getattr(cls, kk))
-        ])
-        # Store for future retrieval
-        cls._vals = _vals
         return cls._vals
 
     @classmethod
@@ -91,43 +100,54 @@ class KeyCollection:
         _compare_vals : list of objects
             List of values of internal attributes to use when comparing
             `CatDict` objects. Order sorted by `Key` priority, followed by
-            alphabetical.
+            alphabetical.  If `sort` is 'False', definition order is used.
         """
-        if cls._compare_vals:
-            return cls._compare_vals
+        if not sort:
+            return [vv for vv in cls._vals if getattr(vv, 'compare', False)]
+        return cls._compare_vals
 
-        # If `_compare_vals` is not yet defined, create it
-        # ----------------------------------------
-        _compare_vals = []
-        # get the keys from all base-classes aswell (when this is subclasses)
-        for mro in cls.__bases__:
-            # base classes below `KeyCollection` (e.g. `object`) wont work
-            if issubclass(mro, KeyCollection):
-                _compare_vals.extend(mro.compare_vals(sort=False))
+    @classmethod
+    def get_key_by_name(cls, name):
+        """Return the `Key` object with the given `name`.
 
-        # Get the keys from this particular subclass
-        # Only non-hidden (no '_') and variables (non-callable)
-        _compare_vals.extend([
-            vv for kk, vv in vars(cls).items()
-            if (not kk.startswith('_') and not callable(getattr(cls, kk)) and
-                vv.compare)
-        ])
+        If there is no such `Key` in this class, a default `Key` (i.e. no
+        type, `no_source` 'False', zero priority) is returned.  The same object
+        is returned for repeated queries of a name.
+        """
+        try:
+            return cls._key_map[name]
+        except KeyError:
+            pass
+
+        try:
+            return cls._unknown_keys[name]
+        except KeyError:
+            key = Key(name)
+            cls._unknown_keys[name] = key
+            return key
 
-        # Sort keys based on priority, high priority values first
-        if sort:
-            _compare_vals = sorted(_compare_vals, reverse=True,
-                                   key=lambda key: (key.priority, key.name))
+    @classmethod
+    def no_source_names(cls):
+        """Return the names of keys which have `no_source` set to 'True'.
 
-        # Store for future retrieval
-        cls._compare_vals = _compare_vals
-        return cls._compare_vals
+        Returns
+        -------
+        _no_source_names : frozenset of str
+
+        """
+        return cls._no_source_names
 
     @classmethod
-    def get_key_by_name(cls, name):
-        for val in cls.vals():
-            if name == val.name:
-                return val
-        return Key(name)
+    def get_type(cls, name):
+        """Return the `type` of the `Key` with the given `name`.
+        """
+        return cls.get_key_by_name(name).type
+
+    @classmethod
+    def get_priority(cls, name):
+        """Return the `priority` of the `Key` with the given `name`.
+        """
+        return cls.get_key_by_name(name).priority
 
 
 class KEY_TYPES(KeyCollection):
@@ -199,6 +219,50 @@ class Key(str):
             self.name, self.type, self.listable, self.compare)
         return retval
 
+    def get_checker(self):
+        """Return a function equivalent to `check`, specialized for this `Key`.
+
+        The specification (`type`, `listable`) is resolved once here, instead
+        of on every call.  Used by `CatDict` to validate values quickly.
+
+        Returns
+        -------
+        checker : callable or 'None'
+            Function which takes a value and returns whether it is valid.
+            'None' if all values are valid (i.e. `type` is 'None').
+
+        """
+        if self.type is None:
+            return None
+
+        listable = self.listable
+        if self.type == KEY_TYPES.NUMERIC:
+            if listable:
+                return is_number
+
+            def checker(val):
+                return not isinstance(val, list) and is_number(val)
+
+        elif self.type == KEY_TYPES.STRING:
+            if listable:
+                def checker(val):
+                    if isinstance(val, list):
+                        return isinstance(val[0], str)
+                    return isinstance(val, str)
+            else:
+                def checker(val):
+                    return isinstance(val, str)
+
+        elif self.type == KEY_TYPES.BOOL:
+            # Lists never pass the `check` for booleans
+            def checker(val):
+                return isinstance(val, bool)
+
+        else:
+            return self.check
+
+        return checker
+
     def check(self, val):
         """Make sure given value is consistent with this `Key` specification.
 
@@ -0,0 +1,130 @@
+"""Manifest of the content hashes of the entries written by this catalog.
+
+Each time an entry is saved (`Entry.save`), the hash of the text written to
+its location (e.g. the filename in the output repositories) is recorded.  An
+entry file whose text still has the recorded hash is exactly what the catalog
+last wrote, i.e. its data was already validated and sanitized, and it can be
+loaded in the 'trusted' mode of `Entry.init_from_file`, without validating
+its data again.
+
+The manifest is an append-only file (one JSON list per line:
+'[location, hash]', with a 'null' hash for deleted entries), in which later
+lines replace earlier ones.  It is rewritten (compacted) once most of its
+lines are outdated.  It is only used with the '--trusted-load' import
+argument.
+"""
+import json
+import os
+
+from astrocats.catalog.sidecar import content_hash
+
+MANIFEST_FILENAME = 'entry-manifest.jsonl'
+
+
+class EntryManifest:
+    """Content hashes of the saved entries, by location (see module docstring).
+
+    Arguments
+    ---------
+    path : str
+        Filename of the manifest.
+
+    Attributes
+    ----------
+    COMPACT_MIN_LINES : int
+        Minimum number of outdated lines before the file is compacted.
+
+    """
+
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._hashes = None
+        self._num_lines = 0
+        self._pending = []
+        return
+
+    def __len__(self):
+        return len(self._get_hashes())
+
+    def record(self, location, text_hash):
+        """Record the hash of the text written to `location`.
+        """
+        self._update(location, text_hash)
+        return
+
+    def discard(self, location):
+        """Record that the entry at `location` was deleted.
+        """
+        if os.path.normpath(location) in self._get_hashes():
+            self._update(location, None)
+        return
+
+    def is_trusted(self, location, text):
+        """Whether `text` is exactly what was last written to `location`.
+        """
+        text_hash = self._get_hashes().get(os.path.normpath(location), None)
+        return text_hash is not None and text_hash == content_hash(text)
+
+    def clear(self):
+        """Forget all of the recorded hashes (and delete the file).
+        """
+        self._hashes = {}
+        self._num_lines = 0
+        self._pending = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return
+
+    def flush(self):
+        """Append the new records to the file, compacting it if needed.
+        """
+        if not self._pending:
+            return
+        hashes = self._get_hashes()
+        num_outdated = self._num_lines + len(self._pending) - len(hashes)
+        if num_outdated > max(self.COMPACT_MIN_LINES, len(hashes)):
+            self._write(sorted(hashes.items()), 'w')
+            self._num_lines = len(hashes)
+        else:
+            self._write(self._pending, 'a')
+            self._num_lines += len(self._pending)
+        self._pending = []
+        return
+
+    def _get_hashes(self):
+        """Return the recorded hash of each location, reading the file once.
+        """
+        if self._hashes is None:
+            self._hashes = {}
+            self._num_lines = 0
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf8') as fin:
+                    for line in fin:
+                        if not line.strip():
+                            continue
+                        location, text_hash = json.loads(line)
+                        self._num_lines += 1
+                        if text_hash is None:
+                            self._hashes.pop(location, None)
+                        else:
+                            self._hashes[location] = text_hash
+        return self._hashes
+
+    def _update(self, location, text_hash):
+        location = os.path.normpath(location)
+        hashes = self._get_hashes()
+        if text_hash is None:
+            hashes.pop(location, None)
+        else:
+            hashes[location] = text_hash
+        self._pending.append((location, text_hash))
+        return
+
+    def _write(self, records, mode):
+        with open(self.path, mode, encoding='utf8') as fout:
+            for location, text_hash in records:
+                fout.write(json.dumps([location, text_hash],
+                                      ensure_ascii=False) + '\n')
+        return
@@ -1,12 +1,15 @@
 """Class for representing photometric data.
 """
 from collections import OrderedDict
+from collections.abc import MutableMapping
 from random import seed, shuffle
 
+import numpy as np
 from palettable import colorbrewer, cubehelix, wesanderson
 
 from astrocats.catalog.key import Key, KEY_TYPES, KeyCollection
-from astrocats.catalog.catdict import CatDict
+from astrocats.catalog.catdict import CatDict, _catdict_type, _Layout
+from astrocats.catalog.rejection import REJECT, Rejection
 
 
 class PHOTOMETRY(KeyCollection):
@@ -72,15 +75,17 @@ class Photometry(CatDict):
 
     _ALLOW_UNKNOWN_KEYS = True
     _KEYS = PHOTOMETRY
-
-    def __init__(self, parent, **kwargs):
-        self._REQ_KEY_SETS = [
-            [PHOTOMETRY.SOURCE],
-            [PHOTOMETRY.TIME, PHOTOMETRY.HOST],
-            [PHOTOMETRY.MAGNITUDE, PHOTOMETRY.FLUX, PHOTOMETRY.FLUX_DENSITY,
-             PHOTOMETRY.COUNTS, PHOTOMETRY.LUMINOSITY]]
-        # Note: `_check()` is called at end of `super().__init__`
-        super().__init__(parent, **kwargs)
+    _REQ_KEY_SETS = [
+        [PHOTOMETRY.SOURCE],
+        [PHOTOMETRY.TIME, PHOTOMETRY.HOST],
+        [PHOTOMETRY.MAGNITUDE, PHOTOMETRY.FLUX, PHOTOMETRY.FLUX_DENSITY,
+         PHOTOMETRY.COUNTS, PHOTOMETRY.LUMINOSITY]]
+
+    def _setup(self, parent, **kwargs):
+        # Note: `_validate()` is called at end of `super()._setup`
+        rejection = super()._setup(parent, **kwargs)
+        if rejection is not None:
+            return rejection
 
         # If `BAND` is given, but any of `bandmetaf_keys` is not, try to infer
         if self._KEYS.BAND in self:
@@ -100,14 +105,16 @@ class Photometry(CatDict):
                            ' MJD.'.format(self._KEYS.U_TIME))
             self[self._KEYS.U_TIME] = 'MJD'
 
-        return
+        return None
 
-    def _check(self):
+    def _validate(self):
         """
 
         """
         # Run the super method
-        super()._check()
+        rejection = super()._validate()
+        if rejection is not None:
+            return rejection
 
         err_str = None
         has_flux = self._KEYS.FLUX in self
@@ -136,18 +143,9 @@ class Photometry(CatDict):
                     self._KEYS.FLUX_DENSITY, self._KEYS.U_FLUX_DENSITY)
 
         if err_str is not None:
-            raise ValueError(err_str)
-
-        return
-
-    def _clean_value_for_key(self, key, value):
-        value = super()._clean_value_for_key(key, value)
+            return Rejection(REJECT.INCONSISTENT, err_str)
 
-        # Do some basic homogenization
-        if key == self._KEYS.BAND:
-            return bandrepf(value)
-
-        return value
+        return None
 
     def sort_func(self, key):
         if key == self._KEYS.TIME:
@@ -157,6 +155,355 @@ class Photometry(CatDict):
         return key
 
 
+class PhotometryTable:
+    """Column-oriented (structure of arrays) store of `Photometry` data.
+
+    Used by `Entry` in place of a list of `Photometry` objects when the
+    catalog's `PHOTOMETRY_TABLES` is 'True'.  Each `PHOTOMETRY` key is stored
+    as a single column (list) of values, with a validity mask marking the rows
+    in which the key is present.  Columns can be retrieved as NumPy arrays
+    (`floats`, `mask`) for vectorized sorting (`argsort`, `sort`), grouping
+    (`group_by`) and selection.
+
+    The table behaves like the list it replaces: iterating over it, or
+    indexing it, returns `PhotometryRow` objects, i.e. mutable mapping views of
+    single rows, which work with the existing code paths (e.g. `sanitize`,
+    `append_sources_from`).  When saved, each row is written exactly as the
+    corresponding `Photometry` object would be.
+
+    Attributes
+    ----------
+    catdict_type : `Photometry` (sub)class
+        The type of the data stored in the rows.
+
+    """
+
+    def __init__(self, catdict_type=Photometry, items=()):
+        self.catdict_type = catdict_type
+        self._columns = OrderedDict()
+        self._masks = {}
+        self._layouts = []
+        self._floats = {}
+        self._dupe_index = None
+        for item in items:
+            self.append(item)
+        return
+
+    def __len__(self):
+        return len(self._layouts)
+
+    def __iter__(self):
+        for ii in range(len(self._layouts)):
+            yield PhotometryRow(self, ii)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PhotometryRow(self, ii)
+                    for ii in range(len(self._layouts))[index]]
+        if index < 0:
+            index += len(self._layouts)
+        if not 0 <= index < len(self._layouts):
+            raise IndexError("`PhotometryTable` index out of range")
+        return PhotometryRow(self, index)
+
+    def __repr__(self):
+        return "{}(rows={}, columns={})".format(
+            type(self).__name__, len(self), list(self._columns.keys()))
+
+    def append(self, item):
+        """Add a new row with the values of the mapping `item`.
+
+        `item` is typically a validated `Photometry` object.
+        """
+        values = OrderedDict(item.items())
+        for name in values:
+            if name not in self._columns:
+                self._add_column(name)
+
+        for name, col in self._columns.items():
+            value = values.get(name, _MISSING)
+            col.append(value)
+            self._masks[name].append(value is not _MISSING)
+
+        self._layouts.append(_Layout.get(tuple(values.keys())))
+        self._floats.clear()
+        if self._dupe_index is not None:
+            try:
+                self._dupe_index.setdefault(
+                    self._dupe_key(values), len(self._layouts) - 1)
+            except TypeError:
+                self._dupe_index = None
+        return
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+        return
+
+    def columns(self):
+        """Return the names of the stored columns.
+        """
+        return list(self._columns.keys())
+
+    def column(self, name):
+        """Return the values of column `name` as a list ('None' if missing).
+        """
+        col = self._columns.get(name, None)
+        if col is None:
+            return [None] * len(self)
+        return [None if value is _MISSING else value for value in col]
+
+    def mask(self, name):
+        """Return a boolean array, 'True' for the rows containing `name`.
+        """
+        mask = self._masks.get(name, None)
+        if mask is None:
+            return np.zeros(len(self), dtype=bool)
+        return np.frombuffer(bytes(mask), dtype=bool)
+
+    def floats(self, name):
+        """Return the values of column `name` as a float array.
+
+        Missing and non-numeric values are 'NaN'.  For list values (e.g. a
+        `PHOTOMETRY.TIME` range), the first element is used.
+        """
+        values = self._floats.get(name, None)
+        if values is not None:
+            return values
+
+        values = np.full(len(self), np.nan)
+        col = self._columns.get(name, None)
+        if col is not None:
+            for ii, value in enumerate(col):
+                if value is _MISSING:
+                    continue
+                if isinstance(value, list):
+                    if not value:
+                        continue
+                    value = value[0]
+                try:
+                    values[ii] = float(value)
+                except (TypeError, ValueError):
+                    pass
+
+        values.setflags(write=False)
+        self._floats[name] = values
+        return values
+
+    def argsort(self, *names):
+        """Return the (stable) order of rows sorted by the given columns.
+
+        The first name is the primary sort key.  Numeric columns are sorted
+        by value, all others by their string representation; rows missing a
+        value are placed last.  Defaults to sorting by `PHOTOMETRY.TIME`.
+        """
+        if not names:
+            names = (self.catdict_type._KEYS.TIME,)
+        codes = [self._sort_codes(name) for name in reversed(names)]
+        return np.lexsort(codes)
+
+    def sort(self, *names):
+        """Reorder the rows of this table in place, see `argsort`.
+        """
+        self._reorder(self.argsort(*names))
+        return
+
+    def group_by(self, name):
+        """Group the rows by the value of column `name`.
+
+        Returns
+        -------
+        groups : OrderedDict
+            Arrays of row indices, keyed by each (sorted) value.  Rows without
+            a value for `name` are not included.  List values are given as
+            tuples.
+
+        """
+        col = self._columns.get(name, None)
+        groups = OrderedDict()
+        if col is None:
+            return groups
+        values, codes = self._factorize(col)
+        order = np.argsort(codes, kind='mergesort')
+        splits = np.flatnonzero(np.diff(codes[order])) + 1
+        for inds in np.split(order, splits):
+            if len(inds) and codes[inds[0]] >= 0:
+                groups[values[codes[inds[0]]]] = inds
+        return groups
+
+    def find_duplicate(self, item):
+        """Return the row which `item` is a duplicate of, or 'None'.
+
+        Equivalent to calling ``item.is_duplicate_of(row)`` for each row (in
+        order), but uses a hash table of the compared values instead.
+        """
+        if _catdict_type(item) is not self.catdict_type:
+            return None
+
+        # Customized comparisons (and unhashable values) compare each row
+        try:
+            if (self.catdict_type.is_duplicate_of is not
+                    CatDict.is_duplicate_of):
+                raise TypeError
+            if self._dupe_index is None:
+                dupe_index = {}
+                for ii, row in enumerate(self):
+                    dupe_index.setdefault(self._dupe_key(row), ii)
+                self._dupe_index = dupe_index
+            index = self._dupe_index.get(self._dupe_key(item), None)
+        except TypeError:
+            for row in self:
+                if item.is_duplicate_of(row):
+                    return row
+            return None
+
+        if index is None:
+            return None
+        return PhotometryRow(self, index)
+
+    def tolist(self):
+        """Return the rows as a list of `OrderedDict`.
+        """
+        return [OrderedDict(row.items()) for row in self]
+
+    def _add_column(self, name):
+        self._columns[name] = [_MISSING] * len(self._layouts)
+        self._masks[name] = bytearray(len(self._layouts))
+        return
+
+    def _dupe_key(self, values):
+        """Hashable tuple of the values compared by `is_duplicate_of`.
+        """
+        dupe_key = []
+        for key in self.catdict_type._KEYS.compare_vals():
+            value = values.get(key, _MISSING)
+            if isinstance(value, list):
+                value = (list, tuple(value))
+            dupe_key.append(value)
+        return tuple(dupe_key)
+
+    def _factorize(self, col):
+        """Return the sorted unique values of `col`, and each row's index.
+
+        Missing values have an index of '-1'.
+        """
+        keys = [tuple(value) if isinstance(value, list) else value
+                for value in col]
+        values = sorted(set(kk for kk in keys if kk is not _MISSING), key=str)
+        lookup = {value: ii for ii, value in enumerate(values)}
+        codes = np.array([lookup.get(kk, -1) for kk in keys], dtype=int)
+        return values, codes
+
+    def _reorder(self, order):
+        for name, col in self._columns.items():
+            self._columns[name] = [col[ii] for ii in order]
+            self._masks[name] = bytearray(self.mask(name)[order].tobytes())
+        self._layouts = [self._layouts[ii] for ii in order]
+        self._floats.clear()
+        self._dupe_index = None
+        return
+
+    def _sort_codes(self, name):
+        if self.catdict_type._KEYS.get_type(name) == KEY_TYPES.NUMERIC:
+            return self.floats(name)
+        col = self._columns.get(name, None)
+        if col is None:
+            return np.zeros(len(self), dtype=int)
+        values, codes = self._factorize(col)
+        codes[codes < 0] = len(values)
+        return codes
+
+    def _get_value(self, index, name):
+        layout = self._layouts[index]
+        if name not in layout.index:
+            raise KeyError(name)
+        return self._columns[name][index]
+
+    def _set_value(self, index, name, value):
+        if name not in self._columns:
+            self._add_column(name)
+        layout = self._layouts[index]
+        if name not in layout.index:
+            self._layouts[index] = layout.add(name)
+        self._columns[name][index] = value
+        self._masks[name][index] = True
+        self._modified(name)
+        return
+
+    def _del_value(self, index, name):
+        layout = self._layouts[index]
+        if name not in layout.index:
+            raise KeyError(name)
+        self._layouts[index] = layout.remove(name)
+        self._columns[name][index] = _MISSING
+        self._masks[name][index] = False
+        self._modified(name)
+        return
+
+    def _modified(self, name):
+        self._floats.pop(name, None)
+        if name in self.catdict_type._KEYS.compare_vals():
+            self._dupe_index = None
+        return
+
+
+class PhotometryRow(MutableMapping):
+    """Mutable mapping view of a single row of a `PhotometryTable`.
+
+    Rows behave like the `Photometry` objects they represent, including their
+    `_KEYS`, `sort_func`, `is_duplicate_of` and `append_sources_from`.  A row
+    refers to a position in the table, so it should not be kept while the
+    table is reordered.
+    """
+    __slots__ = ['_table', '_index']
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def _CATDICT_TYPE(self):
+        return self._table.catdict_type
+
+    @property
+    def _KEYS(self):
+        return self._table.catdict_type._KEYS
+
+    def __getitem__(self, key):
+        return self._table._get_value(self._index, key)
+
+    def __setitem__(self, key, value):
+        self._table._set_value(self._index, key, value)
+
+    def __delitem__(self, key):
+        self._table._del_value(self._index, key)
+
+    def __iter__(self):
+        return iter(self._table._layouts[self._index].names)
+
+    def __len__(self):
+        return len(self._table._layouts[self._index].names)
+
+    def __contains__(self, key):
+        return key in self._table._layouts[self._index].index
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, list(self.items()))
+
+    def sort_func(self, key):
+        return self._CATDICT_TYPE.sort_func(self, key)
+
+    def is_duplicate_of(self, other):
+        return self._CATDICT_TYPE.is_duplicate_of(self, other)
+
+    def append_sources_from(self, other):
+        return self._CATDICT_TYPE.append_sources_from(self, other)
+
+
+# Placeholder for values missing from a `PhotometryTable` row
+_MISSING = object()
+
+
 BAND_REPS = {
     'Ks': ['K_s'],
     'M2': ['uvm2', 'UVM2', 'UVm2', 'Um2', 'm2', 'um2'],
@@ -303,6 +650,10 @@ def bandrepf(code):
     return code
 
 
+# Do some basic homogenization of band names
+Photometry._KEY_CLEANERS = {PHOTOMETRY.BAND: bandrepf}
+
+
 def bandcolorf(code):
     newcode = bandrepf(code)
     if newcode in bandcolordict:
@@ -1,7 +1,8 @@
 """Class for representing spectra.
 """
-from astrocats.catalog.catdict import CatDict, CatDictError
+from astrocats.catalog.catdict import CatDict
 from astrocats.catalog.key import KEY_TYPES, Key, KeyCollection
+from astrocats.catalog.rejection import REJECT, Rejection
 from astrocats.catalog.utils import is_number
 
 
@@ -56,45 +57,50 @@ class Quantity(CatDict):
     """
 
     _KEYS = QUANTITY
+    _REQ_KEY_SETS = [
+        [QUANTITY.VALUE],
+        [QUANTITY.SOURCE]
+    ]
 
-    def __init__(self, parent, **kwargs):
-        self._REQ_KEY_SETS = [
-            [QUANTITY.VALUE],
-            [QUANTITY.SOURCE]
-        ]
-
-        super().__init__(parent, **kwargs)
+    def _setup(self, parent, **kwargs):
+        rejection = super()._setup(parent, **kwargs)
+        if rejection is not None:
+            return rejection
 
         # Aliases not added if in DISTINCT_FROM
         if self._key == parent._KEYS.ALIAS:
             value = parent.catalog.clean_entry_name(self[QUANTITY.VALUE])
             for df in parent.get(parent._KEYS.DISTINCT_FROM, []):
                 if value == df[QUANTITY.VALUE]:
-                    raise CatDictError(
-                        "Alias '{}' in '{}'\' '{}' list".format(
-                            value, parent[parent._KEYS.NAME],
-                            parent._KEYS.DISTINCT_FROM))
+                    return Rejection(
+                        REJECT.DISTINCT_ALIAS,
+                        "Alias '{}' in '{}'\' '{}' list", value,
+                        parent[parent._KEYS.NAME], parent._KEYS.DISTINCT_FROM)
 
         # Check that value exists
         if (not self[QUANTITY.VALUE] or self[QUANTITY.VALUE] == '--' or
                 self[QUANTITY.VALUE] == '-'):
-            raise CatDictError(
-                "Value '{}' is empty, not adding to '{}'".format(
-                    self[QUANTITY.VALUE], parent[parent._KEYS.NAME]))
+            return Rejection(
+                REJECT.EMPTY_VALUE,
+                "Value '{}' is empty, not adding to '{}'",
+                self[QUANTITY.VALUE], parent[parent._KEYS.NAME])
 
         if not parent._clean_quantity(self):
-            raise CatDictError(
+            return Rejection(
+                REJECT.FAILED_CLEANING,
                 "Value '{}' did not survive cleaning process, not adding to "
-                " '{}'.".format(self[QUANTITY.VALUE],
-                                parent[parent._KEYS.NAME]))
+                " '{}'.", self[QUANTITY.VALUE], parent[parent._KEYS.NAME])
 
         # Check that quantity value matches type after cleaning
         if (isinstance(self._key, Key) and
                 self._key.type == KEY_TYPES.NUMERIC and not
                 is_number(self[QUANTITY.VALUE])):
-            raise CatDictError(
-                "Value '{}' is not numeric, not adding to '{}'".format(
-                    self[QUANTITY.VALUE], parent[parent._KEYS.NAME]))
+            return Rejection(
+                REJECT.NOT_NUMERIC,
+                "Value '{}' is not numeric, not adding to '{}'",
+                self[QUANTITY.VALUE], parent[parent._KEYS.NAME])
+
+        return None
 
     def sort_func(self, key):
         if key == self._KEYS.VALUE:
@@ -0,0 +1,331 @@
+"""Columnar cache of the quantities (e.g. redshifts) of all catalog entries.
+
+For catalog-wide analysis, the values of each `Entry` quantity (e.g.
+`ENTRY.REDSHIFT`) are extracted from all of the output entry files once
+(`QuantityCache.build`), and stored as columns in one `.npz` file per
+quantity:
+
+-   'entry' : index of the entry (into `QuantityCache.names`) of each value.
+-   'value' : the stored (str) values.
+-   'value_float' : the values as floats ('NaN' if not numeric).
+-   'error' : the `QUANTITY.E_VALUE` of each value as floats ('NaN' if none).
+-   'kind' : the `QUANTITY.KIND` of each value ('' if none).
+-   'num_sources' : the number of sources of each value.
+
+Once the cache has been built, entries written by `Catalog.journal_entries`
+are added to a 'pending' file, which is applied when quantities are loaded,
+and merged into the columnar files by `QuantityCache.compact`.
+"""
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.utils import pbar, read_text_file, scan_entry_sections
+
+# Entry sections which are not quantities
+_NON_QUANTITIES = set([ENTRY.NAME, ENTRY.SCHEMA, ENTRY.SOURCES, ENTRY.ERRORS,
+                       ENTRY.PHOTOMETRY, ENTRY.SPECTRA])
+_COLUMNS = ['entry', 'value', 'value_float', 'error', 'kind', 'num_sources']
+
+
+class QuantityCache:
+    """Columnar files of entry quantities, see module docstring.
+
+    Arguments
+    ---------
+    catalog : `astrocats.catalog.catalog.Catalog` (sub)class instance
+    path : str or 'None'
+        Directory of the cache, by default 'cache/quantities' in the
+        catalog's output directory.
+
+    Attributes
+    ----------
+    names : list of str
+        Names of the entries, indexed by the 'entry' column.
+
+    """
+
+    _INDEX_FILENAME = 'index.json'
+    _PENDING_FILENAME = 'pending.jsonl'
+
+    def __init__(self, catalog, path=None):
+        self.catalog = catalog
+        if path is None:
+            path = os.path.join(catalog.PATHS.PATH_OUTPUT, 'cache',
+                                'quantities')
+        self.path = path
+        self.names = []
+        self._name_index = {}
+        if self.exists():
+            with open(self._index_path(), 'r') as fin:
+                self._set_names(json.load(fin)['names'])
+        return
+
+    def exists(self):
+        """Whether the cache has been built.
+        """
+        return os.path.isfile(self._index_path())
+
+    def quantities(self):
+        """Return the names of the quantities stored in the cache.
+        """
+        stored = [fname[:-len('.npz')] for fname in os.listdir(self.path)
+                  if fname.endswith('.npz')]
+        for update in self._read_pending().values():
+            stored.extend(update or [])
+        return sorted(set(stored))
+
+    def build(self, files=None):
+        """Construct the cache by reading all of the output entry files once.
+
+        Arguments
+        ---------
+        files : list of str or 'None'
+            Entry files to include, by default all of the catalog's output
+            files.
+
+        """
+        if files is None:
+            files = self.catalog.PATHS.get_repo_output_file_list()
+
+        names = []
+        columns = OrderedDict()
+        for fname in pbar(files, 'Building quantity cache'):
+            name, data = _decode_quantities(read_text_file(fname))
+            for key, rows in quantity_rows(data).items():
+                cols = columns.setdefault(key, [])
+                cols.extend([len(names)] + row for row in rows)
+            names.append(name)
+
+        os.makedirs(self.path, exist_ok=True)
+        for fname in os.listdir(self.path):
+            if fname.endswith('.npz'):
+                os.remove(os.path.join(self.path, fname))
+        for key, rows in columns.items():
+            self._save_columns(key, _rows_to_columns(rows))
+        self._set_names(names)
+        self._save_index()
+        self._clear_pending()
+        self.catalog.log.warning(
+            "Built quantity cache of {} entries, {} quantities in '{}'".format(
+                len(names), len(columns), self.path))
+        return
+
+    def update_entry(self, entry):
+        """Record the current quantities of `entry` (e.g. after it is saved).
+        """
+        self._append_pending(entry[ENTRY.NAME], quantity_rows(entry))
+        return
+
+    def remove_entry(self, name):
+        """Record that the entry `name` no longer exists.
+        """
+        self._append_pending(name, None)
+        return
+
+    def load(self, quantity):
+        """Load the columns of `quantity` (e.g. `ENTRY.REDSHIFT`).
+
+        Pending updates are applied.
+
+        Returns
+        -------
+        columns : dict of ndarray
+            The columns described in the module docstring.
+
+        """
+        columns = self._load_columns(quantity)
+        updates = self._read_pending()
+        if not updates:
+            return columns
+
+        # Remove all previous values of the updated entries
+        updated = [self._name_index[name] for name in updates
+                   if name in self._name_index]
+        keep = ~np.isin(columns['entry'], updated)
+        rows = []
+        for name, update in updates.items():
+            if update is None or quantity not in update:
+                continue
+            number = self._add_name(name)
+            rows.extend([number] + row for row in update[quantity])
+
+        new_columns = _rows_to_columns(rows)
+        return OrderedDict(
+            (col, np.concatenate([columns[col][keep], new_columns[col]]))
+            for col in _COLUMNS)
+
+    def compact(self):
+        """Merge the pending updates into the columnar files.
+        """
+        if not self._read_pending():
+            return
+        for quantity in self.quantities():
+            self._save_columns(quantity, self.load(quantity))
+        self._save_index()
+        self._clear_pending()
+        return
+
+    def _add_name(self, name):
+        number = self._name_index.get(name, None)
+        if number is None:
+            number = len(self.names)
+            self.names.append(name)
+            self._name_index[name] = number
+        return number
+
+    def _append_pending(self, name, update):
+        line = json.dumps([name, update], ensure_ascii=False)
+        with open(self._pending_path(), 'a', encoding='utf8') as fout:
+            fout.write(line + '\n')
+        return
+
+    def _clear_pending(self):
+        if os.path.exists(self._pending_path()):
+            os.remove(self._pending_path())
+        return
+
+    def _columns_path(self, quantity):
+        return os.path.join(self.path, quantity + '.npz')
+
+    def _index_path(self):
+        return os.path.join(self.path, self._INDEX_FILENAME)
+
+    def _load_columns(self, quantity):
+        path = self._columns_path(quantity)
+        if not os.path.exists(path):
+            return _rows_to_columns([])
+        with np.load(path) as npz:
+            return OrderedDict((col, npz[col]) for col in _COLUMNS)
+
+    def _pending_path(self):
+        return os.path.join(self.path, self._PENDING_FILENAME)
+
+    def _read_pending(self):
+        """Return the latest pending update of each entry, by name.
+
+        Updates are dicts of the rows of each quantity, or 'None' for entries
+        which were removed.
+        """
+        updates = OrderedDict()
+        if not os.path.exists(self._pending_path()):
+            return updates
+        with open(self._pending_path(), 'r', encoding='utf8') as fin:
+            for line in fin:
+                if line.strip():
+                    name, update = json.loads(line)
+                    updates.pop(name, None)
+                    updates[name] = update
+        return updates
+
+    def _save_columns(self, quantity, columns):
+        temp_path = self._columns_path(quantity) + '.tmp'
+        with open(temp_path, 'wb') as fout:
+            np.savez(fout, **columns)
+        os.replace(temp_path, self._columns_path(quantity))
+        return
+
+    def _save_index(self):
+        temp_path = self._index_path() + '.tmp'
+        with open(temp_path, 'w', encoding='utf8') as fout:
+            json.dump({'names': self.names}, fout, ensure_ascii=False)
+        os.replace(temp_path, self._index_path())
+        return
+
+    def _set_names(self, names):
+        self.names = list(names)
+        self._name_index = {name: ii for ii, name in enumerate(self.names)}
+        return
+
+
+def quantity_rows(data):
+    """Extract the cached fields of each quantity in the entry `data`.
+
+    Arguments
+    ---------
+    data : `Entry` or dict
+        An entry, or the (decoded) data of an entry file.
+
+    Returns
+    -------
+    rows : OrderedDict
+        Lists of '[value, error, kind, num_sources]' for each quantity.
+
+    """
+    rows = OrderedDict()
+    for key in list(data.keys()):
+        if key in _NON_QUANTITIES:
+            continue
+        values = data[key]
+        if not isinstance(values, list):
+            continue
+        key_rows = []
+        for quant in values:
+            if QUANTITY.VALUE not in quant:
+                continue
+            source = quant.get(QUANTITY.SOURCE, '')
+            key_rows.append([
+                str(quant[QUANTITY.VALUE]),
+                _to_float(quant.get(QUANTITY.E_VALUE, None)),
+                str(quant.get(QUANTITY.KIND, '')),
+                len(source.split(',')) if source else 0])
+        if key_rows:
+            rows[key] = key_rows
+    return rows
+
+
+def _decode_quantities(text):
+    """Decode the entry JSON `text`, skipping photometry and spectra.
+
+    Returns
+    -------
+    name : str
+    data : OrderedDict
+
+    """
+    try:
+        name, sections = scan_entry_sections(text)
+    except ValueError:
+        data = json.loads(text, object_pairs_hook=OrderedDict)
+        name = list(data.keys())[0]
+        return name, data[name]
+
+    decoder = json.JSONDecoder(object_pairs_hook=OrderedDict)
+    data = OrderedDict()
+    for key, (start, end) in sections.items():
+        if key not in _NON_QUANTITIES:
+            data[key] = decoder.raw_decode(text, start)[0]
+    return name, data
+
+
+def _rows_to_columns(rows):
+    """Convert '[entry, value, error, kind, num_sources]' rows to columns.
+    """
+    if not rows:
+        return OrderedDict([
+            ('entry', np.zeros(0, dtype=np.int32)),
+            ('value', np.zeros(0, dtype='U1')),
+            ('value_float', np.zeros(0)),
+            ('error', np.zeros(0)),
+            ('kind', np.zeros(0, dtype='U1')),
+            ('num_sources', np.zeros(0, dtype=np.int16))])
+
+    entry, value, error, kind, num_sources = zip(*rows)
+    return OrderedDict([
+        ('entry', np.array(entry, dtype=np.int32)),
+        ('value', np.array(value, dtype='U')),
+        ('value_float', np.array([_to_float(val) for val in value])),
+        ('error', np.array(error, dtype=float)),
+        ('kind', np.array(kind, dtype='U')),
+        ('num_sources', np.array(num_sources, dtype=np.int16))])
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -0,0 +1,148 @@
+"""Reasons for, and statistics of, data rejected while constructing entries.
+"""
+from collections import OrderedDict
+
+from astrocats.catalog.key import KeyCollection
+
+
+class REJECT(KeyCollection):
+    """`KeyCollection` of the reason codes used for `Rejection` objects.
+
+    Attributes
+    ----------
+    INVALID_VALUE : a required value does not match its `Key` specification.
+    BAD_VALUE : a value could not be cleaned (e.g. a list given for a
+        non-listable key, or a non-boolean for a boolean key).
+    UNKNOWN_KEY : keys not permitted for this class were given.
+    MISSING_REQUIRED : none of a set of required keys was given.
+    EMPTY_VALUE : the value of a quantity is empty.
+    NOT_NUMERIC : the value of a numeric quantity is not a number.
+    FAILED_CLEANING : the value did not survive the entry's cleaning.
+    DISTINCT_ALIAS : the alias is listed as distinct from the entry.
+    INCONSISTENT : the given keys are not consistent with each other.
+    NO_SOURCE : no source alias was given.
+    BAD_SOURCE : the source aliases are not a list of integers.
+    ERRONEOUS : the data is marked as erroneous for this source.
+    ERROR : a `CatDictError` was raised (e.g. by a subclass constructor).
+
+    """
+    INVALID_VALUE = 'invalid-value'
+    BAD_VALUE = 'bad-value'
+    UNKNOWN_KEY = 'unknown-key'
+    MISSING_REQUIRED = 'missing-required'
+    EMPTY_VALUE = 'empty-value'
+    NOT_NUMERIC = 'not-numeric'
+    FAILED_CLEANING = 'failed-cleaning'
+    DISTINCT_ALIAS = 'distinct-alias'
+    INCONSISTENT = 'inconsistent'
+    NO_SOURCE = 'no-source'
+    BAD_SOURCE = 'bad-source'
+    ERRONEOUS = 'erroneous'
+    ERROR = 'error'
+
+
+class Rejection:
+    """The reason that a `CatDict` (or other datum) was not constructed.
+
+    Returned instead of raising a `CatDictError` on the validation path (see
+    `CatDict.create`).  The message is only formatted when it is used.
+
+    Attributes
+    ----------
+    reason : str (one of `REJECT`)
+        Reason code for the rejection.
+    warn : bool
+        Whether the rejection should be reported (logged).
+
+    """
+    __slots__ = ['reason', 'warn', '_msg', '_args']
+
+    def __init__(self, reason, msg, *args, warn=True):
+        """Construct a rejection with the given reason code and message.
+
+        `msg` is a format string which is filled with `args` only if the
+        message is needed.
+        """
+        self.reason = reason
+        self.warn = warn
+        self._msg = msg
+        self._args = args
+
+    @classmethod
+    def from_error(cls, err, reason=REJECT.ERROR):
+        """Construct a `Rejection` from a raised `CatDictError`.
+        """
+        return cls(reason, '{}', err, warn=getattr(err, 'warn', True))
+
+    @property
+    def message(self):
+        if self._args:
+            self._msg = self._msg.format(*self._args)
+            self._args = ()
+        return self._msg
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return "Rejection(reason='{}', message='{}')".format(
+            self.reason, self.message)
+
+
+class RejectionStats:
+    """Counts of rejected data, for each (task, key, reason).
+
+    Each catalog keeps one instance (`Catalog.rejections`), which is filled by
+    `Entry` as data is added, and summarized at the end of each import task.
+    """
+
+    def __init__(self):
+        self._counts = OrderedDict()
+        return
+
+    def __len__(self):
+        return sum(self._counts.values())
+
+    def add(self, task, key, rejection):
+        """Count the given `Rejection` of data for `key` in `task`.
+        """
+        reason = rejection.reason
+        ident = (task, key, reason)
+        self._counts[ident] = self._counts.get(ident, 0) + 1
+        return
+
+    def counts(self, task=None):
+        """Return the counts as a dict of '(task, key, reason): number'.
+
+        If `task` is given, only the counts for that task are included.
+        """
+        if task is None:
+            return OrderedDict(self._counts)
+        return OrderedDict((ident, num) for ident, num in self._counts.items()
+                           if ident[0] == task)
+
+    def summary(self, task=None):
+        """Return a table of the rejection counts (for `task`) as a str.
+
+        Rows are sorted by decreasing number of rejections.  Returns 'None' if
+        there are no rejections.
+        """
+        counts = self.counts(task)
+        if not counts:
+            return None
+
+        rows = sorted(counts.items(), key=lambda row: (-row[1], row[0][1:]))
+        rows = [(str(ident[1]), str(ident[2]), '{:,}'.format(num))
+                for ident, num in rows]
+        head = ('Key', 'Reason', 'Count')
+        widths = [max(len(row[ii]) for row in rows + [head])
+                  for ii in range(len(head))]
+        line_fmt = '{:<{}}  {:<{}}  {:>{}}'
+
+        def fmt(row):
+            return line_fmt.format(row[0], widths[0], row[1], widths[1],
+                                   row[2], widths[2])
+
+        lines = [fmt(head), fmt(['-' * ww for ww in widths])]
+        lines.extend(fmt(row) for row in rows)
+        return '\n'.join(lines)
@@ -0,0 +1,183 @@
+"""Binary (NumPy) 'sidecar' files with the numeric data of saved entries.
+
+Each sidecar is a `.npz` file next to the entry's JSON file, containing:
+
+-   'photometry.<key>' : one float array (bool for boolean keys) for each
+    numeric `PHOTOMETRY` key present in the entry, with 'NaN' for missing or
+    non-numeric values.  For list values (e.g. time ranges) the first element
+    is used.
+-   'spectra.<number>' : a 2D float array for each spectrum with `data`, with
+    one column per data column (e.g. wavelength, flux, error).
+-   '_hash' : the content hash of the entry file that the sidecar was built
+    from, so that stale sidecars are detected (and rebuilt by `load_sidecar`).
+
+Sidecars are written by `Catalog.journal_entries` when `sidecars=True`.
+"""
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.key import KEY_TYPES
+from astrocats.catalog.photometry import PHOTOMETRY
+from astrocats.catalog.spectrum import SPECTRUM
+from astrocats.catalog.utils import read_text_file
+
+SIDECAR_SUFFIX = '.npz'
+_HASH_KEY = '_hash'
+PHOTOMETRY_PREFIX = 'photometry.'
+SPECTRA_PREFIX = 'spectra.'
+
+
+def content_hash(text):
+    """Return the hash (hex str) of the given entry file contents.
+    """
+    if isinstance(text, str):
+        text = text.encode('utf-8')
+    return hashlib.sha1(text).hexdigest()
+
+
+def sidecar_path(entry_path):
+    """Return the sidecar filename for the entry file `entry_path`.
+
+    e.g. 'SN2011fe.json' and 'SN2011fe.json.gz' both give 'SN2011fe.npz'.
+    """
+    if entry_path.endswith('.gz'):
+        entry_path = entry_path[:-len('.gz')]
+    if entry_path.endswith('.json'):
+        entry_path = entry_path[:-len('.json')]
+    return entry_path + SIDECAR_SUFFIX
+
+
+def write_sidecar(entry_path, text=None, force=False):
+    """Write the sidecar for the entry file `entry_path`, if it is stale.
+
+    Arguments
+    ---------
+    entry_path : str
+        Filename of the (saved) entry JSON file.
+    text : str or 'None'
+        The contents of the entry file, read from `entry_path` if not given.
+    force : bool
+        Rewrite the sidecar even if it is up to date.
+
+    Returns
+    -------
+    path : str
+        Filename of the sidecar.
+
+    """
+    if text is None:
+        text = read_text_file(entry_path)
+    path = sidecar_path(entry_path)
+    text_hash = content_hash(text)
+    if not force and _stored_hash(path) == text_hash:
+        return path
+
+    data = json.loads(text)
+    data = data[list(data.keys())[0]]
+    arrays = sidecar_arrays(data)
+    arrays[_HASH_KEY] = np.array(text_hash)
+    # Write to a temporary file so that readers never see partial sidecars
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as fout:
+        np.savez(fout, **arrays)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_sidecar(entry_path):
+    """Load the numeric arrays for the entry file `entry_path`.
+
+    The sidecar is (re)written first if it is missing, or stale, i.e. does not
+    match the current contents of the entry file.
+
+    Returns
+    -------
+    arrays : dict of ndarray
+        The sidecar arrays (see module docstring), excluding the hash.
+
+    """
+    text = read_text_file(entry_path)
+    path = sidecar_path(entry_path)
+    arrays = _read_sidecar(path)
+    if arrays is None or str(arrays[_HASH_KEY]) != content_hash(text):
+        write_sidecar(entry_path, text=text, force=True)
+        arrays = _read_sidecar(path)
+
+    arrays.pop(_HASH_KEY)
+    return arrays
+
+
+def delete_sidecar(entry_path):
+    """Delete the sidecar of the entry file `entry_path`, if it exists.
+    """
+    path = sidecar_path(entry_path)
+    if os.path.exists(path):
+        os.remove(path)
+    return
+
+
+def sidecar_arrays(data):
+    """Construct the sidecar arrays from the (decoded) data of an entry.
+    """
+    arrays = {}
+    photometry = data.get(ENTRY.PHOTOMETRY, [])
+    if photometry:
+        for key in PHOTOMETRY.vals():
+            if not any(key in photo for photo in photometry):
+                continue
+            if key.type == KEY_TYPES.NUMERIC:
+                values = [_to_float(photo.get(key, None))
+                          for photo in photometry]
+                arrays[PHOTOMETRY_PREFIX + key] = np.array(values, dtype=float)
+            elif key.type == KEY_TYPES.BOOL:
+                values = [bool(photo.get(key, False)) for photo in photometry]
+                arrays[PHOTOMETRY_PREFIX + key] = np.array(values, dtype=bool)
+
+    for ii, spectrum in enumerate(data.get(ENTRY.SPECTRA, [])):
+        rows = spectrum.get(SPECTRUM.DATA, None)
+        if not rows:
+            continue
+        num_cols = min(len(row) for row in rows)
+        values = [[_to_float(val) for val in row[:num_cols]] for row in rows]
+        arrays[SPECTRA_PREFIX + str(ii)] = np.array(values, dtype=float)
+
+    return arrays
+
+
+def _read_sidecar(path, keys=None):
+    """Return the arrays (for `keys`) in the sidecar `path`.
+
+    Returns 'None' if the sidecar does not exist or is invalid.
+    """
+    try:
+        with np.load(path) as npz:
+            if _HASH_KEY not in npz.files:
+                return None
+            if keys is None:
+                keys = npz.files
+            return {key: npz[key] for key in keys}
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def _stored_hash(path):
+    """Return the content hash stored in the sidecar `path`, or 'None'.
+    """
+    arrays = _read_sidecar(path, keys=[_HASH_KEY])
+    if arrays is None:
+        return None
+    return str(arrays[_HASH_KEY])
+
+
+def _to_float(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -1,6 +1,8 @@
 """Class for representing sources of data.
 """
-from astrocats.catalog.catdict import CatDict
+from collections import OrderedDict
+
+from astrocats.catalog.catdict import CatDict, _catdict_type
 from astrocats.catalog.key import KEY_TYPES, Key, KeyCollection
 
 
@@ -39,14 +41,10 @@ class Source(CatDict):
     """
 
     _KEYS = SOURCE
-
-    def __init__(self, parent, **kwargs):
-        self._REQ_KEY_SETS = [
-            [SOURCE.ALIAS],
-            [SOURCE.BIBCODE, SOURCE.URL, SOURCE.NAME]
-        ]
-        super().__init__(parent, **kwargs)
-        return
+    _REQ_KEY_SETS = [
+        [SOURCE.ALIAS],
+        [SOURCE.BIBCODE, SOURCE.URL, SOURCE.NAME]
+    ]
 
     def sort_func(self, key):
         if key == self._KEYS.NAME:
@@ -69,7 +67,7 @@ class Source(CatDict):
         if *either* name or bibcode is the same.
         """
         # If these are not the same type, return False
-        if type(other) is not type(self):
+        if _catdict_type(other) is not _catdict_type(self):
             return False
 
         # Go over all expected parameters and check equality of each
@@ -89,6 +87,32 @@ class Source(CatDict):
 
         return False
 
+    @classmethod
+    def _from_canonical(cls, parent, key, items, alias):
+        """Construct a new `Source` from already validated parameters.
+
+        No validation or cleaning is performed; `items` should come from a
+        previously constructed `Source` (see `SourceRegistry`).
+
+        Arguments
+        ---------
+        parent : `astrocats.catalog.entry.Entry` (sub)class object
+        key : str or 'None'
+        items : iterable of (key, value) pairs
+            Validated source parameters, excluding `SOURCE.ALIAS`.
+        alias : str
+            Validated alias number of this source within `parent`.
+
+        """
+        new_source = cls.__new__(cls)
+        OrderedDict.__init__(new_source)
+        new_source._parent = parent
+        new_source._key = key
+        new_source._log = parent.catalog.log
+        new_source.update(items)
+        new_source[SOURCE.ALIAS] = alias
+        return new_source
+
     @classmethod
     def bibcode_from_url(cls, url):
         """Given a URL, try to find the ADS bibcode.
@@ -107,3 +131,72 @@ class Source(CatDict):
             return code
         except:
             return None
+
+
+class SourceRegistry:
+    """Catalog-wide collection of canonical (validated) source parameters.
+
+    The same sources (e.g. the catalog's own 'self' source, or commonly cited
+    bibcodes) are added to many different entries.  The registry validates
+    each distinct set of source parameters only once, and stores a single,
+    canonical copy of them.  The `Source` objects stored in each entry then
+    share those (canonical) values, only adding their own local alias number.
+
+    Attributes
+    ----------
+    num_reused : int
+        Number of sources constructed from an existing canonical copy.
+    num_validated : int
+        Number of sources which were fully constructed and validated.
+
+    """
+
+    def __init__(self):
+        self._canonical = {}
+        self.num_reused = 0
+        self.num_validated = 0
+        return
+
+    def __len__(self):
+        return len(self._canonical)
+
+    def new_source(self, source_class, parent, key=None, **kwargs):
+        """Construct a new `Source` (subclass) instance for the given `parent`.
+
+        Behaves like ``source_class.create(parent, key=key, **kwargs)``: if
+        the given parameters are invalid a `Rejection` is returned.
+
+        Returns
+        -------
+        source : `source_class` object or 'None'
+        rejection : `Rejection` or 'None'
+
+        """
+        alias = kwargs.get(SOURCE.ALIAS, None)
+        try:
+            reg_key = (source_class, tuple(sorted(
+                (kk, vv) for kk, vv in kwargs.items() if kk != SOURCE.ALIAS)))
+            canonical = self._canonical.get(reg_key, None)
+        except TypeError:
+            # Unhashable parameter values cannot be registered
+            return source_class.create(parent, key=key, **kwargs)
+
+        # The alias is the only per-entry parameter, make sure it is valid,
+        # otherwise use the full construction to handle the problem.
+        if (canonical is not None and alias is not None and
+                SOURCE.ALIAS.check(alias)):
+            alias = str(alias).strip()
+            if alias:
+                self.num_reused += 1
+                return source_class._from_canonical(
+                    parent, key, canonical, alias), None
+
+        new_source, rejection = source_class.create(parent, key=key, **kwargs)
+        if rejection is not None:
+            return None, rejection
+        self.num_validated += 1
+        if canonical is None:
+            self._canonical[reg_key] = tuple(
+                (kk, vv) for kk, vv in new_source.items()
+                if kk != SOURCE.ALIAS)
+        return new_source, None
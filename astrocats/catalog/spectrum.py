@@ -1,8 +1,11 @@
 """Class for representing spectra.
 """
+import numpy as np
+
 from astrocats.catalog.catdict import CatDict
+from astrocats.catalog.rejection import REJECT, Rejection
 from astrocats.catalog.key import KEY_TYPES, Key, KeyCollection
-from astrocats.catalog.utils import trim_str_arr
+from astrocats.catalog.utils import trim_str_arr, trim_str_array
 
 
 class SPECTRUM(KeyCollection):
@@ -47,49 +50,58 @@ class Spectrum(CatDict):
     """
 
     _KEYS = SPECTRUM
+    _REQ_KEY_SETS = [
+        [SPECTRUM.SOURCE, SPECTRUM.FILENAME],
+        [SPECTRUM.U_FLUXES, SPECTRUM.FILENAME],
+        [SPECTRUM.U_WAVELENGTHS, SPECTRUM.FILENAME],
+    ]
 
-    def __init__(self, parent, **kwargs):
-        self._REQ_KEY_SETS = [
-            [SPECTRUM.SOURCE, SPECTRUM.FILENAME],
-            [SPECTRUM.U_FLUXES, SPECTRUM.FILENAME],
-            [SPECTRUM.U_WAVELENGTHS, SPECTRUM.FILENAME],
-        ]
-
-        # FIX: add this back in
-        # [SPECTRUM.TIME, SPECTRUM.HOST]
+    # FIX: add this back in
+    # [SPECTRUM.TIME, SPECTRUM.HOST]
 
-        # Note: `_check()` is called at end of `super().__init__`
-        super().__init__(parent, **kwargs)
+    def _setup(self, parent, **kwargs):
+        # Note: `_validate()` is called at end of `super()._setup`
+        rejection = super()._setup(parent, **kwargs)
+        if rejection is not None:
+            return rejection
 
         # If `data` is not given, construct it from wavelengths, fluxes
         # [errors] `errors` is optional, but if given, then `errorunit` is also
         # req'd
+        use_arrays = parent.catalog.ARRAY_SPECTRA
         if SPECTRUM.DATA not in self:
             try:
                 wavelengths = self[SPECTRUM.WAVELENGTHS]
                 fluxes = self[SPECTRUM.FLUXES]
             except KeyError:
                 if SPECTRUM.FILENAME in self:
-                    return
+                    return None
                 else:
-                    err_str = "Neither data nor (wavelengths and fluxes) given"
-                    self._log.error(err_str)
-                    raise
+                    return Rejection(
+                        REJECT.MISSING_REQUIRED,
+                        "Neither data nor (wavelengths and fluxes) given")
 
             errors = self.get(SPECTRUM.ERRORS, None)
+            columns = [wavelengths, fluxes]
             if (errors is not None and
                     max([float(err) for err in errors]) > 0.0):
                 if SPECTRUM.U_ERRORS not in self:
-                    raise ValueError(
-                        "Without `{}`,".format(SPECTRUM.DATA) +
-                        " but with `{}`,".format(SPECTRUM.ERRORS) +
-                        " `{}` also required".format(SPECTRUM.U_ERRORS))
-                data = [trim_str_arr(wavelengths), trim_str_arr(fluxes),
-                        trim_str_arr(errors)]
+                    return Rejection(
+                        REJECT.MISSING_REQUIRED,
+                        "Without `{}`, but with `{}`, `{}` also required",
+                        SPECTRUM.DATA, SPECTRUM.ERRORS, SPECTRUM.U_ERRORS)
+                columns.append(errors)
+
+            data = None
+            if use_arrays:
+                data = SpectrumData.from_columns(columns)
+            if data is not None:
+                data.trim()
             else:
-                data = [trim_str_arr(wavelengths), trim_str_arr(fluxes)]
+                data = [trim_str_arr(col) for col in columns]
+                data = [list(i) for i in zip(*data)]
 
-            self[SPECTRUM.DATA] = [list(i) for i in zip(*data)]
+            self[SPECTRUM.DATA] = data
             if SPECTRUM.WAVELENGTHS in self:
                 del self[SPECTRUM.WAVELENGTHS]
             if SPECTRUM.FLUXES in self:
@@ -97,19 +109,36 @@ class Spectrum(CatDict):
             if SPECTRUM.ERRORS in self:
                 del self[SPECTRUM.ERRORS]
 
+        elif use_arrays and isinstance(self[SPECTRUM.DATA], list):
+            data = SpectrumData.from_rows(self[SPECTRUM.DATA])
+            if data is not None:
+                self[SPECTRUM.DATA] = data
+
         if self._KEYS.U_TIME not in self:
             self._log.info('`{}` not found in spectrum, assuming '
                            ' MJD.'.format(self._KEYS.U_TIME))
             self[self._KEYS.U_TIME] = 'MJD'
 
-        return
+        return None
+
+    @classmethod
+    def _from_validated(cls, parent, key, items):
+        spectrum = super()._from_validated(parent, key, items)
+        if (spectrum is not None and parent.catalog.ARRAY_SPECTRA and
+                isinstance(spectrum.get(SPECTRUM.DATA), list)):
+            data = SpectrumData.from_rows(spectrum[SPECTRUM.DATA])
+            if data is not None:
+                spectrum[SPECTRUM.DATA] = data
+        return spectrum
 
-    def _check(self):
+    def _validate(self):
         """
 
         """
         # Run the super method
-        super()._check()
+        rejection = super()._validate()
+        if rejection is not None:
+            return rejection
 
         err_str = None
         has_data = self._KEYS.DATA in self
@@ -125,9 +154,9 @@ class Spectrum(CatDict):
                         self._KEYS.WAVELENGTHS, self._KEYS.FLUXES))
 
         if err_str is not None:
-            raise ValueError(err_str)
+            return Rejection(REJECT.INCONSISTENT, err_str)
 
-        return
+        return None
 
     def sort_func(self, key):
         if key == self._KEYS.TIME:
@@ -137,3 +166,143 @@ class Spectrum(CatDict):
         if key == self._KEYS.SOURCE:
             return 'zzz'
         return key
+
+
+class SpectrumData:
+    """Array-backed storage for the `SPECTRUM.DATA` of a `Spectrum`.
+
+    Instead of a list (of rows) of lists of str, each column (e.g.
+    wavelengths, fluxes and errors) is stored as a single NumPy array of the
+    original strings; ASCII strings take one byte per character.  Float
+    values are parsed on demand (`floats`), and `tolist` returns the standard
+    list-of-lists format, which is used when the spectrum is saved.
+
+    Used by `Spectrum` when the catalog's `ARRAY_SPECTRA` is 'True'.
+
+    Attributes
+    ----------
+    columns : list of ndarray
+        String arrays (of kind 'S' or 'U') of the same length.
+
+    """
+    __slots__ = ['columns']
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        return
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Construct from a list of columns, each a list of str.
+
+        Like `zip`, columns are truncated to the shortest length.
+
+        Returns
+        -------
+        data : `SpectrumData` or 'None'
+            'None' if any of the values are not strings.
+
+        """
+        arrays = []
+        for col in columns:
+            arr = _str_array(col)
+            if arr is None:
+                return None
+            arrays.append(arr)
+        num = min(len(arr) for arr in arrays) if arrays else 0
+        return cls([arr[:num] for arr in arrays])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Construct from a list of rows, each a list of str.
+
+        Returns
+        -------
+        data : `SpectrumData` or 'None'
+            'None' if the rows are not all the same length, or if any of the
+            values are not strings.
+
+        """
+        if not rows or len(set(len(row) for row in rows)) != 1:
+            return None
+        return cls.from_columns(list(zip(*rows)))
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(self.columns[0])
+
+    def __iter__(self):
+        for row in zip(*[_str_list(col) for col in self.columns]):
+            yield list(row)
+
+    def __getitem__(self, index):
+        """Return a row (list of str), or a list of rows for a slice.
+        """
+        if not self.columns:
+            return [][index]
+        if isinstance(index, slice):
+            return [list(row) for row in zip(*[_str_list(col[index])
+                                               for col in self.columns])]
+        return [_str_value(col[index]) for col in self.columns]
+
+    def __eq__(self, other):
+        if isinstance(other, SpectrumData):
+            other = other.tolist()
+        return self.tolist() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "SpectrumData(rows={}, columns={})".format(
+            len(self), len(self.columns))
+
+    def column(self, index):
+        """Return the column `index` as a list of str.
+        """
+        return _str_list(self.columns[index])
+
+    def floats(self, index):
+        """Return the values of column `index` parsed into a float array.
+        """
+        return self.columns[index].astype(float)
+
+    def tolist(self):
+        """Return the data as a list (of rows) of lists of str.
+        """
+        return [list(row) for row in zip(*[_str_list(col)
+                                           for col in self.columns])]
+
+    def trim(self, length=10, max_rows=10):
+        """Shorten long values in each column, see `trim_str_array`.
+        """
+        self.columns = [trim_str_array(col, length=length, max_rows=max_rows)
+                        for col in self.columns]
+        return
+
+
+def _str_array(values):
+    """Convert a sequence of str to an array, 'None' if they are not str.
+    """
+    if not all(type(val) is str for val in values):
+        return None
+    try:
+        return np.array(values, dtype='S')
+    except UnicodeEncodeError:
+        return np.array(values, dtype='U')
+
+
+def _str_value(value):
+    """Convert an element of an array of strings (of kind 'S' or 'U') to str.
+    """
+    if isinstance(value, bytes):
+        return value.decode('ascii')
+    return str(value)
+
+
+def _str_list(array):
+    """Convert an array of strings (of kind 'S' or 'U') to a list of str.
+    """
+    if array.dtype.kind == 'S':
+        array = array.astype('U')
+    return array.tolist()
@@ -0,0 +1,485 @@
+"""Storage backends for the (JSON) text of saved entries.
+
+All entries are saved and loaded through the catalog's `EntryStore`
+(`Catalog.store`):
+
+-   `JsonFileStore` (default) : one JSON file per entry in the output
+    repositories.  These files are the canonical form of the catalog.
+-   `SQLiteStore` : a single SQLite database, with one row (blob) per entry
+    and an indexed table of entry aliases.  Writes are batched into
+    transactions, and the database uses write-ahead logging, which makes
+    saving and reloading entries during an import much faster than writing
+    individual files.  After the import, the entries are exported to the
+    canonical JSON files (see `Catalog.export_entries`).  The modification
+    time and size of the JSON file of each copied (or exported) entry are
+    recorded, and entries whose file has changed since are reloaded from it.
+
+The store is selected with the '--store' import argument.
+"""
+import abc
+import os
+import sqlite3
+
+from astrocats.catalog.entry import ENTRY, EntryStub
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.sidecar import delete_sidecar
+from astrocats.catalog.utils import (get_entry_aliases, pbar, read_text_file,
+                                     uncompress_gz)
+
+STORE_TYPES = ['json', 'sqlite']
+
+
+class EntryStore(abc.ABC):
+    """Base class for storage of the (JSON) text of entries.
+
+    Arguments
+    ---------
+    catalog : `astrocats.catalog.catalog.Catalog` (sub)class instance
+
+    Attributes
+    ----------
+    WRITES_FILES : bool
+        Whether entries are stored as individual (JSON) files, i.e. whether
+        the locations returned by `write_entry` are filenames.
+
+    """
+
+    WRITES_FILES = False
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.log = catalog.log
+        return
+
+    @abc.abstractmethod
+    def __len__(self):
+        """Return the number of stored entries.
+        """
+
+    @abc.abstractmethod
+    def read(self, name):
+        """Return the text and location of the entry `name`.
+
+        Returns 'None' if the entry is not stored.
+        """
+
+    @abc.abstractmethod
+    def write_entry(self, entry, text, bury=False):
+        """Store the `text` of the `entry` (or `EntryStub`).
+
+        The `text` can also be given as an iterable of chunks of text, see
+        `Entry.save`.
+
+        Returns
+        -------
+        location : str
+            Where the entry was stored (e.g. the filename).
+
+        """
+
+    @abc.abstractmethod
+    def delete_entry(self, entry):
+        """Delete the stored `entry` (or `EntryStub`).
+
+        Returns
+        -------
+        location : str or 'None'
+            Where the entry was stored, or 'None' if it was not found.
+
+        """
+
+    @abc.abstractmethod
+    def iter_stubs(self):
+        """Yield an '(name, `EntryStub`)' pair for each stored entry.
+        """
+
+    @abc.abstractmethod
+    def iter_texts(self):
+        """Yield an '(`EntryStub`, text, bury)' tuple for each stored entry.
+        """
+
+    @abc.abstractmethod
+    def clear(self):
+        """Delete all stored entries.
+        """
+
+    def copy_from(self, store):
+        """Store all of the entries in another `EntryStore`.
+
+        The files written by (or copied from) a store which `WRITES_FILES`
+        are recorded by the other store (see `mirror_file`).
+        """
+        num = 0
+        for stub, text, bury in pbar(store.iter_texts(), 'Copying entries'):
+            location = self.write_entry(stub, text, bury=bury)
+            if self.WRITES_FILES:
+                store.mirror_file(stub, location)
+            elif store.WRITES_FILES:
+                self.mirror_file(stub, stub.filename)
+            num += 1
+        self.flush()
+        return num
+
+    def mirror_file(self, entry, path):
+        """Record that the stored `entry` has the same text as the file
+        `path`.
+        """
+        return
+
+    def flush(self):
+        """Make sure all stored entries are written.
+        """
+        return
+
+    def close(self):
+        """Release any resources, e.g. open connections.
+        """
+        self.flush()
+        return
+
+
+class JsonFileStore(EntryStore):
+    """Store each entry in a JSON file in the output repositories.
+    """
+
+    WRITES_FILES = True
+
+    def __len__(self):
+        return len(self.catalog.PATHS.get_repo_output_file_list())
+
+    def read(self, name):
+        filename = self.catalog.proto.get_filename(name)
+        for rep in self.catalog.PATHS.get_repo_output_folders():
+            path = os.path.join(rep, filename + '.json')
+            if os.path.isfile(path):
+                with open(path, 'r') as jfil:
+                    return jfil.read(), path
+        return None
+
+    def write_entry(self, entry, text, bury=False):
+        outdir, filename = entry._get_save_path(bury=bury)
+        if not os.path.isdir(outdir):
+            raise RuntimeError("Output directory '{}' for event '{}' does "
+                               "not exist.".format(outdir, entry[ENTRY.NAME]))
+        save_name = os.path.join(outdir, filename + '.json')
+        if isinstance(text, str):
+            text = [text]
+        with open(save_name, 'w', encoding='utf8', newline='') as sf:
+            sf.writelines(text)
+
+        if not os.path.exists(save_name):
+            raise RuntimeError("File '{}' was not saved!".format(save_name))
+
+        return save_name
+
+    def delete_entry(self, entry):
+        outdir, filename = entry._get_save_path()
+        # FIX: do we also need to check for gzipped files??
+        entry_filename = os.path.join(outdir, filename + '.json')
+        if not os.path.exists(entry_filename):
+            self.log.error("Filename '{}' does not exist".format(
+                entry_filename))
+        os.remove(entry_filename)
+        delete_sidecar(entry_filename)
+        return entry_filename
+
+    def iter_stubs(self):
+        """Yield stubs constructed from the alias section of each file (see
+        `get_entry_aliases`).
+        """
+        files = self.catalog.PATHS.get_repo_output_file_list()
+        for fi in pbar(files, 'Loading entry stubs'):
+            fname = fi
+            # FIX: should this be ``fi.endswith(``.gz')`` ?
+            if '.gz' in fi:
+                fname = uncompress_gz(fi)
+            name = os.path.basename(
+                os.path.splitext(fname)[0]).replace('.json', '')
+            entry_name, aliases = get_entry_aliases(
+                read_text_file(fname), ENTRY.ALIAS, QUANTITY.VALUE)
+            yield name, EntryStub(self.catalog, entry_name, aliases=aliases,
+                                  filename=fname)
+
+    def iter_texts(self):
+        boneyard = os.path.normpath(self.catalog.PATHS.get_repo_boneyard())
+        for fname in self.catalog.PATHS.get_repo_output_file_list():
+            text = read_text_file(fname)
+            name, aliases = get_entry_aliases(text, ENTRY.ALIAS,
+                                              QUANTITY.VALUE)
+            stub = EntryStub(self.catalog, name, aliases=aliases,
+                             filename=fname)
+            bury = os.path.dirname(os.path.normpath(fname)) == boneyard
+            yield stub, text, bury
+
+    def clear(self):
+        repo_files = self.catalog.PATHS.get_repo_output_file_list()
+        for rfil in pbar(repo_files, desc='Deleting old entries'):
+            os.remove(rfil)
+            self.log.debug("Deleted '{}'".format(os.path.split(rfil)[-1]))
+        return
+
+
+class SQLiteStore(EntryStore):
+    """Store entries in a SQLite database.
+
+    Arguments
+    ---------
+    catalog : `astrocats.catalog.catalog.Catalog` (sub)class instance
+    path : str or 'None'
+        Filename of the database, by default `DATABASE_FILENAME` in the
+        catalog's output directory.
+
+    Attributes
+    ----------
+    BATCH_SIZE : int
+        Number of entries written (or deleted) per transaction.
+
+    Entries copied from (or exported to) JSON files are recorded in the
+    'files' table (with the modification time and size of the file), until
+    they are saved (or deleted).  Before these entries are read, the files
+    are checked, and entries whose file has changed are reloaded from it, so
+    that stale entries are never read.  Entries whose file was deleted (e.g.
+    before exporting all entries) are kept.
+
+    """
+
+    DATABASE_FILENAME = 'entries.sqlite'
+    BATCH_SIZE = 500
+
+    _SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "name TEXT PRIMARY KEY, bury INTEGER NOT NULL, data BLOB NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS aliases ("
+        "alias TEXT NOT NULL, name TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS aliases_alias ON aliases (alias)",
+        "CREATE INDEX IF NOT EXISTS aliases_name ON aliases (name)",
+        "CREATE TABLE IF NOT EXISTS files ("
+        "name TEXT PRIMARY KEY, path TEXT NOT NULL, "
+        "mtime INTEGER NOT NULL, size INTEGER NOT NULL)",
+    ]
+
+    def __init__(self, catalog, path=None):
+        super().__init__(catalog)
+        self.path = path
+        self._conn = None
+        self._num_pending = 0
+        return
+
+    def __len__(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def read(self, name):
+        self._refresh(name)
+        row = self._connect().execute(
+            "SELECT data FROM entries WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return row[0].decode('utf-8'), self._location(name)
+
+    def write_entry(self, entry, text, bury=False):
+        name = entry[ENTRY.NAME]
+        aliases = entry.get_aliases(includename=False)
+        if not isinstance(text, str):
+            text = ''.join(text)
+        conn = self._connect()
+        self._store(conn, name, aliases, text, bury)
+        # The entry no longer has the text of its file (if any)
+        conn.execute("DELETE FROM files WHERE name = ?", (name,))
+        self._batch_done()
+        return self._location(name)
+
+    def delete_entry(self, entry):
+        name = entry[ENTRY.NAME]
+        conn = self._connect()
+        deleted = conn.execute(
+            "DELETE FROM entries WHERE name = ?", (name,)).rowcount
+        conn.execute("DELETE FROM aliases WHERE name = ?", (name,))
+        conn.execute("DELETE FROM files WHERE name = ?", (name,))
+        self._batch_done()
+        if not deleted:
+            self.log.error("Entry '{}' does not exist in '{}'".format(
+                name, self.path))
+            return None
+        return self._location(name)
+
+    def mirror_file(self, entry, path):
+        stamp = self._file_stamp(path)
+        if stamp is None:
+            return
+        self._connect().execute(
+            "INSERT OR REPLACE INTO files (name, path, mtime, size) "
+            "VALUES (?, ?, ?, ?)", (entry[ENTRY.NAME], path) + stamp)
+        self._batch_done()
+        return
+
+    def find_alias(self, alias):
+        """Return the names of all stored entries with the given alias.
+        """
+        self._refresh_all()
+        rows = self._connect().execute(
+            "SELECT DISTINCT name FROM aliases WHERE alias = ?", (alias,))
+        return [row[0] for row in rows]
+
+    def iter_stubs(self):
+        """Yield stubs constructed from the alias table (without decoding).
+        """
+        self._refresh_all()
+        conn = self._connect()
+        aliases = {}
+        for name, alias in conn.execute(
+                "SELECT name, alias FROM aliases ORDER BY rowid"):
+            aliases.setdefault(name, []).append(alias)
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM entries ORDER BY name")]
+        for name in pbar(names, 'Loading entry stubs'):
+            yield name, EntryStub(self.catalog, name,
+                                  aliases=aliases.get(name, ()),
+                                  filename=self._location(name))
+
+    def iter_texts(self):
+        self._refresh_all()
+        conn = self._connect()
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM entries ORDER BY name")]
+        for name in names:
+            bury, data = conn.execute(
+                "SELECT bury, data FROM entries WHERE name = ?",
+                (name,)).fetchone()
+            aliases = [row[0] for row in conn.execute(
+                "SELECT alias FROM aliases WHERE name = ? ORDER BY rowid",
+                (name,))]
+            stub = EntryStub(self.catalog, name, aliases=aliases,
+                             filename=self._location(name))
+            yield stub, data.decode('utf-8'), bool(bury)
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM aliases")
+        conn.execute("DELETE FROM files")
+        conn.commit()
+        self._num_pending = 0
+        return
+
+    def flush(self):
+        if self._conn is not None and self._num_pending:
+            self._conn.commit()
+            self.log.debug("Committed {} entries to '{}'".format(
+                self._num_pending, self.path))
+            self._num_pending = 0
+        return
+
+    def close(self):
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        return
+
+    def _batch_done(self):
+        """Count a write, and commit the transaction if the batch is full.
+        """
+        self._num_pending += 1
+        if self._num_pending >= self.BATCH_SIZE:
+            self.flush()
+        return
+
+    def _connect(self):
+        """Return the (open) database connection, opening it if needed.
+        """
+        if self._conn is None:
+            if self.path is None:
+                self.path = os.path.join(self.catalog.PATHS.PATH_OUTPUT,
+                                         self.DATABASE_FILENAME)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+        return self._conn
+
+    def _location(self, name):
+        return '{}#{}'.format(self.path, name)
+
+    def _store(self, conn, name, aliases, text, bury):
+        """Insert (or replace) the `text` and `aliases` of the entry `name`.
+        """
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (name, bury, data) "
+            "VALUES (?, ?, ?)", (name, int(bury), text.encode('utf-8')))
+        conn.execute("DELETE FROM aliases WHERE name = ?", (name,))
+        conn.executemany(
+            "INSERT INTO aliases (alias, name) VALUES (?, ?)",
+            [(alias, name) for alias in aliases])
+        return
+
+    def _file_stamp(self, path):
+        """Return the '(mtime, size)' of the file `path`, or 'None' if it
+        does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self, name):
+        """Reload the entry `name` from its file if the file has changed.
+        """
+        row = self._connect().execute(
+            "SELECT path, mtime, size FROM files WHERE name = ?",
+            (name,)).fetchone()
+        if row is not None:
+            self._refresh_file(name, row[0], tuple(row[1:]))
+        return
+
+    def _refresh_all(self):
+        """Reload all entries whose file has changed.
+        """
+        rows = self._connect().execute(
+            "SELECT name, path, mtime, size FROM files").fetchall()
+        for name, path, mtime, size in rows:
+            self._refresh_file(name, path, (mtime, size))
+        return
+
+    def _refresh_file(self, name, path, stamp):
+        """Reload the entry `name` if its file `path` no longer has the
+        recorded `stamp` (see `_file_stamp`).
+        """
+        new_stamp = self._file_stamp(path)
+        if new_stamp == stamp:
+            return
+        conn = self._connect()
+        if new_stamp is None:
+            self.log.debug("File '{}' of entry '{}' was deleted.".format(
+                path, name))
+            conn.execute("DELETE FROM files WHERE name = ?", (name,))
+        else:
+            self.log.warning("File '{}' of entry '{}' has changed, "
+                             "reloading the entry.".format(path, name))
+            text = read_text_file(path)
+            aliases = get_entry_aliases(text, ENTRY.ALIAS, QUANTITY.VALUE)[1]
+            boneyard = os.path.normpath(self.catalog.PATHS.get_repo_boneyard())
+            bury = os.path.dirname(os.path.normpath(path)) == boneyard
+            self._store(conn, name, aliases, text, bury)
+            conn.execute("UPDATE files SET mtime = ?, size = ? WHERE name = ?",
+                         new_stamp + (name,))
+        self._batch_done()
+        return
+
+
+def get_store(catalog, store_type=None):
+    """Construct the `EntryStore` of the given type (see `STORE_TYPES`).
+
+    By default, the type is set by the '--store' command-line argument.
+    """
+    if store_type is None:
+        store_type = getattr(catalog.args, 'store', None) or 'json'
+    if store_type == 'json':
+        return JsonFileStore(catalog)
+    if store_type == 'sqlite':
+        return SQLiteStore(catalog)
+    raise ValueError("Unknown entry store '{}', must be one of {}".format(
+        store_type, STORE_TYPES))
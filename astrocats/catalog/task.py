@@ -33,6 +33,11 @@ class Task():
         Function to execute when carrying out this task.
     priority : int
         Order in which tasks should be executed
+    deltas : bool
+        Whether this task can record its data in delta logs (with
+        '--deltas', see `astrocats.catalog.delta`), i.e. it only uses the
+        `add_*` methods of the entries.  Otherwise it always modifies the
+        entries directly.
 
     """
 
@@ -53,6 +58,7 @@ class Task():
         self.function = ''
         self.priority = None
         self.always_journal = False
+        self.deltas = True
 
         for key, val in kwargs.items():
             if hasattr(self, key):
@@ -68,11 +74,11 @@ class Task():
     def __repr__(self):
         retval = ("Task(name='{}', nice_name='{}', active='{}', update='{}', "
                   "archived='{}', module='{}', function='{}', repo='{}', "
-                  "priority='{}', always_journal='{}'")
+                  "priority='{}', always_journal='{}', deltas='{}'")
         retval = retval.format(self.name, self.nice_name, self.active,
                                self.update, self.archived, self.module,
                                self.function, self.repo, self.priority,
-                               self.always_journal)
+                               self.always_journal, self.deltas)
         return retval
 
     def current_task(self, args):
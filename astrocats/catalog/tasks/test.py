@@ -1,11 +1,20 @@
 """
 """
+import json
 import os
+from contextlib import contextmanager
 
 from astrocats.catalog.catalog import ENTRY
+from astrocats.catalog.catdict import CompactRecord
+from astrocats.catalog.manifest import EntryManifest
+from astrocats.catalog.photometry import PhotometryTable
 from astrocats.catalog.source import SOURCE
+from astrocats.catalog.spectrum import SPECTRUM, SpectrumData
 from astrocats.catalog.quantity import QUANTITY
-from astrocats.catalog.utils import tprint, tq, pbar_strings
+from astrocats.catalog.sidecar import content_hash
+from astrocats.catalog.utils import (JSON_BACKENDS, check_json_backend,
+                                     get_json_backend, pbar_strings, tprint,
+                                     tq)
 
 FAKE_ALIAS_1 = 'EN-TEST-AA'
 FAKE_ALIAS_2 = 'PS-TEST-AB'
@@ -25,6 +34,9 @@ FAKE_BIBCODE_3 = '2001PASJ..547..364C'
 FAKE_REDZ_1 = '1.123'
 FAKE_REDZ_2 = '0.987'
 
+# Modes of loading entries (see `_load_modes`) checked by copying them
+COPY_MODES = ['default', 'lazy', 'trusted']
+
 
 def do_test(catalog):
     log = catalog.log
@@ -56,6 +68,10 @@ def do_test(catalog):
     boneyard = catalog.PATHS.get_repo_boneyard()
     log.error(boneyard)
 
+    # Make sure the JSON backends write identical entry files
+    # -------------------------------------------------------
+    check_json_backends(catalog)
+
     # Create a Fake Entry, with some Fake Data
     # ----------------------------------------
     _first_event_first_source(catalog)
@@ -68,15 +84,22 @@ def do_test(catalog):
     # -------------------------------------------------------
     _first_event_second_source(catalog)
 
-    # Make sure output file for this test exists
-    outdir, filename = catalog.entries[FAKE_ALIAS_1]._get_save_path()
-    save_name = os.path.join(outdir, filename + '.json')
-    if not os.path.exists(save_name):
-        raise RuntimeError("File not found in '{}'".format(save_name))
+    # Make sure output file (or store record) for this test exists
+    stored = catalog.store.read(FAKE_ALIAS_1)
+    if stored is None:
+        raise RuntimeError("Entry '{}' not found in the entry store".format(
+            FAKE_ALIAS_1))
+    save_name = stored[1]
+
+    # Make sure each mode of loading the entry saves the same text
+    # ------------------------------------------------------------
+    check_round_trips(catalog)
+    check_entry_copies(catalog)
+
     # Delete created test file
     catalog._delete_entry_file(entry_name=FAKE_ALIAS_1)
     # Make sure it was deleted
-    if os.path.exists(save_name):
+    if catalog.store.read(FAKE_ALIAS_1) is not None:
         raise RuntimeError("File not deleted at '{}'".format(save_name))
 
     # Delete entry in catalog
@@ -94,8 +117,9 @@ def do_test(catalog):
               catalog.get_preferred_name(FAKE_ALIAS_2))
     log.error("Entry exists? " +
               str(catalog.entry_exists(FAKE_ALIAS_2)))
-    log.error("Entry text: " + catalog.entries[FAKE_ALIAS_1].get_entry_text(
-        os.path.join(outdir, filename + '.json')))
+    if catalog.store.WRITES_FILES:
+        log.error("Entry text: " + catalog.entries[
+            FAKE_ALIAS_1].get_entry_text(save_name))
 
     # Third source is a duplicate that will be merged
     _first_event_third_source(catalog)
@@ -331,6 +355,157 @@ def check_source_2(catalog, name):
     return
 
 
+def check_json_backends(catalog):
+    log = catalog.log
+    log.error("Using JSON backend: '{}'".format(catalog.json_backend.NAME))
+    for name in JSON_BACKENDS:
+        try:
+            backend = get_json_backend(name)
+        except ImportError:
+            log.error("JSON backend '{}' is not installed.".format(name))
+            continue
+        failures = check_json_backend(backend)
+        log.error("JSON backend '{}' conformance failures: {}".format(
+            name, failures))
+        # Non-conforming backends are only a problem if they are used
+        if failures and name == catalog.json_backend.NAME:
+            raise RuntimeError("JSON backend '{}' does not conform: "
+                               "{}".format(name, failures))
+    return
+
+
+def check_round_trips(catalog):
+    """Load the test entry in each mode (see `_load_modes`) and save it again,
+    both as loaded and with all of its sections accessed (i.e. decoded).
+    Neither may change its stored text (i.e. the text of the default mode).
+    """
+    log = catalog.log
+    expected = catalog.store.read(FAKE_ALIAS_1)[0]
+    with _test_manifest(catalog) as manifest:
+        for mode, settings, kwargs, in_mode in _load_modes(manifest):
+            for decode in [False, True]:
+                with _catalog_settings(catalog, settings):
+                    entry = catalog.proto.init_from_file(
+                        catalog, name=FAKE_ALIAS_1, **kwargs)
+                    if not in_mode(entry):
+                        raise RuntimeError("Entry was not loaded in '{}' "
+                                           "mode.".format(mode))
+                    if decode:
+                        list(entry.values())
+                    entry.save()
+                if catalog.store.read(FAKE_ALIAS_1)[0] != expected:
+                    raise RuntimeError(
+                        "Saving the entry loaded in '{}' mode (decoded: {}) "
+                        "changed its text.".format(mode, decode))
+            log.error("Round trip in '{}' mode: OK".format(mode))
+    return
+
+
+def check_entry_copies(catalog):
+    """Copy the test entry loaded in each of `COPY_MODES` into the entry
+    loaded in the default mode, as `Catalog.merge_duplicates` does.  The
+    result must be the same as copying the entry loaded in the default mode.
+    """
+    log = catalog.log
+    expected = None
+    with _test_manifest(catalog) as manifest:
+        for mode, settings, kwargs, in_mode in _load_modes(manifest):
+            if mode not in COPY_MODES:
+                continue
+            with _catalog_settings(catalog, {'manifest': None}):
+                dest = catalog.proto.init_from_file(catalog, name=FAKE_ALIAS_1)
+            with _catalog_settings(catalog, settings):
+                entry = catalog.proto.init_from_file(
+                    catalog, name=FAKE_ALIAS_1, **kwargs)
+                if not in_mode(entry):
+                    raise RuntimeError("Entry was not loaded in '{}' "
+                                       "mode.".format(mode))
+                # Errors are checked (by source) when data is added
+                entry.add_error(FAKE_BIBCODE_3, kind=SOURCE.BIBCODE,
+                                extra=ENTRY.REDSHIFT)
+                catalog.copy_entry_to_entry(entry, dest)
+            text = json.dumps(dest._ordered(dest))
+            if expected is None:
+                expected = text
+            elif text != expected:
+                raise RuntimeError("Copying the entry loaded in '{}' mode "
+                                   "gave a different entry.".format(mode))
+            log.error("Copy of the entry loaded in '{}' mode: OK".format(
+                mode))
+    return
+
+
+def _load_modes(manifest):
+    """Return the modes of loading the test entry.
+
+    Each mode is given as '(mode, settings, kwargs, in_mode)', where the
+    catalog attributes `settings` are set while the entry is loaded with the
+    `init_from_file` arguments `kwargs`, and `in_mode(entry)` returns whether
+    the entry was actually loaded in this mode.  Entries are only loaded as
+    trusted with the given `manifest`.
+    """
+    def is_lazy(entry):
+        return entry._get_raw_section(ENTRY.PHOTOMETRY) is not None
+
+    def has_arrays(entry):
+        return all(isinstance(spectrum[SPECTRUM.DATA], SpectrumData)
+                   for spectrum in entry[ENTRY.SPECTRA])
+
+    def has_table(entry):
+        return isinstance(entry[ENTRY.PHOTOMETRY], PhotometryTable)
+
+    def is_compact(entry):
+        return isinstance(entry[ENTRY.SOURCES][0], CompactRecord)
+
+    def is_trusted(entry):
+        return entry._trusted and is_lazy(entry)
+
+    untrusted = {'manifest': None}
+    return [
+        ('default', untrusted, {}, lambda entry: not is_lazy(entry)),
+        ('compact', untrusted, {'compact': True}, is_compact),
+        ('array spectra', dict(untrusted, ARRAY_SPECTRA=True), {},
+         has_arrays),
+        ('photometry table', dict(untrusted, PHOTOMETRY_TABLES=True), {},
+         has_table),
+        ('lazy', untrusted, {'lazy': True}, is_lazy),
+        ('trusted', {'manifest': manifest}, {}, is_trusted)]
+
+
+@contextmanager
+def _catalog_settings(catalog, settings):
+    """Set the attributes `settings` of the catalog, restoring them on exit.
+    """
+    saved = [(key, getattr(catalog, key)) for key in settings]
+    try:
+        for key, value in settings.items():
+            setattr(catalog, key, value)
+        yield catalog
+    finally:
+        for key, value in saved:
+            setattr(catalog, key, value)
+
+
+@contextmanager
+def _test_manifest(catalog):
+    """Return the manifest of saved entries, used for trusted loading.
+
+    Without '--trusted-load' (i.e. no `manifest` of the catalog), the stored
+    text of the test entry is recorded in a temporary manifest instead.
+    """
+    if catalog.manifest is not None:
+        yield catalog.manifest
+        return
+    path = os.path.join(catalog.PATHS.PATH_OUTPUT, 'test-manifest.jsonl')
+    manifest = EntryManifest(path)
+    try:
+        text, location = catalog.store.read(FAKE_ALIAS_1)
+        manifest.record(location, content_hash(text))
+        yield manifest
+    finally:
+        manifest.clear()
+
+
 def check_stub(catalog, name):
     if not catalog.entries[name]._stub:
         raise RuntimeError("Remaining entry is not a stub.")
@@ -0,0 +1,5 @@
+"""Unit tests of the modules in `astrocats.catalog`.
+
+The full import of the catalog is tested by the `test` import task (see
+`astrocats/catalog/tasks/test.py`).
+"""
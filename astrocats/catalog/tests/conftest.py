@@ -0,0 +1,56 @@
+"""Fixtures shared by the unit tests of `astrocats.catalog`.
+"""
+import argparse
+import os
+
+import pytest
+from astrocats.catalog.catalog import Catalog
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.utils import logger
+
+TEST_NAME = 'EN-TEST-AA'
+TEST_ALIAS = 'PS-TEST-AB'
+
+
+@pytest.fixture
+def catalog(tmpdir):
+    """A `Catalog` whose output repository is a temporary directory.
+    """
+    args = argparse.Namespace(base_path='', write_entries=True,
+                              update=False, travis=False, refresh=False)
+    log = logger.get_logger('astrocats-tests', stream_level=logger.WARNING)
+    catalog = Catalog(args, log)
+    catalog.PATHS.PATH_OUTPUT = os.path.join(str(tmpdir), '')
+    return catalog
+
+
+@pytest.fixture
+def entry_text(catalog):
+    """Save the test entry to the catalog's store, and return its text and
+    location.
+    """
+    add_test_entry(catalog)
+    catalog.journal_entries()
+    return catalog.store.read(TEST_NAME)
+
+
+def add_test_entry(catalog, name=TEST_NAME):
+    """Add an entry with all kinds of data to the catalog, only with `add_*`
+    methods.
+    """
+    name = catalog.add_entry(name)
+    entry = catalog.entries[name]
+    source = entry.add_source(name='Private et al. 2025',
+                              bibcode='2025Tst...123..456Z')
+    entry.add_alias(TEST_ALIAS, source)
+    entry.add_quantity(ENTRY.REDSHIFT, '1.123', source, kind='spectroscopic')
+    entry.add_photometry(time='12345', magnitude='20.0', band='g',
+                         e_magnitude='0.01', source=source)
+    entry.add_photometry(time='12346', magnitude='20.5', band='r',
+                         upperlimit=True, source=source)
+    wavelengths = [str(1.0 * x) for x in range(1000, 2000, 100)]
+    entry.add_spectrum(u_wavelengths='Angstrom',
+                       u_fluxes='erg/s/cm^2/Angstrom', time='12345',
+                       u_time='MJD', wavelengths=wavelengths,
+                       fluxes=wavelengths, source=source)
+    return name
@@ -0,0 +1,25 @@
+"""Tests of `astrocats.catalog.archive`.
+"""
+import os
+
+import pytest
+from astrocats.catalog.archive import (CatalogArchive, pack_catalog,
+                                       unpack_catalog)
+
+from .conftest import TEST_ALIAS, TEST_NAME
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_pack_and_unpack(catalog, entry_text, tmpdir, compress):
+    text, location = entry_text
+    path = pack_catalog(catalog, path=str(tmpdir.join('test.pack')),
+                        compress=compress)
+    with CatalogArchive(path) as archive:
+        assert len(archive) == 1
+        # The entry is found by its name and by its aliases
+        assert archive.get_text(TEST_NAME) == text
+        assert archive.get_text(TEST_ALIAS) == text
+
+    os.remove(location)
+    assert unpack_catalog(catalog, path=path) == 1
+    assert catalog.store.read(TEST_NAME) == (text, location)
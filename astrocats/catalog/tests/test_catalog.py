@@ -0,0 +1,45 @@
+"""Tests of `astrocats.catalog.catalog`.
+"""
+import pytest
+from astrocats.catalog.entry import ENTRY, EntryStub
+from astrocats.catalog.error import ERROR
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.source import SOURCE
+
+from .conftest import TEST_ALIAS, TEST_NAME
+
+OTHER_NAME = 'EN-TEST-BB'
+OTHER_BIBCODE = '2001PASJ..547..364C'
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_copy_entry_to_entry(catalog, entry_text, lazy):
+    entry = catalog.proto.init_from_file(catalog, name=TEST_NAME, lazy=lazy)
+    assert (entry._get_raw_section(ENTRY.PHOTOMETRY) is not None) == lazy
+    # Copied data is checked against the errors (by source) of the entry
+    entry.add_error(OTHER_BIBCODE, kind=SOURCE.BIBCODE, extra=ENTRY.REDSHIFT)
+
+    dest = catalog.proto(catalog, OTHER_NAME)
+    dest.add_source(bibcode=OTHER_BIBCODE)
+    catalog.copy_entry_to_entry(entry, dest)
+
+    # The copied source is renumbered
+    assert dest.get_source_by_alias('2')[SOURCE.NAME] == 'Private et al. 2025'
+    assert [alias[QUANTITY.VALUE] for alias in dest[ENTRY.ALIAS]] == [
+        TEST_ALIAS]
+    for key in [ENTRY.ALIAS, ENTRY.REDSHIFT, ENTRY.PHOTOMETRY,
+                ENTRY.SPECTRA]:
+        assert [item[QUANTITY.SOURCE] for item in dest[key]] == (
+            ['2'] * len(entry[key]))
+    assert len(dest[ENTRY.PHOTOMETRY]) == 2
+    assert [err[ERROR.VALUE] for err in dest[ENTRY.ERRORS]] == [
+        OTHER_BIBCODE]
+
+
+def test_journal_entry_stubs(catalog, entry_text):
+    """`EntryStub`s are not written, even with `write_stubs`.
+    """
+    text, location = entry_text
+    assert isinstance(catalog.entries[TEST_NAME], EntryStub)
+    catalog.journal_entries(write_stubs=True)
+    assert catalog.store.read(TEST_NAME) == (text, location)
@@ -0,0 +1,24 @@
+"""Tests of `astrocats.catalog.catdict`.
+"""
+import logging
+
+from astrocats.catalog.quantity import QUANTITY
+
+from .conftest import TEST_NAME, add_test_entry
+
+
+def test_unknown_key_warned_per_instance(catalog, caplog):
+    add_test_entry(catalog)
+    entry = catalog.entries[TEST_NAME]
+    with caplog.at_level(logging.WARNING):
+        for value in ['1', '2']:
+            entry.add_quantity('testquantity', value, '1',
+                               **{'testkey': 'x'})
+    messages = [record.getMessage() for record in caplog.records
+                if 'testkey' in record.getMessage()]
+    assert len(messages) == 2
+    assert all(TEST_NAME in message for message in messages)
+    assert [quantity['testkey'] for quantity in entry['testquantity']] == [
+        'x', 'x']
+    assert [quantity[QUANTITY.VALUE] for quantity in entry[
+        'testquantity']] == ['1', '2']
@@ -0,0 +1,38 @@
+"""Tests of `astrocats.catalog.delta`.
+"""
+from collections import OrderedDict
+
+from astrocats.catalog.delta import (DeltaEntry, DeltaLog, delta_log_path,
+                                     read_deltas, reduce_deltas)
+from astrocats.catalog.task import Task
+
+from .conftest import TEST_ALIAS, TEST_NAME, add_test_entry
+
+
+def test_reduced_deltas_match_direct_data(catalog, entry_text):
+    """Data recorded in a delta log, which is then reduced, gives the same
+    entry as adding it directly.
+    """
+    text, location = entry_text
+    catalog._delete_entry_file(entry_name=TEST_NAME)
+    del catalog.entries[TEST_NAME]
+
+    task = Task(name='test-deltas', priority=1)
+    catalog.delta_log = DeltaLog(delta_log_path(catalog, task.name))
+    try:
+        add_test_entry(catalog)
+        entry = catalog.entries[TEST_NAME]
+        assert isinstance(entry, DeltaEntry)
+        assert entry.get_aliases() == [TEST_NAME, TEST_ALIAS]
+        catalog.journal_entries()
+        catalog.delta_log.close()
+    finally:
+        catalog.delta_log = None
+    assert len(catalog.entries) == 0
+    assert catalog.store.read(TEST_NAME) is None
+
+    records = list(read_deltas(delta_log_path(catalog, task.name)))
+    assert all(record[0] == TEST_NAME for record in records)
+    num = reduce_deltas(catalog, OrderedDict([(task.name, task)]))
+    assert num == len(records)
+    assert catalog.store.read(TEST_NAME) == (text, location)
@@ -0,0 +1,77 @@
+"""Tests of `astrocats.catalog.utils.jsonbackend`.
+"""
+import json
+from collections import OrderedDict
+
+import pytest
+from astrocats.catalog.entry import ENTRY
+from astrocats.catalog.utils import (JSON_BACKENDS, check_json_backend,
+                                     get_json_backend)
+
+from .conftest import TEST_NAME
+
+TEXTS = [
+    '{"a":1,"b":{"x":[{"y":2},[{}]]},"a":{"z":null}}',
+    '[{"b":"{","a":[]},{"c":{"d":{}}}]',
+    '{"count":18446744073709551616,"limit":NaN}',
+]
+
+
+def _get_backend(name):
+    try:
+        return get_json_backend(name)
+    except ImportError:
+        pytest.skip("JSON backend '{}' is not installed".format(name))
+
+
+class _SpyLibrary:
+    """Count the calls of the `loads` function of a JSON library.
+    """
+
+    def __init__(self, lib):
+        self._lib = lib
+        self.calls = 0
+
+    def loads(self, text):
+        self.calls += 1
+        return self._lib.loads(text)
+
+
+@pytest.mark.parametrize('name', JSON_BACKENDS)
+def test_backend_conforms(name):
+    assert check_json_backend(_get_backend(name)) == []
+
+
+@pytest.mark.parametrize('name', JSON_BACKENDS)
+@pytest.mark.parametrize('text', TEXTS)
+def test_loads_key_order(name, text):
+    """Objects are rebuilt as the standard library decoder constructs them,
+    including duplicate keys, except in the first `dict_levels` levels.
+    """
+    backend = _get_backend(name)
+    expected = json.loads(text, object_pairs_hook=OrderedDict)
+    assert repr(backend.loads(text)) == repr(expected)
+    data = backend.loads(text, dict_levels=1)
+    assert json.dumps(data) == json.dumps(expected)
+    values = data.values() if isinstance(data, dict) else data
+    for value in values:
+        if isinstance(value, dict):
+            assert type(value) is OrderedDict
+
+
+@pytest.mark.parametrize('name', ['orjson', 'ujson'])
+@pytest.mark.parametrize('lazy', [False, True])
+def test_entry_loaded_by_library(catalog, entry_text, name, lazy):
+    """Entries (and their lazy sections) are decoded by library backends.
+    """
+    expected = catalog.proto.init_from_file(catalog, name=TEST_NAME)
+    backend = _get_backend(name)
+    backend._lib = _SpyLibrary(backend._lib)
+    catalog.json_backend = backend
+    entry = catalog.proto.init_from_file(catalog, name=TEST_NAME, lazy=lazy)
+    calls = backend._lib.calls
+    assert calls > 0
+    assert len(entry[ENTRY.PHOTOMETRY]) == len(expected[ENTRY.PHOTOMETRY])
+    assert backend._lib.calls == calls + lazy
+    entry._load_raw_sections()
+    assert entry._ordered(entry) == expected._ordered(expected)
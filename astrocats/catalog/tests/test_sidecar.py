@@ -0,0 +1,41 @@
+"""Tests of `astrocats.catalog.sidecar`.
+"""
+import json
+
+import numpy as np
+from astrocats.catalog.sidecar import (PHOTOMETRY_PREFIX, SPECTRA_PREFIX,
+                                       load_sidecar, sidecar_arrays,
+                                       write_sidecar)
+
+from .conftest import TEST_NAME
+
+
+def _assert_arrays_equal(arrays, expected):
+    assert sorted(arrays.keys()) == sorted(expected.keys())
+    for key, values in expected.items():
+        # Compared bitwise, so that NaN values (missing data) are equal
+        assert arrays[key].dtype == values.dtype
+        assert arrays[key].shape == values.shape
+        assert arrays[key].tobytes() == values.tobytes()
+
+
+def test_sidecar_matches_entry_file(entry_text):
+    text, location = entry_text
+    write_sidecar(location, text=text)
+    arrays = load_sidecar(location)
+    expected = sidecar_arrays(json.loads(text)[TEST_NAME])
+    assert any(key.startswith(PHOTOMETRY_PREFIX) for key in arrays)
+    assert any(key.startswith(SPECTRA_PREFIX) for key in arrays)
+    _assert_arrays_equal(arrays, expected)
+
+
+def test_stale_sidecar_is_rebuilt(entry_text):
+    text, location = entry_text
+    write_sidecar(location, text=text)
+    data = json.loads(text)
+    del data[TEST_NAME]['photometry'][1:]
+    with open(location, 'w') as fout:
+        json.dump(data, fout)
+    arrays = load_sidecar(location)
+    _assert_arrays_equal(arrays, sidecar_arrays(data[TEST_NAME]))
+    assert np.all(arrays[PHOTOMETRY_PREFIX + 'magnitude'] == [20.0])
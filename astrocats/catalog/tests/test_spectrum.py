@@ -0,0 +1,20 @@
+"""Tests of `astrocats.catalog.spectrum`.
+"""
+import pytest
+from astrocats.catalog.spectrum import SpectrumData
+
+ROWS = [['3000.0', '1.2e-15'], ['3001.0', 'Hα'], ['3002.0', '1e-16\x00x']]
+
+
+@pytest.mark.parametrize('rows', [ROWS, [row[:1] for row in ROWS]])
+def test_spectrum_data_rows(rows):
+    data = SpectrumData.from_rows(rows)
+    assert len(data) == len(rows)
+    assert list(data) == rows
+    for index in range(-len(rows), len(rows)):
+        assert data[index] == rows[index]
+    for index in [slice(None), slice(1, None), slice(None, None, -2)]:
+        assert data[index] == rows[index]
+    with pytest.raises(IndexError):
+        data[len(rows)]
+    assert data == rows
@@ -0,0 +1,75 @@
+"""Tests of `astrocats.catalog.store`.
+"""
+import pytest
+from astrocats.catalog.store import EntryStore, SQLiteStore
+
+from .conftest import TEST_ALIAS, TEST_NAME
+
+
+def test_sqlite_store_copy(catalog, entry_text, tmpdir):
+    text, location = entry_text
+    store = SQLiteStore(catalog, path=str(tmpdir.join('test.sqlite')))
+    try:
+        assert store.copy_from(catalog.store) == 1
+        assert len(store) == 1
+        assert store.read(TEST_NAME)[0] == text
+        assert store.find_alias(TEST_ALIAS) == [TEST_NAME]
+        stubs = dict(store.iter_stubs())
+        assert list(stubs.keys()) == [TEST_NAME]
+        assert stubs[TEST_NAME].aliases == (TEST_ALIAS,)
+    finally:
+        store.close()
+
+
+def test_sqlite_store_journal(catalog, entry_text, tmpdir):
+    """Entries saved to a SQLite store are exported with the same text.
+    """
+    text, location = entry_text
+    catalog.load_entry_from_name(TEST_NAME)
+    assert catalog.store.read(TEST_NAME) is None
+    catalog.store = SQLiteStore(catalog, path=str(tmpdir.join('test.sqlite')))
+    try:
+        catalog.journal_entries()
+        assert catalog.store.read(TEST_NAME)[0] == text
+        assert catalog.export_entries() == 1
+    finally:
+        catalog.store.close()
+    with open(location, 'r') as fin:
+        assert fin.read() == text
+
+
+def test_sqlite_store_reloads_changed_files(catalog, entry_text, tmpdir):
+    """Entries copied from JSON files are reloaded when the file changes.
+    """
+    text, location = entry_text
+    store = SQLiteStore(catalog, path=str(tmpdir.join('test.sqlite')))
+    try:
+        store.copy_from(catalog.store)
+        changed = text.replace(TEST_ALIAS, 'PS-TEST-AC')
+        with open(location, 'w') as fout:
+            fout.write(changed + '\n')
+        assert store.read(TEST_NAME)[0] == changed + '\n'
+        assert store.find_alias('PS-TEST-AC') == [TEST_NAME]
+        assert store.find_alias(TEST_ALIAS) == []
+
+        # Saved entries are no longer replaced by their file
+        stub = dict(store.iter_stubs())[TEST_NAME]
+        store.write_entry(stub, text)
+        with open(location, 'w') as fout:
+            fout.write(changed)
+        assert store.read(TEST_NAME)[0] == text
+    finally:
+        store.close()
+
+
+def test_json_store_stubs(catalog, entry_text):
+    text, location = entry_text
+    stubs = dict(catalog.store.iter_stubs())
+    assert list(stubs.keys()) == [TEST_NAME]
+    assert stubs[TEST_NAME].aliases == (TEST_ALIAS,)
+    assert stubs[TEST_NAME].filename == location
+
+
+def test_entry_store_is_abstract(catalog):
+    with pytest.raises(TypeError):
+        EntryStore(catalog)
@@ -1,13 +1,15 @@
 """General utility functions used by multiple OSC scripts.
 """
 
-from . import (dates, digits, imports, logger, plotting, sorting, strings,
-               tq_funcs)
+from . import (dates, digits, imports, jsonbackend, logger, plotting,
+               rawjson, sorting, strings, tq_funcs)
 from .dates import *
 from .digits import *
 from .imports import *
+from .jsonbackend import *
 from .logger import *
 from .plotting import *
+from .rawjson import *
 from .sorting import *
 from .strings import *
 from .tq_funcs import *
@@ -20,3 +22,5 @@ __all__.extend(strings.__all__)
 __all__.extend(tq_funcs.__all__)
 __all__.extend(imports.__all__)
 __all__.extend(dates.__all__)
+__all__.extend(rawjson.__all__)
+__all__.extend(jsonbackend.__all__)
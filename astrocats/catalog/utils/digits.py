@@ -1,10 +1,34 @@
 """
 """
-
+import re
 from math import floor, log10
 
-__all__ = ['get_sig_digits', 'is_integer', 'is_number', 'pretty_num',
-           'round_sig', 'zpad']
+from cdecimal import Decimal
+
+__all__ = ['decode_decimal', 'decimal_to_float', 'decimal_value',
+           'encode_decimal', 'get_sig_digits', 'is_integer', 'is_number',
+           'pretty_num', 'round_sig', 'zpad']
+
+# Exact decimal encoding (see `encode_decimal`)
+# ---------------------------------------------
+# Decimal strings which can be encoded, e.g. '53000.12', '-0.011', '1.5e+10'
+_DECIMAL_RE = re.compile(r'^(-?)([0-9]+)(?:\.([0-9]+))?(?:e([+-][0-9]+))?$')
+# Lowest bits: number of printed fractional digits
+_FRAC_BITS = 6
+_FRAC_MASK = (1 << _FRAC_BITS) - 1
+# Flag for whether an exponent is printed
+_EXP_FLAG = 1 << _FRAC_BITS
+# Then: the (biased) value of the exponent
+_EXP_SHIFT = _FRAC_BITS + 1
+_EXP_BIAS = 1 << 10
+_EXP_MASK = (1 << 11) - 1
+# Total number of metadata bits, the mantissa is stored above these
+_META_BITS = _EXP_SHIFT + 11
+_META_MASK = (1 << _META_BITS) - 1
+# Conversions to float are exact (correctly rounded) for these values
+_MAX_EXACT_MANTISSA = 1 << 53
+_MAX_EXACT_POWER = 22
+_POWERS_OF_TEN = [float(10 ** ii) for ii in range(_MAX_EXACT_POWER + 1)]
 
 
 def get_sig_digits(x):
@@ -61,3 +85,94 @@ def zpad(val, n=2):
     if len(bits) != 2:
         return val.zfill(n)
     return "%s.%s" % (bits[0].zfill(n), bits[1])
+
+
+def encode_decimal(string):
+    """Encode a decimal str exactly as a single integer, if possible.
+
+    The integer contains the decimal mantissa (all printed digits) along with
+    metadata bits for the number of printed fractional digits and the printed
+    exponent.  The encoding is only used if it reproduces the identical string
+    (see `decode_decimal`), e.g. '53000.120', '-0.011' and '1.5e-05' can be
+    encoded, but '+1', '007', '-0' and '1E5' cannot.
+
+    Returns
+    -------
+    packed : int or 'None'
+        The encoded value, or 'None' if `string` cannot be encoded exactly.
+
+    """
+    match = _DECIMAL_RE.match(string)
+    if match is None:
+        return None
+    sign, integ, frac, exp = match.groups()
+    frac = frac or ''
+    if len(frac) > _FRAC_MASK:
+        return None
+
+    mantissa = int(integ + frac)
+    if sign:
+        mantissa = -mantissa
+    meta = len(frac)
+    if exp is not None:
+        exp = int(exp)
+        if abs(exp) >= _EXP_BIAS:
+            return None
+        meta |= _EXP_FLAG | ((exp + _EXP_BIAS) << _EXP_SHIFT)
+
+    packed = (mantissa << _META_BITS) | meta
+    # Only use encodings which reproduce the original string
+    if decode_decimal(packed) != string:
+        return None
+    return packed
+
+
+def decode_decimal(packed):
+    """Return the str encoded by `encode_decimal`.
+    """
+    mantissa = packed >> _META_BITS
+    meta = packed & _META_MASK
+    num_frac = meta & _FRAC_MASK
+
+    digits = str(abs(mantissa))
+    if num_frac:
+        digits = digits.rjust(num_frac + 1, '0')
+        digits = digits[:-num_frac] + '.' + digits[-num_frac:]
+    if mantissa < 0:
+        digits = '-' + digits
+    if meta & _EXP_FLAG:
+        exp = ((meta >> _EXP_SHIFT) & _EXP_MASK) - _EXP_BIAS
+        digits += 'e{}{:02d}'.format('-' if exp < 0 else '+', abs(exp))
+    return digits
+
+
+def _decimal_power(meta):
+    """The power of ten by which the mantissa of an encoding is multiplied.
+    """
+    power = -(meta & _FRAC_MASK)
+    if meta & _EXP_FLAG:
+        power += ((meta >> _EXP_SHIFT) & _EXP_MASK) - _EXP_BIAS
+    return power
+
+
+def decimal_to_float(packed):
+    """Return the float value of a str encoded by `encode_decimal`.
+
+    The result is identical to ``float(decode_decimal(packed))``, but in most
+    cases the string is not constructed or parsed.
+    """
+    mantissa = packed >> _META_BITS
+    power = _decimal_power(packed & _META_MASK)
+    if (abs(mantissa) < _MAX_EXACT_MANTISSA and
+            abs(power) <= _MAX_EXACT_POWER):
+        if power < 0:
+            return mantissa / _POWERS_OF_TEN[-power]
+        return mantissa * _POWERS_OF_TEN[power]
+    return float(decode_decimal(packed))
+
+
+def decimal_value(packed):
+    """Return the exact `Decimal` value of a str encoded by `encode_decimal`.
+    """
+    return Decimal(decode_decimal(packed))
+
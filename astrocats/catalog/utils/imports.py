@@ -7,7 +7,7 @@ from collections import OrderedDict
 from .digits import is_number
 
 __all__ = ['compress_gz', 'convert_aq_output', 'read_json_dict',
-           'read_json_arr', 'uncompress_gz']
+           'read_json_arr', 'read_text_file', 'uncompress_gz']
 
 
 def convert_aq_output(row):
@@ -34,6 +34,19 @@ def read_json_arr(filename):
     return myarr
 
 
+def read_text_file(fname):
+    """Return the (UTF-8) contents of the file `fname`, which may be gzipped.
+
+    Files are decompressed (in memory) if `fname` ends with '.gz'.
+    """
+    if fname.endswith('.gz'):
+        import gzip
+        with gzip.open(fname, 'rt', encoding='utf8') as fin:
+            return fin.read()
+    with open(fname, 'r', encoding='utf8') as fin:
+        return fin.read()
+
+
 def compress_gz(fname):
     """Compress the file with the given name and delete the uncompressed file.
 
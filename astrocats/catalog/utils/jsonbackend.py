@@ -0,0 +1,309 @@
+"""Pluggable JSON library used to load and save entries.
+
+An optional, faster JSON library (`orjson` or `ujson`) is used when it is
+installed, and gives exactly the same results as the standard library
+(checked at runtime by `check_json_backend`); otherwise the standard library
+`json` module is used.  The backend decodes the text of entries (the
+objects it constructs are then rebuilt in the same key order, see
+`_rebuild_objects`) and encodes (tables of) strings (see
+`JSONStreamEncoder`), so the loaded values and the saved files are unchanged.
+"""
+import json
+from collections import OrderedDict
+
+from .rawjson import JSONStreamEncoder
+
+__all__ = ['JSON_BACKENDS', 'JSONBackend', 'check_json_backend',
+           'get_json_backend']
+
+# Backends in order of preference
+JSON_BACKENDS = ['orjson', 'ujson', 'json']
+
+_backend = None
+
+# Values covering the features of the JSON format used by entry files
+_CONFORMANCE_SAMPLE = OrderedDict([
+    ('SN1987A', OrderedDict([
+        ('schema', ''),
+        ('name', 'SN1987A'),
+        ('sources', [OrderedDict([
+            ('name', 'Müller & Sørensen "et al."'),
+            ('bibcode', '1987A&A...177L...1G'),
+            ('url', 'http://adsabs.harvard.edu/abs/1987A%26A...177L...1G/'),
+            ('alias', '1')])]),
+        ('alias', [OrderedDict([('value', 'SN1987A'), ('source', '1')])]),
+        ('redshift', [OrderedDict([
+            ('value', '0.000927'), ('e_value', 1e-07),
+            ('kind', ['heliocentric']), ('derived', True),
+            ('probability', 0.1), ('weight', -0.0),
+            ('count', 2 ** 53), ('offset', -2 ** 53), ('upper', None),
+            ('source', '1')])]),
+        ('photometry', [
+            OrderedDict([('time', '46849.8'), ('band', 'V'),
+                         ('magnitude', '4.5'), ('source', '1')]),
+            OrderedDict([('time', ['46850', '46851']), ('band', 'Hα'),
+                         ('upperlimit', False), ('source', '1')])]),
+        ('spectra', [OrderedDict([
+            ('data', [['3000.0', '1.2e-15', '\\ /'],
+                      ['3001.0', '\t\n\x00\x1f\x7f', 'π\u2028\U0001f4a5'],
+                      ['3002.0', '', 'x']]),
+            ('columns', ['wavelength', 'flux']),
+            ('quoted', [['"quoted", x', '"],["', 'x\\'], ['y']]),
+            ('empty', [[]]),
+            ('nested', [['a', 'b'], ['c', 1.5]]),
+            ('model', OrderedDict([('b', {}), ('a', [])])),
+            ('source', '1')])]),
+    ])),
+])
+
+# Values which the fast libraries may not decode (or encode) exactly like the
+# standard library, and must leave to it.  Each is checked on its own, as the
+# library could reject one, but silently mishandle another.
+_FALLBACK_SAMPLES = [
+    OrderedDict([('limit', float('nan'))]),
+    [float('-inf'), float('inf')],
+    OrderedDict([('count', 2 ** 70)]),
+    [2 ** 64, -2 ** 63 - 1, 10 ** 19],
+    [['3000.0', '\ud800'], ['3001.0', 'x\udfff']],
+]
+
+# Integers of 19 or more digits may not fit in 64 bits; they are found by
+# mapping every digit to '0' (much faster than a regular expression)
+_DIGITS_TO_ZERO = bytes.maketrans(b'0123456789', b'0' * 10)
+_LONG_DIGITS = b'0' * 19
+
+
+class JSONBackend:
+    """JSON decoding and (compact) encoding with the standard library.
+
+    Subclasses use faster libraries, but must give identical results (see
+    `check_json_backend`).
+
+    Attributes
+    ----------
+    NAME : str
+        Name of the backend (module).
+
+    """
+
+    NAME = 'json'
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(',', ':'),
+                                         ensure_ascii=False)
+        return
+
+    def __repr__(self):
+        return "{}('{}')".format(type(self).__name__, self.NAME)
+
+    def loads(self, text, object_pairs_hook=None, dict_levels=0):
+        """Decode the JSON `text`, keeping the order of object keys.
+
+        Objects are constructed by ``object_pairs_hook(pairs)`` (as in
+        `json.loads`, `OrderedDict` by default).  The objects in the first
+        `dict_levels` levels of the value (the value itself is at level 0,
+        e.g. the items of a section of an entry are at level 1) may be
+        plain `dict`s instead, with their keys in the same order, which
+        library backends construct much faster.
+        """
+        if object_pairs_hook is None:
+            object_pairs_hook = OrderedDict
+        return json.loads(text, object_pairs_hook=object_pairs_hook)
+
+    def dumps(self, obj):
+        """Encode `obj` as compact JSON ('(',', ':')' separators, no ASCII
+        escaping).
+        """
+        return self._encoder.encode(obj)
+
+    def _decode(self, text):
+        """Decode the JSON `text` with objects as `dict`s, or return 'None'
+        if the backend cannot decode it exactly.
+        """
+        return json.loads(text)
+
+
+class _LibraryBackend(JSONBackend):
+    """Backend using the `loads` and `dumps` functions of a library.
+
+    The libraries decode objects as `dict`s, in the order of their keys in
+    the text, which are then rebuilt by the `object_pairs_hook` (see
+    `_rebuild_objects`), except in the first `dict_levels` levels.  Text
+    which the library rejects (e.g. 'NaN', or lone surrogates), or which
+    contains integers that may not fit in 64 bits (silently decoded as
+    floats by e.g. `orjson`), is decoded by the standard library.
+    """
+
+    def loads(self, text, object_pairs_hook=None, dict_levels=0):
+        data = self._decode(text)
+        if data is None:
+            return super().loads(text, object_pairs_hook=object_pairs_hook)
+        if object_pairs_hook is dict:
+            return data
+        if object_pairs_hook is None:
+            object_pairs_hook = OrderedDict
+        return _rebuild_objects(data, object_pairs_hook, text.count('{'),
+                                dict_levels=dict_levels)
+
+    def _decode(self, text):
+        data = text.encode('utf-8', 'surrogatepass')
+        if _LONG_DIGITS in data.translate(_DIGITS_TO_ZERO):
+            return None
+        try:
+            return self._lib.loads(text)
+        except ValueError:
+            return None
+
+
+class _OrjsonBackend(_LibraryBackend):
+
+    NAME = 'orjson'
+
+    def __init__(self):
+        super().__init__()
+        import orjson
+        self._lib = orjson
+        return
+
+    def dumps(self, obj):
+        return self._lib.dumps(obj).decode('utf-8')
+
+
+class _UjsonBackend(_LibraryBackend):
+
+    NAME = 'ujson'
+
+    def __init__(self):
+        super().__init__()
+        import ujson
+        self._lib = ujson
+        return
+
+    def dumps(self, obj):
+        return self._lib.dumps(obj, ensure_ascii=False,
+                               escape_forward_slashes=False)
+
+
+_BACKEND_CLASSES = {
+    'orjson': _OrjsonBackend,
+    'ujson': _UjsonBackend,
+    'json': JSONBackend
+}
+
+
+def _rebuild_objects(data, object_pairs_hook, num_objects, dict_levels=0):
+    """Replace the `dict`s in the decoded `data` by
+    ``object_pairs_hook(pairs)``, as the standard library decoder would
+    construct them, except in the first `dict_levels` levels.
+
+    The containers are visited level by level, and the search stops once
+    `num_objects` (the number of '{' characters in the text, i.e. an upper
+    bound on the number of objects) have been found, so that e.g. the
+    arrays of the items of an entry are not visited when they contain no
+    objects.  The mappings returned by `object_pairs_hook` must support
+    item assignment.
+    """
+    root = [data]
+    containers = [root]
+    found = 0
+    level = 0
+    while containers and found < num_objects:
+        nested = []
+        for container in containers:
+            if type(container) is list:
+                items = enumerate(container)
+            else:
+                items = list(container.items())
+            for key, value in items:
+                if type(value) is dict:
+                    if level >= dict_levels:
+                        value = object_pairs_hook(list(value.items()))
+                        container[key] = value
+                    found += 1
+                    nested.append(value)
+                elif type(value) is list:
+                    nested.append(value)
+        containers = nested
+        level += 1
+    return root[0]
+
+
+def check_json_backend(backend):
+    """Compare the results of `backend` to the standard library `json`.
+
+    The entry-file (tab indented) text of a sample entry, written with the
+    `backend`, must be byte-for-byte identical to that written by
+    `json.dumps`, and the sample must be decoded by the backend itself to
+    the same values (types and key order).  Values which the backend cannot
+    handle exactly (e.g. 'NaN', integers over 64 bits and lone surrogates)
+    must be left to the standard library, with the same results.
+
+    Returns
+    -------
+    failures : list of str
+        Descriptions of each difference, empty if the backend conforms.
+
+    """
+    failures = []
+    kwargs = dict(indent='\t', separators=(',', ':'), ensure_ascii=False)
+    for sample in [_CONFORMANCE_SAMPLE] + _FALLBACK_SAMPLES:
+        text = json.dumps(sample, **kwargs)
+        try:
+            encoder = JSONStreamEncoder(backend=backend, **kwargs)
+            stream = ''.join(encoder.iterencode(sample))
+            if stream != text:
+                failures.append("encoded text differs")
+        except Exception as err:
+            failures.append("encoding failed: {}".format(repr(err)))
+
+    # The `repr` of the values also compares key order and (mapping) types
+    text = json.dumps(_CONFORMANCE_SAMPLE, **kwargs)
+    try:
+        decoded = backend._decode(text)
+        if decoded is None:
+            failures.append("sample not decoded by the backend")
+        elif repr(decoded) != repr(json.loads(text)):
+            failures.append("decoded values differ")
+        expected = json.loads(text, object_pairs_hook=OrderedDict)
+        if repr(backend.loads(text)) != repr(expected):
+            failures.append("decoded ordered values differ")
+    except Exception as err:
+        failures.append("decoding failed: {}".format(repr(err)))
+
+    for sample in _FALLBACK_SAMPLES:
+        text = json.dumps(sample, **kwargs)
+        try:
+            if repr(backend.loads(text, object_pairs_hook=dict)) != repr(
+                    json.loads(text)):
+                failures.append("fallback decoded values differ: {}".format(
+                    text))
+        except Exception as err:
+            failures.append("fallback decoding failed: {}".format(
+                repr(err)))
+    return failures
+
+
+def get_json_backend(name=None):
+    """Return the `JSONBackend` named `name` (one of `JSON_BACKENDS`).
+
+    By default, the first installed backend which passes
+    `check_json_backend` is used (the standard library `json` otherwise).
+    """
+    global _backend
+    if name is not None:
+        if name not in _BACKEND_CLASSES:
+            raise ValueError("Unknown JSON backend '{}', must be one of "
+                             "{}".format(name, JSON_BACKENDS))
+        return _BACKEND_CLASSES[name]()
+
+    if _backend is None:
+        for name in JSON_BACKENDS:
+            try:
+                backend = _BACKEND_CLASSES[name]()
+            except ImportError:
+                continue
+            if not check_json_backend(backend):
+                _backend = backend
+                break
+    return _backend
+
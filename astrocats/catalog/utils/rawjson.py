@@ -0,0 +1,417 @@
+"""Handling of raw (undecoded) sections of JSON text.
+"""
+import json
+import re
+from collections import OrderedDict
+from itertools import chain
+from json.decoder import scanstring
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+__all__ = ['JSONStreamEncoder', 'RawJSON', 'dumps_raw', 'get_entry_aliases',
+           'scan_entry_sections', 'scan_indented_sections',
+           'skip_json_value']
+
+_WS_RE = re.compile(r'[ \t\n\r]*')
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_RE = re.compile(r'[^,:\]}\s]+')
+_BRACKET_RE = re.compile(r'["\[\]{}]')
+_STR_TYPES = set([str])
+_LIST_TYPES = set([list])
+
+
+class RawJSON:
+    """A JSON value stored as its (undecoded) text.
+
+    Written verbatim (without re-encoding) by `dumps_raw`.
+
+    Attributes
+    ----------
+    text : str
+        The JSON text of the value.
+
+    """
+    __slots__ = ['text']
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return "RawJSON(length={})".format(len(self.text))
+
+    def decode(self, **kwargs):
+        """Decode the stored text, `kwargs` are passed to `json.loads`.
+        """
+        return json.loads(self.text, **kwargs)
+
+
+def dumps_raw(obj, default=None, **kwargs):
+    """Serialize `obj` with `json.dumps`, writing `RawJSON` values verbatim.
+
+    `default` is used for all other non-serializable objects, as in
+    `json.dumps`.
+    """
+    raws = []
+
+    def _default(value):
+        if isinstance(value, RawJSON):
+            # Place-holder string, which is replaced after encoding
+            token = '\0RawJSON-{}\0'.format(len(raws))
+            raws.append((json.dumps(token), value.text))
+            return token
+        if default is not None:
+            return default(value)
+        raise TypeError("'{}' is not JSON serializable".format(repr(value)))
+
+    jsonstring = json.dumps(obj, default=_default, **kwargs)
+    for token, text in raws:
+        jsonstring = jsonstring.replace(token, text, 1)
+    return jsonstring
+
+
+class JSONStreamEncoder:
+    """Encode JSON incrementally, giving the same text as `json.dumps`.
+
+    The text is produced in chunks (by `iterencode`, `iter_object` and
+    `iter_array`), so that large objects can be written without constructing
+    their full JSON string.  `RawJSON` values are written verbatim (as by
+    `dumps_raw`).  The items of objects and arrays can be given as
+    iterators, e.g. to write a mapping in a different order without copying
+    it.
+
+    Arguments are as for `json.dumps`, except for `backend`: if given, lists
+    of strings (or of lists of strings), e.g. the data of spectra, are
+    encoded by this `astrocats.catalog.utils.jsonbackend.JSONBackend`.
+    This requires `ensure_ascii` to be 'False'.
+    """
+
+    def __init__(self, indent=None, separators=None, ensure_ascii=True,
+                 default=None, backend=None):
+        if backend is not None and ensure_ascii:
+            raise ValueError("A JSON `backend` requires `ensure_ascii=False`")
+        if indent is not None and not isinstance(indent, str):
+            indent = ' ' * indent
+        self.indent = indent
+        if separators is None:
+            separators = (',', ': ') if indent is not None else (', ', ': ')
+        self.item_separator, self.key_separator = separators
+        self._encoder = json.JSONEncoder(
+            indent=indent, separators=separators, ensure_ascii=ensure_ascii,
+            default=default)
+        self._encode_str = (encode_basestring_ascii if ensure_ascii
+                            else encode_basestring)
+        self._backend = backend
+        return
+
+    def encode(self, obj, level=0):
+        """Return the JSON text of `obj`, nested at indentation `level`.
+        """
+        if isinstance(obj, RawJSON):
+            return obj.text
+        text = self._encode_strings(obj, level)
+        if text is not None:
+            return text
+        text = self._encoder.encode(obj)
+        if level and self.indent is not None:
+            # Strings never contain literal newlines, only line breaks do
+            text = text.replace('\n', '\n' + self.indent * level)
+        return text
+
+    def encode_key(self, key):
+        """Return the JSON text of an object key (converted as by `json`).
+        """
+        if isinstance(key, str):
+            pass
+        elif isinstance(key, float):
+            key = self._encoder.encode(key)
+        elif key is True:
+            key = 'true'
+        elif key is False:
+            key = 'false'
+        elif key is None:
+            key = 'null'
+        elif isinstance(key, int):
+            key = int.__repr__(key)
+        else:
+            raise TypeError("keys must be str, int, float, bool or None, "
+                            "not {}".format(type(key).__name__))
+        return self._encode_str(key)
+
+    def iterencode(self, obj, level=0):
+        """Yield the JSON text of `obj`, one chunk per item of objects and
+        per element of arrays.
+        """
+        if isinstance(obj, dict):
+            yield from self.iter_object(obj.items(), level)
+        elif isinstance(obj, (list, tuple)):
+            text = self._encode_strings(obj, level)
+            if text is None:
+                yield from self.iter_array(obj, level, encode=self.iterencode)
+            else:
+                yield text
+        else:
+            yield self.encode(obj, level)
+
+    def iter_object(self, items, level=0, encode=None):
+        """Yield the JSON text of an object with the '(key, value)' `items`.
+
+        Each value is encoded by ``encode(value, level)``, which should return
+        its text or an iterable of chunks (by default `iterencode`).
+        """
+        if encode is None:
+            encode = self.iterencode
+        newline = self._newline_indent(level + 1)
+        first = True
+        for key, value in items:
+            if first:
+                yield '{' + newline
+                first = False
+            else:
+                yield self.item_separator + newline
+            yield self.encode_key(key) + self.key_separator
+            chunks = encode(value, level + 1)
+            if isinstance(chunks, str):
+                yield chunks
+            else:
+                yield from chunks
+        if first:
+            yield '{}'
+        else:
+            yield self._newline_indent(level) + '}'
+
+    def iter_array(self, values, level=0, encode=None):
+        """Yield the JSON text of an array of `values`.
+
+        See `iter_object`, each value is encoded by `encode` by default.
+        """
+        if encode is None:
+            encode = self.encode
+        newline = self._newline_indent(level + 1)
+        first = True
+        for value in values:
+            if first:
+                yield '[' + newline
+                first = False
+            else:
+                yield self.item_separator + newline
+            chunks = encode(value, level + 1)
+            if isinstance(chunks, str):
+                yield chunks
+            else:
+                yield from chunks
+        if first:
+            yield '[]'
+        else:
+            yield self._newline_indent(level) + ']'
+
+    def _encode_strings(self, values, level):
+        """Return the text of a list of strings (or of non-empty lists of
+        strings) encoded by the backend, or 'None' for any other value.
+
+        The compact text of the backend is indented by replacing the
+        separators between strings.  Strings containing (escaped) quotes are
+        left to the standard encoder, so that these separators cannot occur
+        within the strings themselves.
+        """
+        if self._backend is None or type(values) is not list or not values:
+            return None
+        types = set(map(type, values))
+        if types == _STR_TYPES:
+            rows = False
+        elif types == _LIST_TYPES and all(values) and set(
+                map(type, chain.from_iterable(values))) == _STR_TYPES:
+            rows = True
+        else:
+            return None
+
+        try:
+            text = self._backend.dumps(values)
+        except (TypeError, ValueError):
+            # e.g. lone surrogates, which some libraries do not encode
+            return None
+        if '\\"' in text:
+            return None
+        newline = self._newline_indent(level + 1)
+        close = self._newline_indent(level) + ']'
+        if not rows:
+            return '[' + newline + text[1:-1].replace(
+                '","', '"' + self.item_separator + newline + '"') + close
+        inner = self._newline_indent(level + 2)
+        text = text[2:-2].replace(
+            '","', '"' + self.item_separator + inner + '"')
+        text = text.replace('"],["', '"' + newline + ']' +
+                            self.item_separator + newline + '[' + inner + '"')
+        return '[' + newline + '[' + inner + text + newline + ']' + close
+
+    def _newline_indent(self, level):
+        if self.indent is None:
+            return ''
+        return '\n' + self.indent * level
+
+
+def scan_entry_sections(text):
+    """Find the sections of a single-entry JSON file, without decoding them.
+
+    The text should contain a single object (keyed by the entry name) of
+    objects, i.e. ``{"name": {"key": value, ...}}``.
+
+    Returns
+    -------
+    name : str
+        The name (outer key) of the entry.
+    sections : OrderedDict
+        The '(start, end)' position of each value in `text`, by key.
+
+    Raises
+    ------
+    ValueError
+        If `text` does not have the expected structure.
+
+    """
+    pos = _expect(text, 0, '{')
+    pos = _expect(text, pos, '"')
+    name, pos = scanstring(text, pos)
+    pos = _expect(text, pos, ':')
+    pos = _expect(text, pos, '{')
+
+    sections = OrderedDict()
+    pos = _WS_RE.match(text, pos).end()
+    if text.startswith('}', pos):
+        pos += 1
+    else:
+        while True:
+            pos = _expect(text, pos, '"')
+            key, pos = scanstring(text, pos)
+            pos = _expect(text, pos, ':')
+            start = _WS_RE.match(text, pos).end()
+            pos = skip_json_value(text, start)
+            sections[key] = (start, pos)
+            pos = _WS_RE.match(text, pos).end()
+            if text.startswith(',', pos):
+                pos += 1
+                continue
+            pos = _expect(text, pos, '}')
+            break
+
+    pos = _expect(text, pos, '}')
+    if _WS_RE.match(text, pos).end() != len(text):
+        raise ValueError("Extra data after entry at position {}".format(pos))
+    return name, sections
+
+
+def scan_indented_sections(text, indent):
+    """Find the sections of a single-entry JSON file with a known layout.
+
+    Like `scan_entry_sections`, but only for text exactly as written by
+    `JSONStreamEncoder` with the given `indent` (str), e.g. files verified
+    by their content hash.  Each section then starts on its own line, with
+    exactly two indents, so sections are located by searching for those
+    lines instead of skipping over each value.
+
+    Raises
+    ------
+    ValueError
+        If `text` does not have the expected layout.
+
+    """
+    head = '{\n' + indent + '"'
+    if not text.startswith(head):
+        raise ValueError("Text does not start with an indented object.")
+    name, pos = scanstring(text, len(head))
+    if not text.startswith(':{', pos):
+        raise ValueError("Expected ':{{' at position {}".format(pos))
+    close = '\n' + indent + '}\n}'
+    stop = len(text) - len(close)
+    if not text.endswith(close):
+        raise ValueError("Text does not end with an indented object.")
+
+    sections = OrderedDict()
+    newline = '\n' + indent * 2 + '"'
+    pos = text.find(newline, pos, stop)
+    while pos >= 0:
+        key, pos = scanstring(text, pos + len(newline))
+        if not text.startswith(':', pos):
+            raise ValueError("Expected ':' at position {}".format(pos))
+        start = pos + 1
+        pos = text.find(newline, start, stop)
+        if pos < 0:
+            end = stop
+        elif text[pos - 1] == ',':
+            end = pos - 1
+        else:
+            raise ValueError("Expected ',' at position {}".format(pos - 1))
+        sections[key] = (start, end)
+    return name, sections
+
+
+def get_entry_aliases(text, alias_key, value_key):
+    """Return the name and aliases of the entry in the JSON `text`.
+
+    Only the alias section (`alias_key`, e.g. `ENTRY.ALIAS`) is decoded, if
+    possible, and the `value_key` (e.g. `QUANTITY.VALUE`) of each alias is
+    returned.
+
+    Returns
+    -------
+    name : str
+    aliases : list of str
+
+    """
+    try:
+        name, sections = scan_entry_sections(text)
+        aliases = []
+        if alias_key in sections:
+            start, end = sections[alias_key]
+            aliases = json.loads(text[start:end])
+    except ValueError:
+        data = json.loads(text)
+        name = list(data.keys())[0]
+        aliases = data[name].get(alias_key, [])
+    return name, [alias[value_key] for alias in aliases]
+
+
+def skip_json_value(text, pos):
+    """Return the position after the JSON value starting at `text[pos]`.
+
+    The value is not validated, only its extent is found.
+    """
+    if pos >= len(text):
+        raise ValueError("Expected value at position {}".format(pos))
+    char = text[pos]
+    if char == '"':
+        match = _STRING_RE.match(text, pos)
+        if match is None:
+            raise ValueError("Unterminated string at position {}".format(pos))
+        return match.end()
+    if char not in '[{':
+        match = _SCALAR_RE.match(text, pos)
+        if match is None:
+            raise ValueError("Expected value at position {}".format(pos))
+        return match.end()
+
+    depth = 0
+    while True:
+        match = _BRACKET_RE.search(text, pos)
+        if match is None:
+            raise ValueError("Unterminated value at position {}".format(pos))
+        char = match.group()
+        if char == '"':
+            match = _STRING_RE.match(text, match.start())
+            if match is None:
+                raise ValueError("Unterminated string at position {}".format(
+                    pos))
+        elif char in '[{':
+            depth += 1
+        else:
+            depth -= 1
+        pos = match.end()
+        if depth == 0:
+            return pos
+
+
+def _expect(text, pos, char):
+    """Skip whitespace, then `char`, returning the following position.
+    """
+    pos = _WS_RE.match(text, pos).end()
+    if not text.startswith(char, pos):
+        raise ValueError("Expected '{}' at position {}".format(char, pos))
+    return pos + 1
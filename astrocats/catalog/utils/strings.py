@@ -1,11 +1,18 @@
 """
 """
 import json
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
 
 from .digits import round_sig
+from .rawjson import RawJSON
 
 __all__ = ['dict_to_pretty_string', 'rep_chars', 'get_entry_filename',
-           'single_spaces', 'trim_str_arr', 'uniq_cdl', 'utf8']
+           'single_spaces', 'StringPool', 'trim_str_arr', 'trim_str_array',
+           'uniq_cdl', 'utf8']
 
 
 def rep_chars(string, chars, rep=''):
@@ -36,6 +43,73 @@ def trim_str_arr(arr, length=10, max_rows=10):
     return arr
 
 
+def trim_str_array(arr, length=10, max_rows=10):
+    """Vectorized version of `trim_str_arr` for arrays of numeric strings.
+
+    Produces identical results to `trim_str_arr`, but returns a new array
+    (of the same string kind) if any values are changed, otherwise `arr`.
+    """
+    arr = np.asarray(arr)
+    lengths = np.char.str_len(arr)
+    inds = np.nonzero(lengths > length)[0]
+    if not len(inds):
+        return arr
+
+    values = arr[inds].astype(float)
+    rounded = _round_sig_array(values, length).astype(arr.dtype.kind)
+    changed = np.char.str_len(rounded) < lengths[inds]
+    # Like `trim_str_arr`: only change values if any of the first `max_rows`
+    # rows need to be changed
+    if not np.any(changed & (inds < max_rows)):
+        return arr
+
+    width = max(arr.dtype.itemsize, rounded.dtype.itemsize)
+    if arr.dtype.kind == 'U':
+        width //= 4
+    trimmed = arr.astype('{}{}'.format(arr.dtype.kind, width))
+    trimmed[inds[changed]] = rounded[changed]
+    return trimmed
+
+
+def _round_sig_array(values, sig):
+    """Vectorized equivalent of ``[round_sig(val, sig) for val in values]``.
+
+    Values for which the vectorized calculation could differ from the (exact)
+    builtin `round` are calculated individually, i.e. those near a power of
+    ten, or near a rounding tie.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.zeros_like(values)
+    absval = np.abs(values)
+    nonzero = (absval != 0.0)
+    fallback = ~np.isfinite(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        power = np.floor(np.log10(absval))
+        # The `floor` is ambiguous very close to powers of ten
+        mantissa = absval / np.power(10.0, power)
+        fallback |= (np.abs(mantissa - 1.0) < 1e-9) | (mantissa > 10 - 1e-8)
+        ndig = sig - power - 1
+        fallback |= np.abs(ndig) > 22
+
+    good = nonzero & ~fallback
+    for nd in np.unique(ndig[good]):
+        sel = good & (ndig == nd)
+        vals = values[sel]
+        scale = 10.0 ** abs(int(nd))
+        scaled = vals * scale if nd >= 0 else vals / scale
+        # Rounding ties depend on the exact decimal value, use builtin `round`
+        tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-4
+        near = np.rint(scaled)
+        res = near / scale if nd >= 0 else near * scale
+        res[tie] = [round_sig(val, sig) for val in vals[tie].tolist()]
+        rounded[sel] = res
+
+    for ii in np.nonzero(nonzero & fallback)[0]:
+        rounded[ii] = round_sig(values[ii].item(), sig)
+
+    return rounded
+
+
 def uniq_cdl(values):
     return ','.join(sorted(list(set(values))))
 
@@ -47,9 +121,89 @@ def utf8(x):
 def dict_to_pretty_string(odict):
     jsonstring = json.dumps(odict,
                             indent='\t', separators=(',', ':'),
-                            ensure_ascii=False)
+                            ensure_ascii=False, default=_json_default)
     return jsonstring
 
 
+def _json_default(obj):
+    """Convert non-`dict` mappings (e.g. `CompactRecord`), array-like objects
+    (e.g. `SpectrumData`) and `RawJSON` sections for `json.dumps`.
+    """
+    if isinstance(obj, RawJSON):
+        return obj.decode(object_pairs_hook=OrderedDict)
+    if isinstance(obj, Mapping):
+        return OrderedDict(obj.items())
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError("'{}' is not JSON serializable".format(repr(obj)))
+
+
 def get_entry_filename(name):
     return(name.replace('/', '_'))
+
+
+class StringPool:
+    """Pool of shared copies of (short) strings, which tracks memory savings.
+
+    Equal strings (e.g. band names, units, telescopes) are replaced by a
+    single shared object, in the same way as `sys.intern`, but the pool
+    belongs to (and is released with) its owner, e.g. a catalog.
+
+    Attributes
+    ----------
+    max_length : int
+        Strings longer than this are not pooled.
+    num_requests : int
+        Number of strings which have been pooled.
+    num_reused : int
+        Number of strings which were replaced by an existing, shared copy.
+    bytes_saved : int
+        Total size of the strings replaced by shared copies.
+
+    """
+
+    def __init__(self, max_length=64):
+        self.max_length = max_length
+        self._pool = {}
+        self.num_requests = 0
+        self.num_reused = 0
+        self.bytes_saved = 0
+        return
+
+    def __len__(self):
+        return len(self._pool)
+
+    def intern(self, string):
+        """Return the shared copy of the given str.
+        """
+        if len(string) > self.max_length:
+            return string
+        self.num_requests += 1
+        pooled = self._pool.setdefault(string, string)
+        if pooled is not string:
+            self.num_reused += 1
+            self.bytes_saved += sys.getsizeof(string)
+        return pooled
+
+    def intern_value(self, value):
+        """Return `value` with shared copies of a str, or of each str in a list.
+        """
+        if isinstance(value, str):
+            return self.intern(value)
+        if isinstance(value, list):
+            return [self.intern(val) if isinstance(val, str) else val
+                    for val in value]
+        return value
+
+    def odict_hook(self, pairs):
+        """`object_pairs_hook` for `json.load`, pooling the (object) keys.
+        """
+        return OrderedDict((self.intern(kk), vv) for kk, vv in pairs)
+
+    def stats_str(self):
+        """Return a description of the pool's size and memory savings.
+        """
+        return ("Pooled strings: {:,}, requests: {:,}, reused: {:,}, "
+                "saved: {:,.2f} MB".format(
+                    len(self), self.num_requests, self.num_reused,
+                    self.bytes_saved / 1024. / 1024.))
@@ -0,0 +1,321 @@
+"""Read-only, streaming access to the entry files of output repositories.
+
+Entry files ('.json' and '.json.gz') are read directly, without constructing
+a `Catalog` or full `Entry` objects.  Each file is only scanned for the
+positions of its sections, and only the sections which are needed (the
+projected `fields`, and those used by the `where` predicate) are decoded;
+large sections such as photometry are skipped otherwise.  e.g.
+
+>>> from astrocats.reader import Field, has, iter_entries
+>>> for entry in iter_entries(['output/sne-2010-2014'], fields=['redshift'],
+...                           where=has('spectra') & (Field('redshift') < 0.1),
+...                           processes=4):
+...     print(entry.name, entry.value('redshift'))
+"""
+import abc
+import json
+import operator
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from glob import glob
+from multiprocessing import Pool
+
+from astrocats.catalog.quantity import QUANTITY
+from astrocats.catalog.utils import read_text_file, scan_entry_sections
+
+__all__ = ['Field', 'ReaderEntry', 'find_entry_files', 'has', 'iter_entries',
+           'read_entry']
+
+# Text of empty JSON values, used to evaluate `has` without decoding
+_EMPTY_VALUES = set(['[]', '{}', '""', 'null'])
+
+
+class ReaderEntry(Mapping):
+    """Read-only entry, containing only the decoded (projected) sections.
+
+    Attributes
+    ----------
+    name : str
+        The name of the entry.
+    filename : str
+        The file the entry was read from.
+
+    """
+    __slots__ = ['name', 'filename', '_data']
+
+    def __init__(self, name, filename, data):
+        self.name = name
+        self.filename = filename
+        self._data = data
+        return
+
+    def __repr__(self):
+        return "{}(name='{}', fields={})".format(
+            type(self).__name__, self.name, list(self._data.keys()))
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def value(self, key, default=None):
+        """Return the (first) `QUANTITY.VALUE` of the quantity `key`.
+        """
+        return _first_value(self._data.get(key, None), default)
+
+
+class Predicate(abc.ABC):
+    """Base class of the conditions used to select entries.
+
+    Predicates are combined with ``&``, ``|`` and ``~``.
+
+    Attributes
+    ----------
+    keys : set of str
+        The entry sections (keys) needed to evaluate the predicate.  Sections
+        in `raw_keys` are not decoded.
+    raw_keys : set of str
+
+    """
+
+    keys = frozenset()
+    raw_keys = frozenset()
+
+    @abc.abstractmethod
+    def __call__(self, data, raw):
+        """Evaluate the predicate.
+
+        Arguments
+        ---------
+        data : dict
+            The decoded sections in `keys`.
+        raw : dict
+            The (undecoded) JSON text of the sections in `raw_keys`.
+
+        """
+
+    def __and__(self, other):
+        return _Combined(all, [self, other])
+
+    def __or__(self, other):
+        return _Combined(any, [self, other])
+
+    def __invert__(self):
+        return _Not(self)
+
+
+class _Has(Predicate):
+
+    def __init__(self, key):
+        self.raw_keys = frozenset([key])
+        self.key = key
+        return
+
+    def __call__(self, data, raw):
+        text = raw.get(self.key, None)
+        return text is not None and text.strip() not in _EMPTY_VALUES
+
+
+class _Compare(Predicate):
+
+    def __init__(self, key, op, value):
+        self.keys = frozenset([key])
+        self.key = key
+        self.op = op
+        self.value = value
+        return
+
+    def __call__(self, data, raw):
+        value = _first_value(data.get(self.key, None))
+        if value is None:
+            return False
+        if isinstance(self.value, (int, float)):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False
+        return self.op(value, self.value)
+
+
+class _Combined(Predicate):
+
+    def __init__(self, func, predicates):
+        self.func = func
+        self.predicates = predicates
+        self.keys = frozenset().union(*[pp.keys for pp in predicates])
+        self.raw_keys = frozenset().union(*[pp.raw_keys for pp in predicates])
+        return
+
+    def __call__(self, data, raw):
+        return self.func(pp(data, raw) for pp in self.predicates)
+
+
+class _Not(Predicate):
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.keys = predicate.keys
+        self.raw_keys = predicate.raw_keys
+        return
+
+    def __call__(self, data, raw):
+        return not self.predicate(data, raw)
+
+
+class Field:
+    """A quantity (e.g. 'redshift') of entries, to construct predicates.
+
+    Comparisons (e.g. ``Field('redshift') < 0.1``) use the first value of the
+    quantity, converted to float when compared to a number.  Entries without
+    the quantity (or with non-numeric values) do not match.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        return
+
+    def __lt__(self, value):
+        return _Compare(self.key, operator.lt, value)
+
+    def __le__(self, value):
+        return _Compare(self.key, operator.le, value)
+
+    def __gt__(self, value):
+        return _Compare(self.key, operator.gt, value)
+
+    def __ge__(self, value):
+        return _Compare(self.key, operator.ge, value)
+
+    def __eq__(self, value):
+        return _Compare(self.key, operator.eq, value)
+
+    def __ne__(self, value):
+        return _Compare(self.key, operator.ne, value)
+
+    __hash__ = object.__hash__
+
+
+def has(key):
+    """Predicate: the entry has a non-empty section `key` (e.g. 'spectra').
+
+    Evaluated without decoding the section.
+    """
+    return _Has(key)
+
+
+def find_entry_files(paths):
+    """Return the entry files in the given directories (or files).
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob(os.path.join(path, '*.json')) +
+                                glob(os.path.join(path, '*.json.gz'))))
+        else:
+            files.append(path)
+    return files
+
+
+def read_entry(fname, fields=None, where=None):
+    """Read the entry file `fname`.
+
+    Arguments
+    ---------
+    fname : str
+    fields : list of str or 'None'
+        The sections to include in the returned entry, by default all.
+    where : `Predicate` or 'None'
+        Condition the entry must satisfy.
+
+    Returns
+    -------
+    entry : `ReaderEntry` or 'None'
+        'None' if the entry does not satisfy `where`.
+
+    """
+    text = read_text_file(fname)
+    try:
+        name, sections = scan_entry_sections(text)
+    except ValueError:
+        data = json.loads(text, object_pairs_hook=OrderedDict)
+        name = list(data.keys())[0]
+        data = data[name]
+        sections = None
+
+    decoder = json.JSONDecoder(object_pairs_hook=OrderedDict)
+
+    def _decode(key):
+        if sections is None:
+            return data[key]
+        return decoder.raw_decode(text, sections[key][0])[0]
+
+    available = data if sections is None else sections
+    if where is not None:
+        needed = OrderedDict((key, _decode(key)) for key in where.keys
+                             if key in available)
+        if sections is None:
+            raw = OrderedDict((key, json.dumps(data[key]))
+                              for key in where.raw_keys if key in data)
+        else:
+            raw = OrderedDict((key, text[slice(*sections[key])])
+                              for key in where.raw_keys if key in sections)
+        if not where(needed, raw):
+            return None
+
+    if fields is None:
+        fields = list(available.keys())
+    projected = OrderedDict((key, _decode(key)) for key in fields
+                            if key in available)
+    return ReaderEntry(name, fname, projected)
+
+
+def iter_entries(paths, fields=None, where=None, processes=1, chunksize=16):
+    """Yield the (matching) entries in the given repositories, in order.
+
+    Arguments
+    ---------
+    paths : str or list of str
+        Output repository directories and/or entry files.
+    fields : list of str or 'None'
+        The sections to include in each entry, by default all.
+    where : `Predicate` or 'None'
+        Only yield entries satisfying this condition.
+    processes : int
+        Number of processes reading files in parallel.
+    chunksize : int
+        Number of files given to a process at a time.
+
+    """
+    files = find_entry_files(paths)
+    tasks = ((fname, fields, where) for fname in files)
+    if processes <= 1:
+        results = (_read_entry(task) for task in tasks)
+        for entry in results:
+            if entry is not None:
+                yield entry
+        return
+
+    with Pool(processes) as pool:
+        for entry in pool.imap(_read_entry, tasks, chunksize=chunksize):
+            if entry is not None:
+                yield entry
+    return
+
+
+def _read_entry(task):
+    return read_entry(*task)
+
+
+def _first_value(quanta, default=None):
+    if isinstance(quanta, list) and quanta:
+        quanta = quanta[0]
+    if isinstance(quanta, Mapping):
+        return quanta.get(QUANTITY.VALUE, default)
+    return default
@@ -0,0 +1,2 @@
+"""Unit tests of the modules in `astrocats`.
+"""
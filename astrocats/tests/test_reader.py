@@ -0,0 +1,68 @@
+"""Tests of `astrocats.reader`.
+"""
+import json
+from collections import OrderedDict
+
+import pytest
+from astrocats.reader import Field, Predicate, has, iter_entries, read_entry
+
+NAME = 'SN2020abc'
+DATA = OrderedDict([
+    ('name', NAME),
+    ('sources', [OrderedDict([('name', 'Private et al. 2025'),
+                              ('alias', '1')])]),
+    ('alias', [OrderedDict([('value', NAME), ('source', '1')])]),
+    ('redshift', [OrderedDict([('value', '0.05'), ('source', '1')])]),
+    ('photometry', [OrderedDict([('time', '12345'), ('magnitude', '20.0'),
+                                 ('source', '1')])]),
+    ('spectra', []),
+])
+
+
+@pytest.fixture(params=['\t', None])
+def entry_file(request, tmpdir):
+    """An entry file in the layout of saved entries, or on a single line.
+    """
+    path = tmpdir.join(NAME + '.json')
+    path.write(json.dumps({NAME: DATA}, indent=request.param))
+    return str(path)
+
+
+def test_read_entry(entry_file):
+    entry = read_entry(entry_file)
+    assert entry.name == NAME
+    assert entry.filename == entry_file
+    assert OrderedDict(entry) == DATA
+    assert entry.value('redshift') == '0.05'
+
+
+def test_read_entry_projection(entry_file):
+    entry = read_entry(entry_file, fields=['redshift', 'host'])
+    assert list(entry.keys()) == ['redshift']
+    assert entry['redshift'] == DATA['redshift']
+
+
+@pytest.mark.parametrize('where, matches', [
+    (has('photometry'), True),
+    (has('spectra'), False),
+    (~has('spectra'), True),
+    (Field('redshift') < 0.1, True),
+    (Field('redshift') > 0.1, False),
+    (Field('host') == 'NGC 1', False),
+    (has('photometry') & (Field('redshift') > 0.1), False),
+    (has('spectra') | (Field('redshift') == '0.05'), True),
+])
+def test_read_entry_where(entry_file, where, matches):
+    entry = read_entry(entry_file, fields=['redshift'], where=where)
+    assert (entry is not None) == matches
+
+
+def test_iter_entries(entry_file, tmpdir):
+    names = [entry.name for entry in iter_entries(
+        [str(tmpdir)], where=has('photometry'))]
+    assert names == [NAME]
+
+
+def test_predicate_is_abstract():
+    with pytest.raises(TypeError):
+        Predicate()